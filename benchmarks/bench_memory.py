@@ -0,0 +1,90 @@
+"""Bytes per ticket: a list of pydantic ``Ticket`` models vs ``TicketColumns``.
+
+Each layout is built from the same synthetic todos and measured with
+tracemalloc, together with the posting lists of a ``TicketIndex`` over it
+(the old index kept plain ``int`` lists and an id -> position dict).
+
+    python -m benchmarks.bench_memory --sizes 10000 100000 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.tickethub.columnar import TicketColumns
+from src.tickethub.indexes import TicketIndex
+from src.tickethub.models import Ticket, TicketStatus, TicketPriority
+
+PRIORITIES = list(TicketPriority)
+WORDS = "login error timeout deploy cache refund invoice password reset export dashboard".split()
+
+
+def make_rows(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": i,
+            "title": " ".join(WORDS[(i + k) % len(WORDS)] for k in range(3 + i % 5)).capitalize(),
+            "status": TicketStatus.CLOSED if i % 4 == 0 else TicketStatus.OPEN,
+            "priority": PRIORITIES[i % 3],
+            "assignee": f"user{i % 100}",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def build_models(rows: List[Dict[str, Any]]) -> Tuple[object, object]:
+    tickets = [Ticket(**row, description=row["title"][:100]) for row in rows]
+    by_status: Dict[TicketStatus, List[int]] = {}
+    by_assignee: Dict[str, List[int]] = {}
+    positions_by_id = {}
+    for position, ticket in enumerate(tickets):
+        positions_by_id[ticket.id] = position
+        by_status.setdefault(ticket.status, []).append(position)
+        by_assignee.setdefault(ticket.assignee, []).append(position)
+    return tickets, (by_status, by_assignee, positions_by_id)
+
+
+def build_columns(rows: List[Dict[str, Any]]) -> Tuple[object, object]:
+    columns = TicketColumns()
+    for row in rows:
+        columns.append(**row)
+    return columns, TicketIndex(columns)
+
+
+def measure(build: Callable[[], Tuple[object, object]]) -> Tuple[int, float, object]:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    built = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, built
+
+
+def run(size: int) -> None:
+    rows = make_rows(size)
+    models_bytes, models_s, (tickets, _) = measure(lambda: build_models(rows))
+    columns_bytes, columns_s, (columns, _) = measure(lambda: build_columns(rows))
+    assert columns.ticket(size - 1) == tickets[-1]
+    del tickets
+
+    print(f"\n{size:>9,} tickets")
+    print(f"  {'layout':<10}{'bytes/ticket':>14}{'total MB':>12}{'build s':>10}")
+    print(f"  {'models':<10}{models_bytes / size:>14.1f}{models_bytes / 2**20:>12.1f}{models_s:>10.2f}")
+    print(f"  {'columns':<10}{columns_bytes / size:>14.1f}{columns_bytes / 2**20:>12.1f}{columns_s:>10.2f}")
+    print(f"  {models_bytes / columns_bytes:.1f}x smaller")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size)
+
+
+if __name__ == "__main__":
+    main()
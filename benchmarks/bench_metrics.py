@@ -0,0 +1,105 @@
+"""Per-request cost of the metrics instrumentation.
+
+Times the raw histogram/counter operations, then ``MetricsMiddleware``
+wrapped around a bare ASGI app (the precise per-request overhead), then a
+minimal FastAPI app in-process over httpx's ASGI transport with and without
+the middleware, interleaved so drift hits both sides equally.
+
+    python -m benchmarks.bench_metrics --requests 5000
+"""
+import argparse
+import asyncio
+import time
+import timeit
+
+import httpx
+from fastapi import FastAPI
+
+from src.tickethub.metrics import Counter, Histogram, MetricsMiddleware, Registry
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def drive(app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(100):  # warm up
+            await client.get(f"/items/{i}")
+        started = time.perf_counter()
+        for i in range(requests):
+            await client.get(f"/items/{i}")
+        return time.perf_counter() - started
+
+
+def micro(number: int) -> None:
+    registry = Registry()
+    histogram = registry.register(Histogram("h_seconds", "h", ("route", "method", "status")))
+    counter = registry.register(Counter("c_total", "c", ("endpoint",)))
+
+    observe = timeit.timeit(lambda: histogram.labels("/items/{item_id}", "GET", "200").observe(0.003), number=number)
+    inc = timeit.timeit(lambda: counter.labels("/todos").inc(), number=number)
+    render = timeit.timeit(registry.render, number=1000)
+    print(f"histogram observe  {observe / number * 1e9:8.0f} ns")
+    print(f"counter inc        {inc / number * 1e9:8.0f} ns")
+    print(f"render             {render / 1000 * 1e6:8.1f} us")
+
+
+async def middleware_overhead(number: int) -> float:
+    async def bare(scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message) -> None:
+        pass
+
+    async def receive() -> dict:
+        return {"type": "http.request"}
+
+    route = build_app(False).routes[-1]
+    scope = {"type": "http", "method": "GET", "route": route}
+    wrapped = MetricsMiddleware(bare)
+
+    async def loop(app) -> float:
+        started = time.perf_counter()
+        for _ in range(number):
+            await app(scope, receive, send)
+        return time.perf_counter() - started
+
+    plain = min([await loop(bare) for _ in range(3)])
+    instrumented = min([await loop(wrapped) for _ in range(3)])
+    return (instrumented - plain) / number
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    micro(200_000)
+    overhead = await middleware_overhead(100_000)
+    print(f"middleware         {overhead * 1e6:8.2f} us/request")
+
+    plain, instrumented = [], []
+    for _ in range(args.repeat):
+        plain.append(await drive(build_app(False), args.requests))
+        instrumented.append(await drive(build_app(True), args.requests))
+    per_request = min(plain) / args.requests
+    print(f"\n{args.requests:,} end-to-end requests, best of {args.repeat}")
+    print(f"  without middleware  {args.requests / min(plain):10,.0f} req/s")
+    print(f"  with middleware     {args.requests / min(instrumented):10,.0f} req/s")
+    print(f"  middleware share    {overhead / per_request:10.1%} of a request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
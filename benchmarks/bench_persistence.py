@@ -0,0 +1,62 @@
+"""Snapshot file write and restore times at a given number of tickets.
+
+"restore" is what startup blocks on (read, checksum, columns, id index and
+stats); the search index is then rebuilt in the background, and its time is
+reported separately as "index".
+
+    python -m benchmarks.bench_persistence --sizes 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.bench_memory import build_columns, make_rows
+from src.tickethub.persistence import SnapshotFile
+from src.tickethub.snapshot import TicketSnapshot, build_stats
+from src.tickethub.store import TicketStore
+
+
+async def unused_loader():
+    raise RuntimeError("the benchmark never refreshes")
+
+
+async def run(size: int, path: str) -> None:
+    columns, _ = build_columns(make_rows(size))
+    users = {i: f"user{i}" for i in range(100)}
+    snapshot = TicketSnapshot(columns=columns, users=users, version=1, stats=build_stats(columns))
+    snapshot_file = SnapshotFile(path)
+
+    started = time.perf_counter()
+    written = snapshot_file.write(snapshot)
+    write_s = time.perf_counter() - started
+
+    store = TicketStore(unused_loader)
+    started = time.perf_counter()
+    store.restore(snapshot_file.read())
+    restore_s = time.perf_counter() - started
+    assert len(store.snapshot.columns) == size
+
+    started = time.perf_counter()
+    await store.search_ready()
+    index_s = time.perf_counter() - started
+    await store.stop()
+
+    print(f"{size:>11,}{written / 2**20:>10.1f}{write_s * 1000:>12.1f}{restore_s * 1000:>12.1f}{index_s:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'tickets':>11}{'file MB':>10}{'write ms':>12}{'restore ms':>12}{'index s':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "snapshot.bin")
+        for size in args.sizes:
+            asyncio.run(run(size, path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Requests/sec for the hot routes with and without the rendered-response cache.
+
+"before" mounts the routes the way they were written originally (return the
+pydantic model and let FastAPI validate and encode it via ``response_model``);
+"after" is the real router with ETags, the response cache and pydantic-core
+encoding. Both run in-process over httpx's ASGI transport against the same
+pre-loaded snapshot, so upstream latency does not enter the numbers.
+
+    python -m benchmarks.bench_responses --tickets 100000 --requests 2000
+"""
+import argparse
+import asyncio
+import time
+from typing import Optional
+
+import httpx
+from fastapi import Depends, FastAPI, Query
+
+from src.tickethub.columnar import TicketColumns
+from src.tickethub.handlers import TicketHandler, get_ticket_handler
+from src.tickethub.models import TicketList, TicketPriority, TicketStats, TicketStatus
+from src.tickethub.routes import router
+from src.tickethub.services import DummyJSONService, get_service
+
+HOT_PATHS = ["/tickets?page=1&limit=10", "/tickets?status=open&priority=high&limit=50", "/stats"]
+
+
+def build_baseline_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/tickets", response_model=TicketList)
+    async def get_tickets(
+        page: int = Query(1, ge=1),
+        limit: int = Query(10, ge=1, le=100),
+        status: Optional[TicketStatus] = Query(None),
+        priority: Optional[TicketPriority] = Query(None),
+        handler: TicketHandler = Depends(get_ticket_handler)
+    ):
+        return await handler.get_tickets(page=page, limit=limit, status=status, priority=priority)
+
+    @app.get("/stats", response_model=TicketStats)
+    async def get_ticket_stats(handler: TicketHandler = Depends(get_ticket_handler)):
+        return await handler.get_ticket_stats()
+
+    return app
+
+
+def build_current_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+async def make_service(count: int) -> DummyJSONService:
+    service = DummyJSONService()
+    users = {i: f"user{i}" for i in range(1, 101)}
+
+    async def loader():
+        todos = (
+            {"id": i, "todo": f"Synthetic ticket number {i}", "completed": i % 4 == 0, "userId": 1 + i % 100}
+            for i in range(1, count + 1)
+        )
+        columns = TicketColumns()
+        for todo in todos:
+            columns.append(**service._ticket_fields(todo, users))
+        return columns, users
+
+    service.store._loader = loader
+    await service.store.refresh()
+    return service
+
+
+async def drive(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path)  # warm up
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one() -> None:
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    service = await make_service(args.tickets)
+    apps = {"before": build_baseline_app(), "after": build_current_app()}
+    for app in apps.values():
+        app.dependency_overrides[get_service] = lambda: service
+
+    print(f"{args.tickets:,} tickets, {args.requests:,} requests, concurrency {args.concurrency}")
+    print(f"  {'path':<48}{'before req/s':>14}{'after req/s':>14}{'speedup':>10}")
+    for path in HOT_PATHS:
+        before = await drive(apps["before"], path, args.requests, args.concurrency)
+        after = await drive(apps["after"], path, args.requests, args.concurrency)
+        print(f"  {path:<48}{before:>14,.0f}{after:>14,.0f}{after / before:>9.1f}x")
+    await service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
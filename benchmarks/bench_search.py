@@ -0,0 +1,67 @@
+"""Compare the trigram title index against the linear scan it replaced.
+
+    python -m benchmarks.bench_search --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from src.tickethub.search_index import TrigramIndex
+
+WORDS = (
+    "login error timeout deploy cache refund invoice password reset export "
+    "dashboard report crash mobile android ios billing account email sync"
+).split()
+QUERIES = ["timeout", "reset", "log", "mobile crash", "nomatch", "in"]
+
+
+def make_titles(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8))).capitalize() for _ in range(count)]
+
+
+def linear_scan(titles: List[str], query: str) -> List[int]:
+    return [i for i, title in enumerate(titles) if query.lower() in title.lower()]
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(size: int, repeat: int) -> None:
+    titles = make_titles(size)
+    index = TrigramIndex()
+
+    started = time.perf_counter()
+    for i, title in enumerate(titles):
+        index.add(i, title)
+    build = time.perf_counter() - started
+    print(f"\n{size:>9,} titles  (index build {build:.2f}s)")
+    print(f"  {'query':<14}{'matches':>10}{'scan ms':>12}{'index ms':>12}{'speedup':>10}")
+
+    for query in QUERIES:
+        expected = linear_scan(titles, query)
+        assert sorted(index.search(query)) == expected
+        scan_s = best_of(lambda: linear_scan(titles, query), repeat)
+        index_s = best_of(lambda: index.search(query), repeat)
+        speedup = scan_s / index_s if index_s else float("inf")
+        print(f"  {query!r:<14}{len(expected):>10,}{scan_s * 1000:>12.2f}{index_s * 1000:>12.2f}{speedup:>9.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Per-worker memory with and without the shared snapshot segment.
+
+Publishes one generation, then starts worker processes that either attach to
+it (shared) or load their own copy and build their own indexes (private, the
+default mode). Each worker runs a few searches and reports its private and
+proportional set size from /proc (Linux only).
+
+    python -m benchmarks.bench_shared --tickets 200000 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Dict, Tuple
+
+from benchmarks.bench_memory import WORDS, build_columns, make_rows
+from src.tickethub.columnar import TicketColumns
+from src.tickethub.search_index import TrigramIndex
+from src.tickethub.shared import SharedSnapshotCache, attach_generation
+from src.tickethub.snapshot import TicketSnapshot, diff_columns
+
+QUERIES = WORDS[:4]
+
+
+def memory() -> Dict[str, int]:
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if rest.strip().endswith("kB"):
+                fields[name] = int(rest.split()[0]) * 1024
+    return {
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "pss": fields.get("Pss", 0),
+    }
+
+
+def worker(mode: str, path: str, blob_path: str, results: "multiprocessing.Queue[Tuple[str, Dict[str, float]]]") -> None:
+    before = memory()
+    started = time.perf_counter()
+    if mode == "shared":
+        snapshot = attach_generation(path)
+        search = snapshot.search_index
+    else:
+        with open(blob_path, "rb") as f:
+            columns = TicketColumns.loads(f.read())
+        snapshot = TicketSnapshot(columns=columns, users={}, version=1)
+        search = TrigramIndex()
+        search.apply(diff_columns(TicketColumns(), columns))
+    ready = time.perf_counter() - started
+    hits = sum(len(search.search(query)) for query in QUERIES)
+    after = memory()
+    results.put((mode, {
+        "ready_s": ready,
+        "private_mb": (after["private"] - before["private"]) / 2**20,
+        "pss_mb": (after["pss"] - before["pss"]) / 2**20,
+        "hits": hits,
+        "rows": len(snapshot.columns),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    columns, _ = build_columns(make_rows(args.tickets))
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SharedSnapshotCache(directory)
+        started = time.perf_counter()
+        cache._publish(1, columns, {})
+        print(f"Published {args.tickets:,} tickets in {time.perf_counter() - started:.2f}s "
+              f"({os.path.getsize(os.path.join(directory, 'gen-1.bin')) / 2**20:.1f} MB segment)")
+        blob_path = os.path.join(directory, "columns.bin")
+        with open(blob_path, "wb") as f:
+            f.write(columns.dumps())
+        del columns
+
+        context = multiprocessing.get_context("spawn")
+        print(f"\n{'mode':<10}{'workers':>8}{'ready s':>10}{'private MB':>12}{'PSS MB':>10}")
+        for mode in ("private", "shared"):
+            results = context.Queue()
+            processes = [
+                context.Process(target=worker, args=(mode, os.path.join(directory, "gen-1.bin"), blob_path, results))
+                for _ in range(args.workers)
+            ]
+            for process in processes:
+                process.start()
+            rows = [results.get()[1] for _ in processes]
+            for process in processes:
+                process.join()
+            assert len({row["hits"] for row in rows}) == 1
+            mean = {key: sum(row[key] for row in rows) / len(rows) for key in ("ready_s", "private_mb", "pss_mb")}
+            print(f"{mode:<10}{args.workers:>8}{mean['ready_s']:>10.2f}{mean['private_mb']:>12.1f}{mean['pss_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
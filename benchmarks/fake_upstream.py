@@ -0,0 +1,89 @@
+"""In-process stand-in for the DummyJSON endpoints TicketHub calls.
+
+``FakeDummyJSON`` is an httpx transport, so it plugs straight into
+``DummyJSONService(transport=...)`` without opening sockets. It serves
+``/todos`` (limit/skip paging), ``/todos/{id}`` and ``/users`` over
+generated data, and sleeps ``latency`` ± ``jitter`` seconds per request;
+a ``slow_ratio`` share of requests takes ``slow_latency`` instead, which
+gives the latency distribution the long tail that hedged reads target.
+"""
+import asyncio
+import json
+import random
+from typing import Any, Dict, List
+
+import httpx
+
+WORDS = (
+    "login error timeout deploy cache refund invoice password reset export "
+    "dashboard report crash mobile android ios billing account email sync"
+).split()
+
+
+class FakeDummyJSON(httpx.AsyncBaseTransport):
+    def __init__(
+        self,
+        todos: int = 10_000,
+        users: int = 100,
+        latency: float = 0.02,
+        jitter: float = 0.01,
+        max_limit: int = 0,
+        seed: int = 7,
+        slow_ratio: float = 0.0,
+        slow_latency: float = 0.5,
+    ):
+        rng = random.Random(seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.max_limit = max_limit
+        self.slow_ratio = slow_ratio
+        self.slow_latency = slow_latency
+        self._rng = random.Random(seed + 1)
+        self.users: List[Dict[str, Any]] = [{"id": i, "username": f"user{i}"} for i in range(1, users + 1)]
+        self.todos: List[Dict[str, Any]] = [
+            {
+                "id": i,
+                "todo": " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8))).capitalize(),
+                "completed": rng.random() < 0.3,
+                "userId": rng.randint(1, users),
+            }
+            for i in range(1, todos + 1)
+        ]
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        if self.slow_ratio and self._rng.random() < self.slow_ratio:
+            delay = self.slow_latency
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        parts = request.url.path.strip("/").split("/")
+        if parts == ["todos"]:
+            return self._page(request, "todos", self.todos)
+        if parts == ["users"]:
+            return self._page(request, "users", self.users)
+        if len(parts) == 2 and parts[0] == "todos" and parts[1].isdigit():
+            ticket_id = int(parts[1])
+            if 1 <= ticket_id <= len(self.todos):
+                return self._json(request, 200, self.todos[ticket_id - 1])
+            return self._json(request, 404, {"message": f"Todo with id '{ticket_id}' not found"})
+        return self._json(request, 404, {"message": "Not found"})
+
+    def _page(self, request: httpx.Request, key: str, items: List[Dict[str, Any]]) -> httpx.Response:
+        skip = int(request.url.params.get("skip", 0))
+        limit = int(request.url.params.get("limit", 30)) or len(items)
+        if self.max_limit:
+            limit = min(limit, self.max_limit)
+        page = items[skip:skip + limit]
+        return self._json(request, 200, {key: page, "total": len(items), "skip": skip, "limit": len(page)})
+
+    @staticmethod
+    def _json(request: httpx.Request, status: int, payload: Dict[str, Any]) -> httpx.Response:
+        return httpx.Response(
+            status,
+            content=json.dumps(payload).encode(),
+            headers={"content-type": "application/json"},
+            request=request,
+        )
@@ -0,0 +1,188 @@
+"""Reproducible load run against the real app and a fake DummyJSON upstream.
+
+Each scenario is driven at every concurrency level in-process over httpx's
+ASGI transport, while the service talks to ``FakeDummyJSON`` with the
+configured latency and jitter. Throughput and p50/p95/p99 latencies are
+printed and written as JSON, so two runs (e.g. two commits) can be compared:
+
+    python -m benchmarks.load --todos 20000 --concurrency 1 8 32
+    python -m benchmarks.load --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import asyncio
+import dataclasses
+import json
+import logging
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.fake_upstream import WORDS, FakeDummyJSON
+from src.tickethub.config import settings
+from src.tickethub.main import app
+from src.tickethub.services import DummyJSONService, get_service
+from src.tickethub.sources import DummyJSONSource
+
+PathFactory = Callable[[random.Random], str]
+
+
+def scenarios(todos: int) -> Dict[str, PathFactory]:
+    pages = max(1, todos // 20)
+    return {
+        "list": lambda rng: f"/tickets?page={rng.randint(1, min(pages, 50))}&limit=20",
+        "list_filtered": lambda rng: f"/tickets?status=open&priority={rng.choice(['low', 'medium', 'high'])}&limit=50",
+        "search": lambda rng: f"/tickets/search?q={rng.choice(WORDS)}&limit=20",
+        "detail": lambda rng: f"/tickets/{rng.randint(1, todos)}",
+        "stats": lambda rng: "/stats",
+    }
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    make_path: PathFactory,
+    requests: int,
+    concurrency: int,
+    seed: int,
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    paths = [make_path(rng) for _ in range(requests)]
+    latencies: List[float] = []
+    errors = 0
+    queue = iter(paths)
+
+    async def worker() -> None:
+        nonlocal errors
+        for path in queue:
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    upstream = FakeDummyJSON(
+        todos=args.todos, users=args.users, latency=args.latency, jitter=args.jitter, seed=args.seed,
+        slow_ratio=args.slow_ratio, slow_latency=args.slow_latency,
+    )
+    source_settings = dataclasses.replace(settings, upstream_hedge=args.hedge)
+    service = DummyJSONService(DummyJSONSource(source_settings, base_url="http://fake-dummyjson", transport=upstream))
+    app.dependency_overrides[get_service] = lambda: service
+
+    results: Dict[str, Any] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "scenarios": {},
+    }
+    try:
+        started = time.perf_counter()
+        await service.store.refresh()
+        results["snapshot_load_s"] = round(time.perf_counter() - started, 3)
+        print(f"Loaded {args.todos:,} todos in {results['snapshot_load_s']:.2f}s "
+              f"(upstream latency {args.latency * 1000:.0f}±{args.jitter * 1000:.0f} ms)")
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"\n{'scenario':<15}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+            for name, make_path in scenarios(args.todos).items():
+                if args.scenarios and name not in args.scenarios:
+                    continue
+                rows = []
+                for concurrency in args.concurrency:
+                    row = await run_scenario(client, make_path, args.requests, concurrency, args.seed + concurrency)
+                    rows.append(row)
+                    print(f"{name:<15}{concurrency:>6}{row['throughput_rps']:>10,.0f}{row['p50_ms']:>10.2f}"
+                          f"{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['errors']:>8}")
+                results["scenarios"][name] = rows
+    finally:
+        app.dependency_overrides.pop(get_service, None)
+        await service.close()
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    print(f"\nvs {baseline.get('git') or 'baseline'} ({baseline.get('timestamp')})")
+    print(f"{'scenario':<15}{'conc':>6}{'req/s':>12}{'p99':>12}")
+    for name, rows in current["scenarios"].items():
+        before = {row["concurrency"]: row for row in baseline.get("scenarios", {}).get(name, [])}
+        for row in rows:
+            old = before.get(row["concurrency"])
+            if old is None:
+                continue
+            rps = (row["throughput_rps"] / old["throughput_rps"] - 1) if old["throughput_rps"] else 0.0
+            p99 = (row["p99_ms"] / old["p99_ms"] - 1) if old["p99_ms"] else 0.0
+            print(f"{name:<15}{row['concurrency']:>6}{rps:>+12.1%}{p99:>+12.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--todos", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02, help="upstream latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="± upstream latency jitter in seconds")
+    parser.add_argument("--slow-ratio", type=float, default=0.0, help="share of upstream requests that are slow")
+    parser.add_argument("--slow-latency", type=float, default=0.5, help="latency of a slow upstream request")
+    parser.add_argument("--hedge", action="store_true", help="hedge detail reads (UPSTREAM_HEDGE)")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--scenarios", nargs="*", help="subset of: list list_filtered search detail stats")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, default=Path("benchmarks/results"))
+    parser.add_argument("--compare", type=Path, help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = asyncio.run(run(args))
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    stamp = results["timestamp"].replace(":", "").replace("-", "").replace("+0000", "Z")
+    path = args.output / f"{stamp}-{results['git'] or 'nogit'}.json"
+    path.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nWrote {path}")
+
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
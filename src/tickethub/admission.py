@@ -0,0 +1,249 @@
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+from .metrics import admission_in_flight, admission_queue_depth, admission_queue_wait, admission_queued, admission_rejected
+
+# Lower values are admitted first when requests queue up.
+CHEAP, NORMAL, EXPENSIVE = 0, 1, 2
+
+# Routes under admission control and their priority. Anything else
+# (/health, /metrics, docs, unmatched paths) is never queued or shed.
+ROUTE_PRIORITIES: Dict[str, int] = {
+    "/stats": CHEAP,
+    "/tickets": NORMAL,
+    "/tickets/{ticket_id}": NORMAL,
+    "/tickets/search": EXPENSIVE,
+    "/tickets/batch": EXPENSIVE,
+    "/tickets/export": EXPENSIVE,
+}
+
+# Concurrent requests per route, on top of the global limit.
+ROUTE_LIMITS: Dict[str, int] = {
+    "/tickets/batch": 8,
+    "/tickets/export": 4,
+}
+
+_Waiter = Tuple[int, int, "asyncio.Future[bool]"]
+
+
+class Rejected(Exception):
+    """A request that admission control turned away."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """At most ``limit`` concurrent holders; the rest wait in a queue of at
+    most ``queue_size``, lowest priority value first.
+
+    When the queue is full, a newcomer that is more urgent than the least
+    urgent waiter takes its place and that waiter is shed.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue_size = max(0, queue_size)
+        self.active = 0
+        self._queue: List[_Waiter] = []
+        self._order = itertools.count()
+
+    def _publish(self) -> None:
+        admission_in_flight.labels(self.name).set(self.active)
+        admission_queue_depth.labels(self.name).set(len(self._queue))
+
+    async def acquire(self, priority: int, timeout: float) -> Optional[str]:
+        """Take a slot; ``None`` once admitted, otherwise why the request was turned away."""
+        if self.active < self.limit and not self._queue:
+            self.active += 1
+            self._publish()
+            return None
+        if len(self._queue) >= self.queue_size:
+            if not self._queue or max(self._queue)[0] <= priority:
+                return "queue_full"
+            worst = max(self._queue)
+            self._queue.remove(worst)
+            heapq.heapify(self._queue)
+            worst[2].set_result(False)
+
+        waiter: _Waiter = (priority, next(self._order), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, waiter)
+        self._publish()
+        future = waiter[2]
+        try:
+            async with asyncio.timeout(timeout):
+                admitted = await future
+        except BaseException as e:
+            if future.done() and not future.cancelled() and future.result():
+                # The slot was handed over just as we gave up; pass it on.
+                self.release()
+            else:
+                self._discard(waiter)
+            if isinstance(e, TimeoutError):
+                return "queue_timeout"
+            raise
+        return None if admitted else "shed"
+
+    def _discard(self, waiter: _Waiter) -> None:
+        if waiter in self._queue:
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+            self._publish()
+
+    def release(self) -> None:
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                # Hand the slot straight to the most urgent waiter.
+                future.set_result(True)
+                self._publish()
+                return
+        self.active -= 1
+        self._publish()
+
+
+class AdmissionController:
+    """Per-client, per-route and global concurrency limits in front of the routes.
+
+    A client over its own limit gets an immediate 429. Otherwise the request
+    waits up to ``queue_timeout`` for a route slot and a global slot; if a
+    queue is full, the wait times out, or a more urgent request sheds it, it
+    gets a 503. Both carry ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        queue_size: int = 128,
+        queue_timeout: float = 2.0,
+        client_max_concurrency: int = 0,
+        route_limits: Optional[Mapping[str, int]] = None,
+    ):
+        self.queue_timeout = queue_timeout
+        self.client_max_concurrency = client_max_concurrency
+        self.limiter = ConcurrencyLimiter("global", max_concurrency, queue_size) if max_concurrency > 0 else None
+        self.route_limiters = {
+            route: ConcurrencyLimiter(route, limit, queue_size)
+            for route, limit in (ROUTE_LIMITS if route_limits is None else route_limits).items()
+            if limit > 0
+        }
+        self._clients: Dict[str, int] = {}
+
+    @property
+    def retry_after(self) -> float:
+        return max(1.0, math.ceil(self.queue_timeout))
+
+    @asynccontextmanager
+    async def admit(self, route: str, client: str, priority: int) -> AsyncIterator[None]:
+        in_flight = self._clients.get(client, 0)
+        if self.client_max_concurrency and in_flight >= self.client_max_concurrency:
+            raise Rejected(429, "client_limit", 1.0)
+        self._clients[client] = in_flight + 1
+
+        held: List[ConcurrencyLimiter] = []
+        try:
+            started = time.perf_counter()
+            limiters = [self.route_limiters.get(route), self.limiter]
+            for limiter in (limiter for limiter in limiters if limiter is not None):
+                timeout = self.queue_timeout - (time.perf_counter() - started)
+                reason = await limiter.acquire(priority, timeout) if timeout > 0 else "queue_timeout"
+                if reason is not None:
+                    raise Rejected(503, reason, self.retry_after)
+                held.append(limiter)
+            waited = time.perf_counter() - started
+            if waited > 0.001:
+                admission_queued.labels(route).inc()
+                admission_queue_wait.labels(route).observe(waited)
+            yield
+        finally:
+            for limiter in reversed(held):
+                limiter.release()
+            self._clients[client] -= 1
+            if not self._clients[client]:
+                del self._clients[client]
+
+
+def parse_route_limits(raw: Optional[str]) -> Optional[Dict[str, int]]:
+    """``ADMISSION_ROUTE_LIMITS``: a JSON object of route template to concurrency limit."""
+    if not raw:
+        return None
+    limits = {route: int(limit) for route, limit in json.loads(raw).items()}
+    unknown = set(limits) - set(ROUTE_PRIORITIES)
+    if unknown:
+        raise ValueError(f"ADMISSION_ROUTE_LIMITS names unknown routes {sorted(unknown)}")
+    return {**ROUTE_LIMITS, **limits}
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware running each ticket request through an ``AdmissionController``.
+
+    Conditional requests (``If-None-Match``) usually end in a cheap 304, so
+    they are admitted with the priority of cheap routes.
+    """
+
+    def __init__(self, app: ASGIApp, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or AdmissionController(
+            max_concurrency=settings.admission_max_concurrency,
+            queue_size=settings.admission_queue_size,
+            queue_timeout=settings.admission_queue_timeout,
+            client_max_concurrency=settings.admission_client_max_concurrency,
+            route_limits=parse_route_limits(settings.admission_route_limits),
+        )
+
+    @staticmethod
+    def _route(scope: Scope) -> Any:
+        app = scope.get("app")
+        for route in getattr(getattr(app, "router", None), "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route
+        return None
+
+    def _client(self, scope: Scope) -> str:
+        header = settings.admission_client_header
+        if header:
+            wanted = header.lower().encode()
+            for name, value in scope.get("headers", ()):
+                if name == wanted:
+                    return bytes(value).decode("latin-1")
+        client = scope.get("client")
+        return str(client[0]) if client else "unknown"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        matched = self._route(scope) if scope["type"] == "http" else None
+        route = getattr(matched, "path", None)
+        if route not in ROUTE_PRIORITIES:
+            await self.app(scope, receive, send)
+            return
+
+        conditional = any(name == b"if-none-match" for name, _ in scope.get("headers", ()))
+        priority = CHEAP if conditional else ROUTE_PRIORITIES[route]
+        try:
+            async with self.controller.admit(route, self._client(scope), priority):
+                await self.app(scope, receive, send)
+        except Rejected as e:
+            admission_rejected.labels(route, e.reason).inc()
+            # The router never saw this request; label its metrics with the route anyway.
+            scope["route"] = matched
+            response = JSONResponse(
+                {"detail": "Too many requests" if e.status_code == 429 else "Server overloaded"},
+                status_code=e.status_code,
+                headers={"Retry-After": str(int(e.retry_after))},
+            )
+            await response(scope, receive, send)
@@ -0,0 +1,209 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from types import ModuleType
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+from .columnar import TicketColumns
+from .models import TicketStats
+from .snapshot import SnapshotLoader, TicketSnapshot, build_stats, unpack_loaded
+
+aioredis: Optional[ModuleType]
+try:
+    import redis.asyncio as _aioredis
+    from redis.exceptions import RedisError
+    aioredis = _aioredis
+except ImportError:  # pragma: no cover - redis is optional at runtime
+    aioredis = None
+    RedisError = ConnectionError  # type: ignore[misc,assignment]
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+class SnapshotCache:
+    """Snapshot tier shared by every worker through Redis.
+
+    Snapshots are stored under versioned keys, and the worker that holds the
+    refresh lock is the only one that goes upstream; the others wait for it
+    and read the result. Without Redis (or when it is unreachable) each
+    process simply loads its own snapshot.
+    """
+
+    KEY_PREFIX = "tickethub:v2"
+
+    def __init__(self, redis_url: Optional[str] = None, lock_timeout: float = 30.0, entry_ttl: float = 600.0):
+        self.lock_timeout = lock_timeout
+        self.entry_ttl = entry_ttl
+        self._local_version = 0
+        self._redis: Any = None
+        if redis_url and aioredis is not None:
+            self._redis = aioredis.from_url(redis_url, socket_connect_timeout=1.0, socket_timeout=lock_timeout)
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    async def get_or_load(self, loader: SnapshotLoader, max_age: float) -> TicketSnapshot:
+        if self._redis is not None:
+            try:
+                return await self._get_or_load_shared(loader, max_age)
+            except RedisError as e:
+                logger.warning(f"Redis unavailable, falling back to process memory: {str(e)}")
+        return await self._load_locally(loader)
+
+    async def _load_locally(self, loader: SnapshotLoader) -> TicketSnapshot:
+        columns, users, missing = unpack_loaded(await loader())
+        # Negative, so it never matches a version published to Redis.
+        self._local_version -= 1
+        return TicketSnapshot(columns=columns, users=users, version=self._local_version, missing_sources=missing)
+
+    async def _get_or_load_shared(self, loader: SnapshotLoader, max_age: float) -> TicketSnapshot:
+        cached = await self._read_current()
+        if cached is not None and cached.age <= max_age:
+            return cached
+
+        lock = self._redis.lock(
+            f"{self.KEY_PREFIX}:refresh-lock",
+            timeout=self.lock_timeout,
+            blocking_timeout=self.lock_timeout,
+        )
+        if not await lock.acquire():
+            raise RedisError("Timed out waiting for the snapshot refresh lock")
+        try:
+            # Another worker may have refreshed while we waited for the lock.
+            cached = await self._read_current()
+            if cached is not None and cached.age <= max_age:
+                return cached
+
+            columns, users, missing = unpack_loaded(await loader())
+            snapshot = TicketSnapshot(
+                columns=columns, users=users, version=0, stats=build_stats(columns), missing_sources=missing
+            )
+            try:
+                await self._write(snapshot)
+            except RedisError as e:
+                logger.warning(f"Could not publish ticket snapshot to Redis: {str(e)}")
+                self._local_version -= 1
+                snapshot.version = self._local_version
+            return snapshot
+        finally:
+            try:
+                await lock.release()
+            except RedisError:
+                pass
+
+    async def _read_current(self) -> Optional[TicketSnapshot]:
+        version = await self._redis.get(f"{self.KEY_PREFIX}:current")
+        if version is None:
+            return None
+        entry = await self._redis.hgetall(f"{self.KEY_PREFIX}:snapshot:{int(version)}")
+        if not entry:
+            return None
+
+        age = max(0.0, time.time() - float(entry[b"updated_at"]))
+        return TicketSnapshot(
+            columns=TicketColumns.loads(entry[b"columns"]),
+            users={int(user_id): name for user_id, name in json.loads(entry[b"users"]).items()},
+            version=int(version),
+            stats=TicketStats.model_validate_json(entry[b"stats"]),
+            fetched_at=time.monotonic() - age,
+            missing_sources=json.loads(entry.get(b"missing", b"[]")),
+        )
+
+    async def _write(self, snapshot: TicketSnapshot) -> None:
+        snapshot.version = int(await self._redis.incr(f"{self.KEY_PREFIX}:version"))
+        key = f"{self.KEY_PREFIX}:snapshot:{snapshot.version}"
+        mapping: Dict[str, Any] = {
+            "columns": snapshot.columns.dumps(),
+            "users": json.dumps(snapshot.users),
+            "stats": (snapshot.stats or build_stats(snapshot.columns)).model_dump_json(),
+            "missing": json.dumps(snapshot.missing_sources),
+            "updated_at": time.time(),
+        }
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, int(self.entry_ttl))
+            pipe.set(f"{self.KEY_PREFIX}:current", snapshot.version)
+            await pipe.execute()
+
+
+class TTLCache(Generic[V]):
+    """Bounded LRU cache whose entries also expire after ``ttl`` seconds.
+
+    The bound is an entry count and, when ``max_bytes`` is set, the sum of
+    ``sizeof`` estimates; the least recently used entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 300.0,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[V], int] = lambda value: 0,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple[float, int, V]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        if key in self._entries:
+            self._drop(key)
+        size = self._sizeof(value) if self.max_bytes else 0
+        self._entries[key] = (time.monotonic() + self.ttl, size, value)
+        self.bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries or (self.max_bytes and self.bytes > self.max_bytes)
+        ):
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        if key in self._entries:
+            self._drop(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def _drop(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
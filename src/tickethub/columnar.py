@@ -0,0 +1,293 @@
+import json
+import struct
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple, Union
+
+from .models import Ticket, TicketStatus, TicketPriority
+
+STATUSES: List[TicketStatus] = list(TicketStatus)
+PRIORITIES: List[TicketPriority] = list(TicketPriority)
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+_PRIORITY_CODES = {priority: code for code, priority in enumerate(PRIORITIES)}
+
+DESCRIPTION_LENGTH = 100
+
+# magic, version, rows, title bytes, assignee table bytes
+_HEADER = struct.Struct("<4sHQQQ")
+_MAGIC = b"THC1"
+
+
+class TicketColumns:
+    """Compact column store for a ticket set.
+
+    Ids and status/priority codes live in typed arrays, assignees are interned
+    into a name table, and all titles share one UTF-8 buffer addressed by
+    offsets. Pydantic ``Ticket`` objects are only built for rows that are
+    actually returned.
+    """
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.statuses = array("b")
+        self.priorities = array("b")
+        self.assignees = array("l")
+        self.assignee_names: List[str] = []
+        self._assignee_codes: Dict[str, int] = {}
+        self._titles: Union[bytearray, memoryview] = bytearray()
+        self._title_offsets = array("q", [0])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_tickets(cls, tickets: Iterable[Ticket]) -> "TicketColumns":
+        columns = cls()
+        for ticket in tickets:
+            columns.append(ticket.id, ticket.title, ticket.status, ticket.priority, ticket.assignee)
+        return columns
+
+    def append(
+        self,
+        id: int,
+        title: str,
+        status: TicketStatus,
+        priority: TicketPriority,
+        assignee: str,
+    ) -> None:
+        titles = self._writable_titles()
+        self.ids.append(id)
+        self.statuses.append(_STATUS_CODES[status])
+        self.priorities.append(_PRIORITY_CODES[priority])
+        self.assignees.append(self._intern(assignee))
+        titles.extend(title.encode())
+        self._title_offsets.append(len(titles))
+
+    def _writable_titles(self) -> bytearray:
+        if not isinstance(self._titles, bytearray):
+            raise TypeError("Attached ticket columns are read-only")
+        return self._titles
+
+    def _intern(self, assignee: str) -> int:
+        code = self._assignee_codes.get(assignee)
+        if code is None:
+            code = len(self.assignee_names)
+            self.assignee_names.append(assignee)
+            self._assignee_codes[assignee] = code
+        return code
+
+    def _title_bytes(self, position: int) -> bytes:
+        return bytes(self._titles[self._title_offsets[position]:self._title_offsets[position + 1]])
+
+    def title(self, position: int) -> str:
+        return self._title_bytes(position).decode()
+
+    def status(self, position: int) -> TicketStatus:
+        return STATUSES[self.statuses[position]]
+
+    def priority(self, position: int) -> TicketPriority:
+        return PRIORITIES[self.priorities[position]]
+
+    def assignee(self, position: int) -> str:
+        return self.assignee_names[self.assignees[position]]
+
+    def ticket(self, position: int) -> Ticket:
+        title = self.title(position)
+        # Rows were validated on the way in, so skip validating them again.
+        return Ticket.model_construct(
+            id=self.ids[position],
+            title=title,
+            status=self.status(position),
+            priority=self.priority(position),
+            assignee=self.assignee(position),
+            description=title[:DESCRIPTION_LENGTH],
+        )
+
+    def tickets(self, positions: Iterable[int]) -> List[Ticket]:
+        return [self.ticket(position) for position in positions]
+
+    def iter_tickets(self) -> Iterator[Ticket]:
+        return (self.ticket(position) for position in range(len(self)))
+
+    def same_row(self, position: int, other: "TicketColumns", other_position: int) -> bool:
+        return (
+            self.ids[position] == other.ids[other_position]
+            and self.statuses[position] == other.statuses[other_position]
+            and self.priorities[position] == other.priorities[other_position]
+            and self.assignee(position) == other.assignee(other_position)
+            and self._title_bytes(position) == other._title_bytes(other_position)
+        )
+
+    def is_sorted(self) -> bool:
+        ids = self.ids
+        return all(ids[i] <= ids[i + 1] for i in range(len(ids) - 1))
+
+    def take(self, positions: Sequence[int]) -> "TicketColumns":
+        columns = TicketColumns()
+        for position in positions:
+            columns.append(
+                self.ids[position],
+                self.title(position),
+                self.status(position),
+                self.priority(position),
+                self.assignee(position),
+            )
+        return columns
+
+    def extend(self, other: "TicketColumns") -> None:
+        """Append every row of ``other``."""
+        titles = self._writable_titles()
+        codes = [self._intern(name) for name in other.assignee_names]
+        base = len(titles)
+        self.ids.extend(other.ids)
+        self.statuses.extend(other.statuses)
+        self.priorities.extend(other.priorities)
+        self.assignees.extend(codes[code] for code in other.assignees)
+        titles.extend(other._titles)
+        self._title_offsets.extend(base + offset for offset in other._title_offsets[1:])
+
+    def id_range(self, start: int, end: Optional[int] = None) -> "TicketColumns":
+        """Copy of the rows with ``start <= id < end``; the columns must be sorted by id."""
+        lo = bisect_left(self.ids, start)
+        hi = bisect_left(self.ids, end) if end is not None else len(self)
+        columns = TicketColumns()
+        columns.extend(self._slice(lo, hi))
+        return columns
+
+    def _slice(self, lo: int, hi: int) -> "TicketColumns":
+        view = TicketColumns()
+        view.ids = self.ids[lo:hi]
+        view.statuses = self.statuses[lo:hi]
+        view.priorities = self.priorities[lo:hi]
+        view.assignees = self.assignees[lo:hi]
+        offsets = self._title_offsets[lo:hi + 1]
+        view._titles = self._titles[offsets[0]:offsets[-1]]
+        view._title_offsets = array("q", (offset - offsets[0] for offset in offsets))
+        view.assignee_names = self.assignee_names
+        return view
+
+    def sorted_by_id(self) -> "TicketColumns":
+        if self.is_sorted():
+            return self
+        return self.take(sorted(range(len(self)), key=self.ids.__getitem__))
+
+    def status_counts(self) -> Dict[TicketStatus, int]:
+        return {status: _count(self.statuses, code) for code, status in enumerate(STATUSES)}
+
+    def priority_counts(self) -> Dict[TicketPriority, int]:
+        return {priority: _count(self.priorities, code) for code, priority in enumerate(PRIORITIES)}
+
+    def assignee_counts(self) -> Dict[str, int]:
+        return {self.assignee_names[code]: count for code, count in Counter(self.assignees).items()}
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the column buffers."""
+        arrays = (self.ids, self.statuses, self.priorities, self.assignees, self._title_offsets)
+        names = sum(len(name) + 49 for name in self.assignee_names)
+        return sum(a.itemsize * len(a) for a in arrays) + len(self._titles) + names
+
+    def dumps(self) -> bytes:
+        """Serialize to a flat binary blob (see ``loads``)."""
+        names = json.dumps(self.assignee_names).encode()
+        header = _HEADER.pack(_MAGIC, 1, len(self), len(self._titles), len(names))
+        return b"".join((
+            header,
+            self.ids.tobytes(),
+            self.statuses.tobytes(),
+            self.priorities.tobytes(),
+            self.assignees.tobytes(),
+            self._title_offsets.tobytes(),
+            bytes(self._titles),
+            names,
+        ))
+
+    @classmethod
+    def loads(cls, data: Union[bytes, bytearray, memoryview]) -> "TicketColumns":
+        """Copy a ``dumps`` blob into new columns."""
+        buffers, titles, names = _split(data)
+        columns = cls()
+        for column, buffer in zip(
+            (columns.ids, columns.statuses, columns.priorities, columns.assignees, columns._title_offsets),
+            buffers,
+        ):
+            del column[:]
+            column.frombytes(buffer.cast("B"))
+        columns._titles = bytearray(titles)
+        columns._set_names(names)
+        return columns
+
+    @classmethod
+    def attach(cls, buffer: Any) -> "TicketColumns":
+        """Read-only columns over a ``dumps`` blob in ``buffer`` (e.g. an mmap).
+
+        Nothing is copied: every column is a ``memoryview`` into the buffer,
+        which stays alive for as long as the columns do. ``append`` is not
+        available on attached columns.
+        """
+        buffers, titles, names = _split(buffer)
+        columns = cls()
+        columns.ids, columns.statuses, columns.priorities, columns.assignees, columns._title_offsets = buffers
+        columns._titles = titles
+        columns._set_names(names)
+        return columns
+
+    def _set_names(self, names: List[str]) -> None:
+        self.assignee_names = names
+        self._assignee_codes = {name: code for code, name in enumerate(names)}
+
+
+def _split(data: Any) -> Tuple[List[Any], memoryview, List[str]]:
+    view = memoryview(data)
+    magic, _, rows, title_bytes, names_bytes = _HEADER.unpack_from(view)
+    if magic != _MAGIC:
+        raise ValueError("Not a ticket column blob")
+
+    buffers = []
+    offset = _HEADER.size
+    layout: Tuple[Tuple[Literal["b", "l", "q"], int], ...] = (
+        ("q", rows), ("b", rows), ("b", rows), ("l", rows), ("q", rows + 1)
+    )
+    for typecode, count in layout:
+        size = array(typecode).itemsize * count
+        buffers.append(view[offset:offset + size].cast(typecode))
+        offset += size
+    titles = view[offset:offset + title_bytes]
+    offset += title_bytes
+    names = json.loads(bytes(view[offset:offset + names_bytes]))
+    return buffers, titles, names
+
+
+def _count(column: Any, code: int) -> int:
+    if isinstance(column, array):
+        return column.count(code)
+    # Attached int8 columns: count the raw bytes instead of boxing each value.
+    return int(column.tobytes().count(bytes([code])))
+
+
+def merge_diff(old: TicketColumns, new: TicketColumns) -> Tuple[List[int], List[Tuple[int, int]], List[int]]:
+    """Positions added to ``new``, changed between both, and removed from ``old``.
+
+    Both column sets must be sorted by id; they are walked once in lockstep.
+    """
+    added: List[int] = []
+    updated: List[Tuple[int, int]] = []
+    removed: List[int] = []
+    i = j = 0
+    old_ids, new_ids = old.ids, new.ids
+    while i < len(old_ids) and j < len(new_ids):
+        if old_ids[i] == new_ids[j]:
+            if not old.same_row(i, new, j):
+                updated.append((i, j))
+            i += 1
+            j += 1
+        elif old_ids[i] < new_ids[j]:
+            removed.append(i)
+            i += 1
+        else:
+            added.append(j)
+            j += 1
+    removed.extend(range(i, len(old_ids)))
+    added.extend(range(j, len(new_ids)))
+    return added, updated, removed
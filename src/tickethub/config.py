@@ -0,0 +1,140 @@
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return value.strip().lower() in ("1", "true", "yes", "on") if value else default
+
+
+@dataclass(frozen=True)
+class Settings:
+    snapshot_refresh_interval: float = 60.0
+    snapshot_max_staleness: float = 300.0
+    snapshot_file: Optional[str] = None
+    snapshot_file_save_interval: float = 300.0
+    snapshot_file_max_age: float = 86400.0
+    shared_snapshot_dir: Optional[str] = None
+    ingest_page_size: int = 100
+    ingest_concurrency: int = 4
+    batch_concurrency: int = 10
+    detail_cache_max_entries: int = 10000
+    detail_cache_max_bytes: int = 0
+    detail_cache_ttl: float = 300.0
+    detail_negative_ttl: float = 15.0
+    user_directory_ttl: float = 300.0
+    user_negative_ttl: float = 60.0
+    user_lookup_batch_size: int = 100
+    http_cache_max_age: int = 5
+    response_cache_max_entries: int = 1024
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+    redis_url: Optional[str] = None
+    cache_lock_timeout: float = 30.0
+    external_api_base_url: str = "https://dummyjson.com"
+    upstream_max_connections: int = 100
+    upstream_max_keepalive: int = 20
+    upstream_keepalive_expiry: float = 5.0
+    upstream_http2: bool = False
+    upstream_connect_timeout: float = 2.0
+    upstream_list_timeout: float = 10.0
+    upstream_detail_timeout: float = 3.0
+    upstream_retries: int = 2
+    upstream_retry_backoff: float = 0.1
+    upstream_retry_max_backoff: float = 2.0
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: float = 30.0
+    request_timeout: float = 10.0
+    changes_buffer_size: int = 32
+    changes_history: int = 256
+    changes_max_delta: int = 1000
+    changes_max_subscribers: int = 1000
+    changes_heartbeat: float = 15.0
+    admission_max_concurrency: int = 64
+    admission_queue_size: int = 128
+    admission_queue_timeout: float = 2.0
+    admission_client_max_concurrency: int = 0
+    admission_client_header: Optional[str] = None
+    admission_route_limits: Optional[str] = None
+    request_timeout_max: float = 30.0
+    upstream_hedge: bool = False
+    upstream_hedge_quantile: float = 0.95
+    upstream_hedge_min_delay: float = 0.01
+    ticket_source: str = "dummyjson"
+    ticket_source_todos: Optional[str] = None
+    ticket_source_users: Optional[str] = None
+    ticket_sources: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            snapshot_refresh_interval=_env_float("SNAPSHOT_REFRESH_INTERVAL", cls.snapshot_refresh_interval),
+            snapshot_max_staleness=_env_float("SNAPSHOT_MAX_STALENESS", cls.snapshot_max_staleness),
+            snapshot_file=os.getenv("SNAPSHOT_FILE") or None,
+            snapshot_file_save_interval=_env_float("SNAPSHOT_FILE_SAVE_INTERVAL", cls.snapshot_file_save_interval),
+            snapshot_file_max_age=_env_float("SNAPSHOT_FILE_MAX_AGE", cls.snapshot_file_max_age),
+            shared_snapshot_dir=os.getenv("SHARED_SNAPSHOT_DIR") or None,
+            ingest_page_size=_env_int("INGEST_PAGE_SIZE", cls.ingest_page_size),
+            ingest_concurrency=_env_int("INGEST_CONCURRENCY", cls.ingest_concurrency),
+            batch_concurrency=_env_int("BATCH_CONCURRENCY", cls.batch_concurrency),
+            detail_cache_max_entries=_env_int("DETAIL_CACHE_MAX_ENTRIES", cls.detail_cache_max_entries),
+            detail_cache_max_bytes=_env_int("DETAIL_CACHE_MAX_BYTES", cls.detail_cache_max_bytes),
+            detail_cache_ttl=_env_float("DETAIL_CACHE_TTL", cls.detail_cache_ttl),
+            detail_negative_ttl=_env_float("DETAIL_NEGATIVE_TTL", cls.detail_negative_ttl),
+            user_directory_ttl=_env_float("USER_DIRECTORY_TTL", cls.user_directory_ttl),
+            user_negative_ttl=_env_float("USER_NEGATIVE_TTL", cls.user_negative_ttl),
+            user_lookup_batch_size=_env_int("USER_LOOKUP_BATCH_SIZE", cls.user_lookup_batch_size),
+            http_cache_max_age=_env_int("HTTP_CACHE_MAX_AGE", cls.http_cache_max_age),
+            response_cache_max_entries=_env_int("RESPONSE_CACHE_MAX_ENTRIES", cls.response_cache_max_entries),
+            response_cache_max_bytes=_env_int("RESPONSE_CACHE_MAX_BYTES", cls.response_cache_max_bytes),
+            redis_url=os.getenv("REDIS_URL") or None,
+            cache_lock_timeout=_env_float("CACHE_LOCK_TIMEOUT", cls.cache_lock_timeout),
+            external_api_base_url=os.getenv("EXTERNAL_API_BASE_URL") or cls.external_api_base_url,
+            upstream_max_connections=_env_int("UPSTREAM_MAX_CONNECTIONS", cls.upstream_max_connections),
+            upstream_max_keepalive=_env_int("UPSTREAM_MAX_KEEPALIVE", cls.upstream_max_keepalive),
+            upstream_keepalive_expiry=_env_float("UPSTREAM_KEEPALIVE_EXPIRY", cls.upstream_keepalive_expiry),
+            upstream_http2=_env_bool("UPSTREAM_HTTP2", cls.upstream_http2),
+            upstream_connect_timeout=_env_float("UPSTREAM_CONNECT_TIMEOUT", cls.upstream_connect_timeout),
+            upstream_list_timeout=_env_float("UPSTREAM_LIST_TIMEOUT", cls.upstream_list_timeout),
+            upstream_detail_timeout=_env_float("UPSTREAM_DETAIL_TIMEOUT", cls.upstream_detail_timeout),
+            upstream_retries=_env_int("UPSTREAM_RETRIES", cls.upstream_retries),
+            upstream_retry_backoff=_env_float("UPSTREAM_RETRY_BACKOFF", cls.upstream_retry_backoff),
+            upstream_retry_max_backoff=_env_float("UPSTREAM_RETRY_MAX_BACKOFF", cls.upstream_retry_max_backoff),
+            breaker_failure_threshold=_env_int("BREAKER_FAILURE_THRESHOLD", cls.breaker_failure_threshold),
+            breaker_reset_timeout=_env_float("BREAKER_RESET_TIMEOUT", cls.breaker_reset_timeout),
+            request_timeout=_env_float("REQUEST_TIMEOUT", cls.request_timeout),
+            changes_buffer_size=_env_int("CHANGES_BUFFER_SIZE", cls.changes_buffer_size),
+            changes_history=_env_int("CHANGES_HISTORY", cls.changes_history),
+            changes_max_delta=_env_int("CHANGES_MAX_DELTA", cls.changes_max_delta),
+            changes_max_subscribers=_env_int("CHANGES_MAX_SUBSCRIBERS", cls.changes_max_subscribers),
+            changes_heartbeat=_env_float("CHANGES_HEARTBEAT", cls.changes_heartbeat),
+            admission_max_concurrency=_env_int("ADMISSION_MAX_CONCURRENCY", cls.admission_max_concurrency),
+            admission_queue_size=_env_int("ADMISSION_QUEUE_SIZE", cls.admission_queue_size),
+            admission_queue_timeout=_env_float("ADMISSION_QUEUE_TIMEOUT", cls.admission_queue_timeout),
+            admission_client_max_concurrency=_env_int(
+                "ADMISSION_CLIENT_MAX_CONCURRENCY", cls.admission_client_max_concurrency
+            ),
+            admission_client_header=os.getenv("ADMISSION_CLIENT_HEADER") or None,
+            admission_route_limits=os.getenv("ADMISSION_ROUTE_LIMITS") or None,
+            request_timeout_max=_env_float("REQUEST_TIMEOUT_MAX", cls.request_timeout_max),
+            upstream_hedge=_env_bool("UPSTREAM_HEDGE", cls.upstream_hedge),
+            upstream_hedge_quantile=_env_float("UPSTREAM_HEDGE_QUANTILE", cls.upstream_hedge_quantile),
+            upstream_hedge_min_delay=_env_float("UPSTREAM_HEDGE_MIN_DELAY", cls.upstream_hedge_min_delay),
+            ticket_source=(os.getenv("TICKET_SOURCE") or cls.ticket_source).strip().lower(),
+            ticket_source_todos=os.getenv("TICKET_SOURCE_TODOS") or None,
+            ticket_source_users=os.getenv("TICKET_SOURCE_USERS") or None,
+            ticket_sources=os.getenv("TICKET_SOURCES") or None,
+        )
+
+
+settings = Settings.from_env()
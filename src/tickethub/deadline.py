@@ -0,0 +1,130 @@
+import asyncio
+import contextvars
+import math
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Union
+
+import httpx
+from fastapi import HTTPException, Request
+
+from .config import settings
+
+DEADLINE_HEADER = "X-Request-Timeout"
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request has used up its time budget."""
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """Point on the event loop clock by which a request must be answered."""
+
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(asyncio.get_running_loop().time() + seconds)
+
+    def remaining(self) -> float:
+        return self.expires_at - asyncio.get_running_loop().time()
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def current() -> Optional[Deadline]:
+    """Deadline of the current request, or ``None`` outside of one."""
+    return _current.get()
+
+
+def latest(a: Optional[Deadline], b: Optional[Deadline]) -> Optional[Deadline]:
+    """The later of two deadlines; ``None`` (no deadline) is later than any."""
+    if a is None or b is None:
+        return None
+    return a if a.expires_at >= b.expires_at else b
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current request, or ``None`` outside of one."""
+    deadline = _current.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+@asynccontextmanager
+async def within(deadline: Optional[Deadline]) -> AsyncIterator[None]:
+    """Run the block under ``deadline``: it is cancelled when time runs out and
+    code below it (upstream calls, retries) can see how much time is left.
+
+    A nested deadline never extends the one it runs under.
+    """
+    if deadline is None:
+        yield
+        return
+    outer = _current.get()
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        async with asyncio.timeout_at(deadline.expires_at):
+            yield
+    except TimeoutError as e:
+        raise DeadlineExceeded("Request deadline exceeded") from e
+    finally:
+        _current.reset(token)
+
+
+def detached(deadline: Optional[Deadline] = None) -> contextvars.Context:
+    """Copy of the current context for tasks that outlive the request.
+
+    The task runs under ``deadline`` instead of the request's: for work
+    shared by several requests, the latest of their deadlines, so timeouts
+    and retries below it stop once nobody is left to use the answer.
+    The deadline is only visible through ``remaining()``; it does not cancel
+    the task.
+    """
+    context = contextvars.copy_context()
+    context.run(_current.set, deadline)
+    return context
+
+
+def extend(context: contextvars.Context, deadline: Optional[Deadline]) -> None:
+    """Let a task started with ``detached()`` run until ``deadline`` as well."""
+    context.run(_current.set, latest(context.get(_current), deadline))
+
+
+def cap_timeout(timeout: Union[httpx.Timeout, Any], default: httpx.Timeout) -> Union[httpx.Timeout, Any]:
+    """Shorten an httpx timeout so no phase of the call outlives the current deadline."""
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    base = default if timeout is httpx.USE_CLIENT_DEFAULT else timeout
+
+    def cap(value: Optional[float]) -> float:
+        return left if value is None else min(value, left)
+
+    return httpx.Timeout(connect=cap(base.connect), read=cap(base.read), write=cap(base.write), pool=cap(base.pool))
+
+
+def request_deadline(default: Optional[float] = None) -> Callable[[Request], Awaitable[Deadline]]:
+    """Dependency giving each request a deadline: the ``X-Request-Timeout``
+    header in seconds if sent, else the route's ``default``, at most
+    ``REQUEST_TIMEOUT_MAX``."""
+
+    async def dependency(request: Request) -> Deadline:
+        seconds = default if default is not None else settings.request_timeout
+        header = request.headers.get(DEADLINE_HEADER)
+        if header is not None:
+            try:
+                seconds = float(header)
+            except ValueError:
+                seconds = math.nan
+            if not seconds > 0:
+                raise HTTPException(status_code=400, detail=f"Invalid {DEADLINE_HEADER} header")
+        return Deadline.after(min(seconds, settings.request_timeout_max))
+
+    return dependency
@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+from enum import Enum
+from typing import AsyncIterator, Iterable, Iterator, List
+
+from .columnar import DESCRIPTION_LENGTH, TicketColumns
+
+EXPORT_FIELDS = ["id", "title", "status", "priority", "assignee", "description"]
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        return "application/x-ndjson" if self is ExportFormat.NDJSON else "text/csv"
+
+
+def _rows(columns: TicketColumns, positions: Iterable[int]) -> Iterator[List[object]]:
+    for position in positions:
+        title = columns.title(position)
+        yield [
+            columns.ids[position],
+            title,
+            columns.status(position).value,
+            columns.priority(position).value,
+            columns.assignee(position),
+            title[:DESCRIPTION_LENGTH],
+        ]
+
+
+def _ndjson_chunks(rows: Iterator[List[object]], chunk_rows: int) -> Iterator[bytes]:
+    lines: List[str] = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False))
+        if len(lines) >= chunk_rows:
+            yield ("\n".join(lines) + "\n").encode()
+            lines.clear()
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def _csv_chunks(rows: Iterator[List[object]], chunk_rows: int) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def stream_export(
+    columns: TicketColumns,
+    positions: Iterable[int],
+    fmt: ExportFormat,
+    chunk_rows: int = 500,
+) -> AsyncIterator[bytes]:
+    """Render matching rows chunk by chunk straight from the columns.
+
+    Only one chunk is held at a time and the next one is rendered only after
+    the server has handed the previous one to the client, so memory stays flat
+    and a slow reader slows the export down instead of buffering it.
+    """
+    render = _ndjson_chunks if fmt is ExportFormat.NDJSON else _csv_chunks
+    for chunk in render(_rows(columns, positions), chunk_rows):
+        yield chunk
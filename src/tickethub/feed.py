@@ -0,0 +1,193 @@
+import asyncio
+import json
+import secrets
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from .metrics import change_feed_dropped, change_feed_published, change_feed_subscribers
+from .snapshot import TicketChanges, TicketSnapshot
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+class FeedFull(Exception):
+    """Raised when the feed already has its maximum number of subscribers."""
+
+
+@dataclass(frozen=True)
+class FeedEvent:
+    """One server-sent event, encoded once and written to every subscriber."""
+
+    cursor: Optional[str]
+    kind: str
+    frame: bytes
+
+    @classmethod
+    def build(cls, cursor: Optional[str], kind: str, data: Dict[str, Any]) -> "FeedEvent":
+        lines = [f"id: {cursor}"] if cursor is not None else []
+        lines += [f"event: {kind}", f"data: {json.dumps(data, separators=(',', ':'))}"]
+        return cls(cursor, kind, ("\n".join(lines) + "\n\n").encode())
+
+
+class _Subscriber:
+    def __init__(self, buffer_size: int):
+        self.queue: "asyncio.Queue[FeedEvent]" = asyncio.Queue(buffer_size)
+        self.dropped = False
+
+    def offer(self, event: FeedEvent) -> bool:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def drop(self, resync: FeedEvent) -> None:
+        """Replace everything still buffered with one resync event."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(resync)
+        self.dropped = True
+
+
+class ChangeFeed:
+    """Fans ticket snapshot diffs out to server-sent event subscribers.
+
+    Each new snapshot is turned into one ``changes`` event (added and updated
+    tickets, removed ids, current stats), serialised once and offered to
+    every subscriber's bounded buffer. A subscriber whose buffer is full is
+    dropped: its backlog is replaced with a ``resync`` event and its stream
+    ends, so it reloads ``/tickets`` instead of holding everyone else up.
+
+    Event ids are ``<epoch>-<sequence>``; a client resuming with an id from
+    this process's recent history gets the events it missed, anything else
+    (another worker, a restart, too old) gets a ``resync`` and then live
+    events. A diff larger than ``max_delta`` tickets is also sent as a
+    ``resync``.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = 32,
+        history: int = 256,
+        max_delta: int = 1000,
+        max_subscribers: int = 1000,
+        heartbeat: float = 15.0,
+    ):
+        self.buffer_size = max(1, buffer_size)
+        self.max_delta = max_delta
+        self.max_subscribers = max_subscribers
+        self.heartbeat = heartbeat
+        self._epoch = secrets.token_hex(4)
+        self._sequence = 0
+        self._history: Deque[Tuple[int, FeedEvent]] = deque(maxlen=history)
+        self._subscribers: Set[_Subscriber] = set()
+        self._stats: Optional[Dict[str, Any]] = None
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def cursor(self) -> str:
+        return f"{self._epoch}-{self._sequence}"
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    @staticmethod
+    def _stats_of(snapshot: TicketSnapshot) -> Optional[Dict[str, Any]]:
+        if snapshot.stats is None:
+            return None
+        stats = snapshot.stats.model_dump(mode="json")
+        stats["missing_sources"] = list(snapshot.missing_sources)
+        return stats
+
+    def publish(self, snapshot: TicketSnapshot, changes: TicketChanges) -> None:
+        """Store listener: turn one snapshot diff into an event for every subscriber."""
+        self._stats = self._stats_of(snapshot)
+        if not changes:
+            return
+        self._sequence += 1
+        size = len(changes.added) + len(changes.updated) + len(changes.removed)
+        if size > self.max_delta:
+            event = FeedEvent.build(self.cursor, "resync", {"reason": "too_many_changes", "stats": self._stats})
+        else:
+            event = FeedEvent.build(self.cursor, "changes", {
+                "added": [ticket.model_dump(mode="json") for ticket in changes.added_tickets()],
+                "updated": [new.model_dump(mode="json") for _, new in changes.updated_tickets()],
+                "removed": [changes.old.ids[position] for position in changes.removed],
+                "stats": self._stats,
+            })
+        self._history.append((self._sequence, event))
+        self.published += 1
+        change_feed_published.inc()
+
+        for subscriber in list(self._subscribers):
+            if not subscriber.offer(event):
+                self._drop(subscriber)
+
+    def _resync(self, reason: str) -> FeedEvent:
+        return FeedEvent.build(self.cursor, "resync", {"reason": reason, "stats": self._stats})
+
+    def _drop(self, subscriber: _Subscriber) -> None:
+        subscriber.drop(self._resync("slow_consumer"))
+        self._remove(subscriber)
+        self.dropped += 1
+        change_feed_dropped.inc()
+
+    def _remove(self, subscriber: _Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        change_feed_subscribers.set(len(self._subscribers))
+
+    def _backlog(self, since: str) -> List[FeedEvent]:
+        epoch, _, sequence = since.rpartition("-")
+        if epoch != self._epoch or not sequence.isdigit() or int(sequence) > self._sequence:
+            return [self._resync("unknown_cursor")]
+        after = int(sequence)
+        oldest = self._history[0][0] if self._history else self._sequence + 1
+        if after + 1 < oldest:
+            return [self._resync("cursor_expired")]
+        return [event for number, event in self._history if number > after]
+
+    def subscribe(self, snapshot: TicketSnapshot, since: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Event stream for one subscriber, registered once iteration starts.
+
+        The stream opens with a ``ready`` event carrying the current cursor
+        and ``snapshot``'s stats, then replays what was missed since
+        ``since``, if given.
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            raise FeedFull(f"Change feed has {len(self._subscribers)} subscribers")
+        return self._stream(snapshot, since)
+
+    async def _stream(self, snapshot: TicketSnapshot, since: Optional[str]) -> AsyncIterator[bytes]:
+        subscriber = _Subscriber(self.buffer_size)
+        # Registered in the same step the backlog is read, so no event falls in between.
+        self._subscribers.add(subscriber)
+        change_feed_subscribers.set(len(self._subscribers))
+        ready = FeedEvent.build(None, "ready", {"cursor": self.cursor, "stats": self._stats or self._stats_of(snapshot)})
+        backlog = [ready] + (self._backlog(since) if since else [])
+        try:
+            for event in backlog:
+                yield event.frame
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle stream and notices gone clients.
+                    yield KEEPALIVE
+                    continue
+                yield event.frame
+                if subscriber.dropped and subscriber.queue.empty():
+                    return
+        finally:
+            self._remove(subscriber)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "cursor": self.cursor,
+        }
@@ -1,44 +1,92 @@
-from typing import Optional
+import math
+from typing import Any, AsyncIterator, Optional
 from fastapi import HTTPException, Depends
 import logging
 
-from .models import TicketList, TicketDetail, TicketStats, TicketStatus, TicketPriority
-from .services import get_service, DummyJSONService
+from .conditional import Validators, make_etag
+from .deadline import Deadline, DeadlineExceeded, within
+from .export import ExportFormat, stream_export
+from .feed import FeedFull
+from .pagination import decode_cursor, encode_cursor
+from .models import TicketBatch, TicketList, TicketDetail, TicketStats, TicketStatus, TicketPriority
+from .services import get_service, DummyJSONService, TicketPage
+from .upstream import CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
 
+def _upstream_unavailable(e: CircuitOpenError) -> HTTPException:
+    logger.warning(f"Failing fast: {str(e)}")
+    return HTTPException(
+        status_code=503,
+        detail="Upstream unavailable",
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
+
+
+def _deadline_exceeded(what: str) -> HTTPException:
+    logger.warning(f"Deadline exceeded {what}")
+    return HTTPException(status_code=504, detail="Request deadline exceeded")
+
+
 class TicketHandler:
     def __init__(self, service: DummyJSONService):
         self.service = service
 
+    @staticmethod
+    def _ticket_list(result: TicketPage, page: Optional[int], limit: int) -> TicketList:
+        tickets = result.tickets
+        return TicketList(
+            tickets=tickets,
+            total=result.total,
+            page=page,
+            limit=limit,
+            has_next=result.has_next,
+            next_cursor=encode_cursor(tickets[-1].id) if result.has_next and tickets else None,
+            missing_sources=result.missing_sources
+        )
+
     async def get_tickets(
         self,
         page: int = 1,
         limit: int = 10,
         status: Optional[TicketStatus] = None,
         priority: Optional[TicketPriority] = None,
+        assignee: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        deadline: Optional[Deadline] = None,
     ) -> TicketList:
         """Get paginated list of tickets with optional filtering."""
+        if cursor is not None:
+            return await self._get_tickets_after(
+                cursor,
+                limit,
+                include_total=bool(include_total),
+                deadline=deadline,
+                status=status,
+                priority=priority,
+                assignee=assignee
+            )
+
         skip = (page - 1) * limit
         
         try:
-            tickets, total = await self.service.get_tickets(
-                skip=skip,
-                limit=limit,
-                status=status,
-                priority=priority
-            )
+            async with within(deadline):
+                result = await self.service.get_tickets(
+                    skip=skip,
+                    limit=limit,
+                    status=status,
+                    priority=priority,
+                    assignee=assignee,
+                    include_total=include_total is not False
+                )
             
-            has_next = skip + limit < total
-            
-            return TicketList(
-                tickets=tickets,
-                total=total,
-                page=page,
-                limit=limit,
-                has_next=has_next
-            )
+            return self._ticket_list(result, page, limit)
+        except DeadlineExceeded:
+            raise _deadline_exceeded("fetching tickets")
+        except CircuitOpenError as e:
+            raise _upstream_unavailable(e)
         except Exception as e:
             logger.error(f"Error fetching tickets: {str(e)}")
             raise HTTPException(status_code=500, detail="Internal server error")
@@ -48,47 +96,187 @@ class TicketHandler:
         query: str,
         page: int = 1,
         limit: int = 10,
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
+        deadline: Optional[Deadline] = None,
     ) -> TicketList:
         """Search tickets by title."""
+        if cursor is not None:
+            return await self._get_tickets_after(
+                cursor, limit, include_total=bool(include_total), deadline=deadline, search=query
+            )
+
         skip = (page - 1) * limit
         
         try:
-            tickets, total = await self.service.get_tickets(
-                skip=skip,
-                limit=limit,
-                search=query
-            )
-            
-            has_next = skip + limit < total
+            async with within(deadline):
+                result = await self.service.get_tickets(
+                    skip=skip,
+                    limit=limit,
+                    search=query,
+                    include_total=include_total is not False
+                )
             
-            return TicketList(
-                tickets=tickets,
-                total=total,
-                page=page,
-                limit=limit,
-                has_next=has_next
-            )
+            return self._ticket_list(result, page, limit)
+        except DeadlineExceeded:
+            raise _deadline_exceeded("searching tickets")
+        except CircuitOpenError as e:
+            raise _upstream_unavailable(e)
         except Exception as e:
             logger.error(f"Error searching tickets: {str(e)}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
-    async def get_ticket_by_id(self, ticket_id: int) -> TicketDetail:
+    async def _get_tickets_after(
+        self,
+        cursor: Optional[str],
+        limit: int,
+        include_total: bool,
+        deadline: Optional[Deadline] = None,
+        **filters: Any,
+    ) -> TicketList:
+        """Get one keyset page resuming after the ticket encoded in the cursor."""
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        try:
+            async with within(deadline):
+                result = await self.service.get_tickets_after(
+                    after=after,
+                    limit=limit,
+                    include_total=include_total,
+                    **filters
+                )
+
+            return self._ticket_list(result, None, limit)
+        except DeadlineExceeded:
+            raise _deadline_exceeded("fetching tickets after cursor")
+        except CircuitOpenError as e:
+            raise _upstream_unavailable(e)
+        except Exception as e:
+            logger.error(f"Error fetching tickets after cursor: {str(e)}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+    async def get_ticket_by_id(self, ticket_id: int, deadline: Optional[Deadline] = None) -> TicketDetail:
         """Get detailed ticket information by ID."""
         try:
-            ticket = await self.service.get_ticket_by_id(ticket_id)
+            async with within(deadline):
+                ticket = await self.service.get_ticket_by_id(ticket_id)
             if not ticket:
                 raise HTTPException(status_code=404, detail="Ticket not found")
             return ticket
         except HTTPException:
             raise
+        except DeadlineExceeded:
+            raise _deadline_exceeded(f"fetching ticket {ticket_id}")
+        except CircuitOpenError as e:
+            raise _upstream_unavailable(e)
         except Exception as e:
             logger.error(f"Error fetching ticket {ticket_id}: {str(e)}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
-    async def get_ticket_stats(self) -> TicketStats:
+    async def get_tickets_batch(self, ticket_ids: list[int], deadline: Optional[Deadline] = None) -> TicketBatch:
+        """Get detailed ticket information for many IDs at once."""
+        try:
+            async with within(deadline):
+                return await self.service.get_tickets_by_ids(ticket_ids)
+        except DeadlineExceeded:
+            raise _deadline_exceeded("fetching ticket batch")
+        except Exception as e:
+            logger.error(f"Error fetching ticket batch: {str(e)}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+    async def get_validators(self, scope: str, deadline: Optional[Deadline] = None) -> Optional[Validators]:
+        """Get cache validators for a response built from the whole ticket set."""
+        try:
+            async with within(deadline):
+                fingerprint, modified_at = await self.service.get_data_version()
+        except DeadlineExceeded:
+            raise _deadline_exceeded(f"computing validators for {scope}")
+        except Exception as e:
+            logger.warning(f"Could not compute validators for {scope}: {str(e)}")
+            return None
+        return Validators(etag=make_etag(f"{fingerprint:016x}", scope), last_modified=modified_at)
+
+    async def get_batch_validators(
+        self, scope: str, ticket_ids: list[int], deadline: Optional[Deadline] = None
+    ) -> Optional[Validators]:
+        """Get cache validators for a batch response built from the requested tickets only."""
+        try:
+            async with within(deadline):
+                digest, modified_at = await self.service.get_tickets_version(ticket_ids)
+        except DeadlineExceeded:
+            raise _deadline_exceeded(f"computing validators for {scope}")
+        except Exception as e:
+            logger.warning(f"Could not compute validators for {scope}: {str(e)}")
+            return None
+        return Validators(etag=make_etag(f"{digest:016x}", scope), last_modified=modified_at)
+
+    async def get_ticket_validators(self, ticket_id: int, deadline: Optional[Deadline] = None) -> Optional[Validators]:
+        """Get cache validators for a single ticket's detail response."""
+        try:
+            async with within(deadline):
+                version = await self.service.get_ticket_version(ticket_id)
+        except DeadlineExceeded:
+            raise _deadline_exceeded(f"computing validators for ticket {ticket_id}")
+        except Exception as e:
+            logger.warning(f"Could not compute validators for ticket {ticket_id}: {str(e)}")
+            return None
+        if version is None:
+            return None
+        digest, modified_at = version
+        return Validators(etag=make_etag(f"{digest:016x}", ticket_id), last_modified=modified_at)
+
+    async def export_tickets(
+        self,
+        fmt: ExportFormat,
+        status: Optional[TicketStatus] = None,
+        priority: Optional[TicketPriority] = None,
+        search: Optional[str] = None,
+        assignee: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> AsyncIterator[bytes]:
+        """Get a chunked export body of every ticket matching the filters."""
+        try:
+            async with within(deadline):
+                columns, positions = await self.service.export_tickets(
+                    status=status,
+                    priority=priority,
+                    search=search,
+                    assignee=assignee
+                )
+        except DeadlineExceeded:
+            raise _deadline_exceeded("exporting tickets")
+        except CircuitOpenError as e:
+            raise _upstream_unavailable(e)
+        except Exception as e:
+            logger.error(f"Error exporting tickets: {str(e)}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+        return stream_export(columns, positions, fmt)
+
+    async def stream_changes(self, since: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Get a server-sent event stream of ticket changes."""
+        try:
+            return await self.service.stream_changes(since)
+        except FeedFull as e:
+            logger.warning(f"Refusing change feed subscriber: {str(e)}")
+            raise HTTPException(status_code=503, detail="Too many subscribers", headers={"Retry-After": "30"})
+        except CircuitOpenError as e:
+            raise _upstream_unavailable(e)
+        except Exception as e:
+            logger.error(f"Error opening change feed: {str(e)}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+    async def get_ticket_stats(self, deadline: Optional[Deadline] = None) -> TicketStats:
         """Get aggregated ticket statistics."""
         try:
-            return await self.service.get_ticket_stats()
+            async with within(deadline):
+                return await self.service.get_ticket_stats()
+        except DeadlineExceeded:
+            raise _deadline_exceeded("fetching ticket stats")
+        except CircuitOpenError as e:
+            raise _upstream_unavailable(e)
         except Exception as e:
             logger.error(f"Error fetching ticket stats: {str(e)}")
             raise HTTPException(status_code=500, detail="Internal server error")
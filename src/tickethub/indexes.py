@@ -0,0 +1,120 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, TypeVar
+
+from .columnar import PRIORITIES, STATUSES, TicketColumns
+from .models import TicketStatus, TicketPriority
+
+K = TypeVar("K")
+
+
+class TicketIndex:
+    """Secondary indexes over the positions of a snapshot's ticket columns.
+
+    Every posting list is sorted because positions are appended in snapshot
+    order, so a single filter is a direct lookup and combined filters walk only
+    the shortest list, probing the others by binary search. Posting lists are
+    compact ``array`` buffers rather than lists of int objects.
+    """
+
+    def __init__(self, columns: TicketColumns):
+        self.size = len(columns)
+        self.ids = columns.ids
+        self.by_status: Dict[TicketStatus, Sequence[int]] = _group(columns.statuses, STATUSES)
+        self.by_priority: Dict[TicketPriority, Sequence[int]] = _group(columns.priorities, PRIORITIES)
+        self.by_assignee: Dict[str, Sequence[int]] = _group(columns.assignees, columns.assignee_names)
+
+    @classmethod
+    def from_postings(cls, columns: TicketColumns, postings: Sequence[Sequence[int]]) -> "TicketIndex":
+        """Index over prebuilt posting lists, in ``postings()`` order."""
+        index = cls.__new__(cls)
+        index.size = len(columns)
+        index.ids = columns.ids
+        statuses, priorities = len(STATUSES), len(PRIORITIES)
+        index.by_status = dict(zip(STATUSES, postings[:statuses]))
+        index.by_priority = dict(zip(PRIORITIES, postings[statuses:statuses + priorities]))
+        index.by_assignee = dict(zip(columns.assignee_names, postings[statuses + priorities:]))
+        return index
+
+    def postings(self) -> List[Sequence[int]]:
+        """Every posting list: statuses, priorities, then assignees in name-table order."""
+        return [*self.by_status.values(), *self.by_priority.values(), *self.by_assignee.values()]
+
+    def position_of(self, ticket_id: int) -> Optional[int]:
+        """Position of ``ticket_id`` in the snapshot, by binary search over ids."""
+        i = bisect_left(self.ids, ticket_id)
+        return i if i < self.size and self.ids[i] == ticket_id else None
+
+    def start_after(self, ticket_id: int) -> int:
+        """First position whose ticket id is greater than ``ticket_id``.
+
+        Relies on snapshots being ordered by ticket id.
+        """
+        return bisect_right(self.ids, ticket_id)
+
+    def select(
+        self,
+        status: Optional[TicketStatus] = None,
+        priority: Optional[TicketPriority] = None,
+        assignee: Optional[str] = None,
+        candidates: Optional[Sequence[int]] = None,
+    ) -> Sequence[int]:
+        """Positions matching every given filter, in snapshot order.
+
+        ``candidates`` is an extra sorted posting list, e.g. search matches.
+        """
+        postings = self._postings(status, priority, assignee, candidates)
+        if not postings:
+            return range(self.size)
+        if len(postings) == 1:
+            return postings[0]
+        return list(self.iter_select(status, priority, assignee, candidates))
+
+    def iter_select(
+        self,
+        status: Optional[TicketStatus] = None,
+        priority: Optional[TicketPriority] = None,
+        assignee: Optional[str] = None,
+        candidates: Optional[Sequence[int]] = None,
+        start: int = 0,
+    ) -> Iterator[int]:
+        """Lazily yield matching positions from ``start`` onwards."""
+        postings = self._postings(status, priority, assignee, candidates)
+        if not postings:
+            return iter(range(start, self.size))
+
+        postings.sort(key=len)
+        shortest, others = postings[0], postings[1:]
+        remaining = islice(shortest, bisect_left(shortest, start), None)
+        return (position for position in remaining if all(_contains(other, position) for other in others))
+
+    def _postings(
+        self,
+        status: Optional[TicketStatus],
+        priority: Optional[TicketPriority],
+        assignee: Optional[str],
+        candidates: Optional[Sequence[int]],
+    ) -> List[Sequence[int]]:
+        postings: List[Sequence[int]] = []
+        if candidates is not None:
+            postings.append(candidates)
+        if status is not None:
+            postings.append(self.by_status[status])
+        if priority is not None:
+            postings.append(self.by_priority[priority])
+        if assignee is not None:
+            postings.append(self.by_assignee.get(assignee, ()))
+        return postings
+
+
+def _group(codes: Sequence[int], keys: Sequence[K]) -> Dict[K, Sequence[int]]:
+    groups = [array("l") for _ in keys]
+    for position, code in enumerate(codes):
+        groups[code].append(position)
+    return dict(zip(keys, groups))
+
+
+def _contains(posting: Sequence[int], position: int) -> bool:
+    i = bisect_left(posting, position)
+    return i < len(posting) and posting[i] == position
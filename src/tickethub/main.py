@@ -1,20 +1,27 @@
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi.responses import PlainTextResponse, RedirectResponse
 import logging
 from contextlib import asynccontextmanager
 
+from .admission import AdmissionMiddleware
+from .metrics import LoopLagMonitor, MetricsMiddleware, registry
 from .routes import router
-from .services import cleanup_service
+from .services import cleanup_service, start_service
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+loop_monitor = LoopLagMonitor()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting TicketHub service")
+    loop_monitor.start()
+    await start_service()
     yield
     logger.info("Shutting down TicketHub service")
+    await loop_monitor.stop()
     await cleanup_service()
 
 
@@ -27,6 +34,9 @@ app = FastAPI(
 
 # Include the ticket routes
 app.include_router(router)
+# Inside MetricsMiddleware, so rejected requests are still timed and counted.
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/", include_in_schema=False)
@@ -34,6 +44,11 @@ async def root():
     return RedirectResponse(url="/docs")
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "TicketHub"}
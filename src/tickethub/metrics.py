@@ -0,0 +1,423 @@
+import asyncio
+import logging
+import re
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[Dict[str, str], float]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, Any] = {}
+
+    def labels(self, *values: str) -> Any:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def _labels_for(self, values: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.extend(self._render_child(self._labels_for(values), child))
+        return lines
+
+    def _render_child(self, labels: Dict[str, str], child: Any) -> List[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _render_child(self, labels: Dict[str, str], child: _Value) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(child.value)}"]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        # One bisect and two additions; cumulative counts are built on scrape.
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _render_child(self, labels: Dict[str, str], child: _HistogramValue) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            le = _format_labels({**labels, "le": _format_value(bound)})
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class CallbackGauge(_Metric):
+    """Gauge (or counter) whose samples are read from ``collect`` at scrape time."""
+
+    def __init__(self, name: str, help: str, collect: Callable[[], Iterable[Sample]], kind: str = "gauge"):
+        super().__init__(name, help)
+        self.kind = kind
+        self._collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            for labels, value in self._collect():
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        except Exception as e:
+            logger.warning(f"Metric collector {self.name} failed: {str(e)}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> Any:
+        self._metrics[metric.name] = metric
+        if not metric.labelnames and not isinstance(metric, CallbackGauge):
+            metric.labels()  # export unlabelled metrics as 0 before first use
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "tickethub_http_request_duration_seconds",
+    "Latency of HTTP requests by route template, method and status code.",
+    ("route", "method", "status"),
+))
+upstream_request_duration = registry.register(Histogram(
+    "tickethub_upstream_request_duration_seconds",
+    "Latency of upstream HTTP calls by endpoint and status code.",
+    ("endpoint", "status"),
+))
+upstream_errors = registry.register(Counter(
+    "tickethub_upstream_errors_total",
+    "Failed upstream HTTP calls by endpoint and error kind.",
+    ("endpoint", "kind"),
+))
+upstream_hedges = registry.register(Counter(
+    "tickethub_upstream_hedged_requests_total",
+    "Backup requests sent for slow idempotent upstream reads, by whether the backup answered first.",
+    ("outcome",),
+))
+admission_rejected = registry.register(Counter(
+    "tickethub_admission_rejected_total",
+    "Requests turned away by admission control, by route and reason.",
+    ("route", "reason"),
+))
+admission_queued = registry.register(Counter(
+    "tickethub_admission_queued_total",
+    "Admitted requests that had to wait for a slot, by route.",
+    ("route",),
+))
+admission_queue_wait = registry.register(Histogram(
+    "tickethub_admission_queue_wait_seconds",
+    "How long admitted requests waited for a slot, by route.",
+    ("route",),
+))
+admission_in_flight = registry.register(Gauge(
+    "tickethub_admission_in_flight",
+    "Requests holding a slot, by limiter (global or route).",
+    ("limiter",),
+))
+admission_queue_depth = registry.register(Gauge(
+    "tickethub_admission_queue_depth",
+    "Requests waiting for a slot, by limiter (global or route).",
+    ("limiter",),
+))
+change_feed_subscribers = registry.register(Gauge(
+    "tickethub_change_feed_subscribers",
+    "Open /tickets/changes event streams.",
+))
+change_feed_published = registry.register(Counter(
+    "tickethub_change_feed_published_total",
+    "Change feed events published to subscribers.",
+))
+change_feed_dropped = registry.register(Counter(
+    "tickethub_change_feed_dropped_total",
+    "Change feed subscribers dropped to a resync because they fell behind.",
+))
+singleflight_calls = registry.register(Counter(
+    "tickethub_singleflight_calls_total",
+    "Calls started by single-flight coalescing, by kind of key.",
+    ("key_kind",),
+))
+singleflight_coalesced = registry.register(Counter(
+    "tickethub_singleflight_coalesced_total",
+    "Callers that joined a call already in flight instead of starting their own, by kind of key.",
+    ("key_kind",),
+))
+singleflight_abandoned = registry.register(Counter(
+    "tickethub_singleflight_abandoned_total",
+    "Shared calls cancelled because every caller gave up, by kind of key.",
+    ("key_kind",),
+))
+user_lookup_batch_size = registry.register(Histogram(
+    "tickethub_user_lookup_batch_size",
+    "Unknown user ids resolved per batched upstream lookup.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250),
+))
+tickets_transformed = registry.register(Counter(
+    "tickethub_tickets_transformed_total",
+    "Upstream todos transformed into tickets.",
+))
+event_loop_lag = registry.register(Gauge(
+    "tickethub_event_loop_lag_seconds",
+    "How late the last event-loop probe woke up.",
+))
+event_loop_lag_histogram = registry.register(Histogram(
+    "tickethub_event_loop_lag_probe_seconds",
+    "Distribution of event-loop probe delays.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+))
+
+_caches: Dict[str, Callable[[], Dict[str, int]]] = {}
+
+
+def register_cache(name: str, stats: Callable[[], Dict[str, int]]) -> None:
+    """Expose a cache's hit/miss counters; ``stats`` must return ``hits`` and ``misses``."""
+    _caches[name] = stats
+
+
+def _cache_samples(field: str) -> Callable[[], Iterable[Sample]]:
+    def collect() -> Iterable[Sample]:
+        for name, stats in list(_caches.items()):
+            yield {"cache": name}, stats()[field]
+    return collect
+
+
+def _cache_hit_ratios() -> Iterable[Sample]:
+    for name, stats in list(_caches.items()):
+        values = stats()
+        lookups = values["hits"] + values["misses"]
+        yield {"cache": name}, values["hits"] / lookups if lookups else 0.0
+
+
+registry.register(CallbackGauge(
+    "tickethub_cache_hits_total", "Cache hits by cache.", _cache_samples("hits"), kind="counter"
+))
+registry.register(CallbackGauge(
+    "tickethub_cache_misses_total", "Cache misses by cache.", _cache_samples("misses"), kind="counter"
+))
+registry.register(CallbackGauge(
+    "tickethub_cache_hit_ratio", "Hits / lookups since start, by cache.", _cache_hit_ratios
+))
+
+_components: Dict[str, Dict[str, Callable[[], Mapping[str, Any]]]] = {"upstream": {}, "user_directory": {}}
+
+
+def register_stats(component: str, name: str, stats: Callable[[], Mapping[str, Any]]) -> None:
+    """Expose an ``upstream`` client's or ``user_directory``'s ``stats``, labelled with ``name``."""
+    _components[component][name] = stats
+
+
+def _stat_samples(component: str, field: str) -> Callable[[], Iterable[Sample]]:
+    def collect() -> Iterable[Sample]:
+        for name, stats in list(_components[component].items()):
+            yield {component: name}, stats()[field]
+    return collect
+
+
+def _circuit_states() -> Iterable[Sample]:
+    for name, stats in list(_components["upstream"].items()):
+        state = stats()["circuit"]
+        for candidate in ("closed", "open", "half_open"):
+            yield {"upstream": name, "state": candidate}, 1.0 if candidate == state else 0.0
+
+
+registry.register(CallbackGauge(
+    "tickethub_upstream_circuit_state", "1 for each upstream's current circuit breaker state.", _circuit_states
+))
+registry.register(CallbackGauge(
+    "tickethub_upstream_consecutive_failures", "Consecutive failed calls, by upstream.",
+    _stat_samples("upstream", "consecutive_failures"),
+))
+registry.register(CallbackGauge(
+    "tickethub_upstream_circuit_opened_total", "Times the circuit breaker opened, by upstream.",
+    _stat_samples("upstream", "circuit_opened"), kind="counter",
+))
+registry.register(CallbackGauge(
+    "tickethub_upstream_retries_total", "Upstream calls retried after a transient failure, by upstream.",
+    _stat_samples("upstream", "retried"), kind="counter",
+))
+registry.register(CallbackGauge(
+    "tickethub_upstream_rejected_total", "Upstream calls failed fast by an open circuit, by upstream.",
+    _stat_samples("upstream", "rejected"), kind="counter",
+))
+registry.register(CallbackGauge(
+    "tickethub_user_directory_entries", "Known usernames, by directory.", _stat_samples("user_directory", "entries")
+))
+registry.register(CallbackGauge(
+    "tickethub_user_directory_unknown", "User ids remembered as unknown, by directory.",
+    _stat_samples("user_directory", "unknown"),
+))
+registry.register(CallbackGauge(
+    "tickethub_user_directory_reloads_total", "Full user directory reloads, by directory.",
+    _stat_samples("user_directory", "reloads"), kind="counter",
+))
+registry.register(CallbackGauge(
+    "tickethub_user_directory_batches_total", "Batched user lookups sent upstream, by directory.",
+    _stat_samples("user_directory", "batches"), kind="counter",
+))
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_label(path: str) -> str:
+    """Collapse numeric path segments so /todos/17 and /todos/18 share a label."""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request.
+
+    Requests are labelled with the matched route template rather than the raw
+    path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "<unmatched>"
+            http_request_duration.labels(template, scope["method"], status).observe(time.perf_counter() - started)
+
+
+class LoopLagMonitor:
+    """Background task that measures how late ``asyncio.sleep`` wakes up."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            event_loop_lag.set(lag)
+            event_loop_lag_histogram.observe(lag)
@@ -1,6 +1,6 @@
 from typing import Optional
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class TicketStatus(str, Enum):
@@ -25,14 +25,36 @@ class Ticket(BaseModel):
 
 class TicketDetail(Ticket):
     raw_data: dict = Field(..., description="Full JSON from external source")
+    _from_snapshot: bool = PrivateAttr(default=False)
+
+    @property
+    def from_snapshot(self) -> bool:
+        """Rebuilt from the snapshot row while upstream was down, not the upstream record."""
+        return self._from_snapshot
+
+
+class TicketBatchItem(BaseModel):
+    id: int
+    ticket: Optional[TicketDetail] = None
+    error: Optional[str] = Field(default=None, description="Why the ticket is missing: not_found or upstream_error")
+
+
+class TicketBatch(BaseModel):
+    items: list[TicketBatchItem]
+    found: int
+    missing: int
 
 
 class TicketList(BaseModel):
     tickets: list[Ticket]
-    total: int
-    page: int
+    total: Optional[int] = Field(..., description="Matching tickets; null for cursor pages unless include_total is set")
+    page: Optional[int] = Field(..., description="Page number; null for cursor pages")
     limit: int
     has_next: bool
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor= to fetch the next page")
+    missing_sources: list[str] = Field(
+        default_factory=list, description="Ticket sources that did not answer in time; their tickets may be stale or absent"
+    )
 
 
 class TicketStats(BaseModel):
@@ -41,3 +63,6 @@ class TicketStats(BaseModel):
     closed_tickets: int
     priority_counts: dict[str, int]
     assignee_counts: dict[str, int]
+    missing_sources: list[str] = Field(
+        default_factory=list, description="Ticket sources that did not answer in time; their tickets may be stale or absent"
+    )
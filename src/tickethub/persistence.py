@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from typing import Optional
+
+from .columnar import TicketColumns
+from .models import TicketStats
+from .snapshot import TicketSnapshot
+from .store import TicketStore
+
+logger = logging.getLogger(__name__)
+
+# magic, format, saved_at, modified_at, fingerprint, crc32 of the payload, meta bytes, column bytes
+_HEADER = struct.Struct("<4sHddQIQQ")
+_MAGIC = b"THS1"
+
+
+class SnapshotFile:
+    """A ticket snapshot on local disk: users, stats and versioning metadata
+    as JSON, followed by the ``TicketColumns`` binary blob.
+
+    Writes go to a temporary file that atomically replaces the old one, so a
+    crash mid-write never leaves a truncated snapshot behind.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, snapshot: TicketSnapshot) -> int:
+        meta = json.dumps({
+            "users": snapshot.users,
+            "stats": snapshot.stats.model_dump() if snapshot.stats is not None else None,
+            "missing_sources": snapshot.missing_sources,
+        }).encode()
+        columns = snapshot.columns.dumps()
+        crc = zlib.crc32(columns, zlib.crc32(meta))
+        header = _HEADER.pack(
+            _MAGIC, 1, time.time(), snapshot.modified_at, snapshot.fingerprint, crc, len(meta), len(columns)
+        )
+
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(meta)
+            f.write(columns)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        return _HEADER.size + len(meta) + len(columns)
+
+    def read(self, max_age: Optional[float] = None) -> Optional[TicketSnapshot]:
+        """Load the saved snapshot, or ``None`` if there is none, it is older
+        than ``max_age`` seconds, or it does not pass its checksum."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        view = memoryview(data)
+        if len(view) < _HEADER.size:
+            logger.warning(f"Ignoring truncated snapshot file {self.path}")
+            return None
+        magic, _, saved_at, modified_at, fingerprint, crc, meta_bytes, column_bytes = _HEADER.unpack_from(view)
+        payload = view[_HEADER.size:]
+        if magic != _MAGIC or len(payload) != meta_bytes + column_bytes or zlib.crc32(payload) != crc:
+            logger.warning(f"Ignoring corrupt snapshot file {self.path}")
+            return None
+
+        age = max(0.0, time.time() - saved_at)
+        if max_age is not None and age > max_age:
+            logger.info(f"Ignoring snapshot file {self.path}, saved {age:.0f}s ago")
+            return None
+
+        meta = json.loads(bytes(payload[:meta_bytes]))
+        return TicketSnapshot(
+            columns=TicketColumns.loads(payload[meta_bytes:]),
+            users={int(user_id): name for user_id, name in meta["users"].items()},
+            # Below every loaded version, so the first refresh always replaces it.
+            version=0,
+            stats=TicketStats.model_validate(meta["stats"]) if meta["stats"] is not None else None,
+            fingerprint=fingerprint,
+            modified_at=modified_at,
+            fetched_at=time.monotonic() - age,
+            missing_sources=meta.get("missing_sources", []),
+        )
+
+
+class SnapshotPersister:
+    """Saves the store's snapshot to a ``SnapshotFile`` every ``interval``
+    seconds and on shutdown, and restores it on startup."""
+
+    def __init__(self, store: TicketStore, path: str, interval: float = 300.0, max_age: Optional[float] = None):
+        self.store = store
+        self.file = SnapshotFile(path)
+        self.interval = interval
+        self.max_age = max_age
+        self._saved: Optional[TicketSnapshot] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def restore(self) -> bool:
+        started = time.perf_counter()
+        try:
+            snapshot = self.file.read(self.max_age)
+        except Exception as e:
+            logger.warning(f"Could not read snapshot file {self.file.path}: {str(e)}")
+            return False
+        if snapshot is None:
+            return False
+        self.store.restore(snapshot)
+        self._saved = snapshot
+        logger.info(
+            f"Restored {len(snapshot.columns)} tickets from {self.file.path} "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return True
+
+    async def save(self) -> bool:
+        """Write the current snapshot unless it is the one already on disk."""
+        snapshot = self.store.snapshot
+        if snapshot is None or snapshot is self._saved:
+            return False
+        started = time.perf_counter()
+        size = await asyncio.to_thread(self.file.write, snapshot)
+        self._saved = snapshot
+        logger.info(
+            f"Saved {len(snapshot.columns)} tickets ({size / 1e6:.1f} MB) to {self.file.path} "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return True
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._save_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.save()
+        except Exception as e:
+            logger.error(f"Could not save snapshot file {self.file.path}: {str(e)}")
+
+    async def _save_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.save()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Could not save snapshot file {self.file.path}: {str(e)}")
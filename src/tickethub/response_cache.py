@@ -0,0 +1,53 @@
+from typing import Dict, Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from .cache import TTLCache
+from .conditional import Validators
+from .config import settings
+from .metrics import register_cache
+
+
+class ResponseCache:
+    """Rendered JSON bodies keyed by ETag.
+
+    ETags already combine the data fingerprint with the normalized query, so
+    an entry can never be served for different data; entries only leave the
+    cache through LRU eviction. Misses are encoded with pydantic-core's
+    ``model_dump_json`` instead of FastAPI's ``jsonable_encoder`` round trip.
+    """
+
+    MEDIA_TYPE = "application/json"
+
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None):
+        self._bodies: TTLCache[bytes] = TTLCache(
+            max_entries=max_entries,
+            ttl=float("inf"),
+            max_bytes=max_bytes,
+            sizeof=len,
+        )
+
+    def get(self, validators: Validators) -> Optional[Response]:
+        body = self._bodies.get(validators.etag)
+        if body is None:
+            return None
+        return Response(content=body, media_type=self.MEDIA_TYPE, headers=validators.headers)
+
+    def render(self, model: BaseModel, validators: Optional[Validators]) -> Response:
+        body = model.model_dump_json().encode()
+        if validators is None:
+            return Response(content=body, media_type=self.MEDIA_TYPE)
+        self._bodies.set(validators.etag, body)
+        return Response(content=body, media_type=self.MEDIA_TYPE, headers=validators.headers)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self._bodies.stats
+
+
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries,
+    max_bytes=settings.response_cache_max_bytes or None,
+)
+register_cache("response", lambda: response_cache.stats)
@@ -1,56 +1,178 @@
-from typing import Optional
-from fastapi import APIRouter, Query, Depends, Path
+from typing import Awaitable, Callable, List, Optional, Union
+from fastapi import APIRouter, Query, Depends, Path, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
-from .models import TicketList, TicketDetail, TicketStats, TicketStatus, TicketPriority
+from .conditional import Validators, apply_validators, is_not_modified, not_modified, request_scope
+from .deadline import Deadline, request_deadline
+from .export import ExportFormat
+from .response_cache import response_cache
+from .models import TicketBatch, TicketList, TicketDetail, TicketStats, TicketStatus, TicketPriority
 from .handlers import TicketHandler, get_ticket_handler
 
 router = APIRouter()
 
+# Time budget of a request that does not send X-Request-Timeout.
+default_deadline = request_deadline()
+
+
+async def _cached_response(
+    request: Request,
+    validators: Optional[Validators],
+    produce: Callable[[], Awaitable[BaseModel]],
+) -> Response:
+    """Answer from the client's cache, our rendered-body cache, or ``produce``."""
+    if validators is not None:
+        if is_not_modified(request, validators):
+            return not_modified(validators)
+        cached = response_cache.get(validators)
+        if cached is not None:
+            return cached
+    return response_cache.render(await produce(), validators)
+
 
 @router.get("/tickets", response_model=TicketList)
 async def get_tickets(
+    request: Request,
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     limit: int = Query(10, ge=1, le=100, description="Items per page"),
     status: Optional[TicketStatus] = Query(None, description="Filter by status"),
     priority: Optional[TicketPriority] = Query(None, description="Filter by priority"),
+    assignee: Optional[str] = Query(None, min_length=1, description="Filter by assignee username"),
+    cursor: Optional[str] = Query(None, description="Resume after a previous page's next_cursor"),
+    include_total: Optional[bool] = Query(None, description="Compute total (default: only for page-based requests)"),
+    deadline: Deadline = Depends(default_deadline),
     handler: TicketHandler = Depends(get_ticket_handler)
 ):
     """Get paginated list of tickets with optional filtering."""
-    return await handler.get_tickets(
+    validators = await handler.get_validators(request_scope(request), deadline=deadline)
+    return await _cached_response(request, validators, lambda: handler.get_tickets(
         page=page,
         limit=limit,
         status=status,
-        priority=priority
-    )
+        priority=priority,
+        assignee=assignee,
+        cursor=cursor,
+        include_total=include_total,
+        deadline=deadline
+    ))
 
 
 @router.get("/tickets/search", response_model=TicketList)
 async def search_tickets(
+    request: Request,
     q: str = Query(..., min_length=1, description="Search query"),
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     limit: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Resume after a previous page's next_cursor"),
+    include_total: Optional[bool] = Query(None, description="Compute total (default: only for page-based requests)"),
+    deadline: Deadline = Depends(default_deadline),
     handler: TicketHandler = Depends(get_ticket_handler)
 ):
     """Search tickets by title."""
-    return await handler.search_tickets(
+    validators = await handler.get_validators(request_scope(request), deadline=deadline)
+    return await _cached_response(request, validators, lambda: handler.search_tickets(
         query=q,
         page=page,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        deadline=deadline
+    ))
+
+
+@router.get("/tickets/export", response_class=StreamingResponse)
+async def export_tickets(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson or csv"),
+    status: Optional[TicketStatus] = Query(None, description="Filter by status"),
+    priority: Optional[TicketPriority] = Query(None, description="Filter by priority"),
+    assignee: Optional[str] = Query(None, min_length=1, description="Filter by assignee username"),
+    q: Optional[str] = Query(None, min_length=1, description="Filter by title search query"),
+    deadline: Deadline = Depends(default_deadline),
+    handler: TicketHandler = Depends(get_ticket_handler)
+) -> Response:
+    """Stream every matching ticket as NDJSON or CSV.
+
+    The deadline covers finding the matches, not streaming them out.
+    """
+    validators = await handler.get_validators(request_scope(request), deadline=deadline)
+    if validators is not None and is_not_modified(request, validators):
+        return not_modified(validators)
+
+    body = await handler.export_tickets(
+        format, status=status, priority=priority, search=q, assignee=assignee, deadline=deadline
+    )
+    response = StreamingResponse(
+        body,
+        media_type=format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="tickets.{format.value}"'}
+    )
+    apply_validators(response, validators)
+    return response
+
+
+@router.get("/tickets/changes", response_class=StreamingResponse)
+async def stream_ticket_changes(
+    request: Request,
+    since: Optional[str] = Query(None, description="Resume after this event id (same as Last-Event-ID)"),
+    handler: TicketHandler = Depends(get_ticket_handler)
+) -> StreamingResponse:
+    """Stream ticket changes and stats as server-sent events."""
+    body = await handler.stream_changes(since or request.headers.get("Last-Event-ID"))
+    return StreamingResponse(
+        body,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
+@router.get("/tickets/batch", response_model=TicketBatch)
+async def get_tickets_batch(
+    request: Request,
+    response: Response,
+    ids: List[int] = Query(..., min_length=1, max_length=200, description="Ticket IDs (repeat the parameter)"),
+    deadline: Deadline = Depends(default_deadline),
+    handler: TicketHandler = Depends(get_ticket_handler)
+) -> Union[Response, TicketBatch]:
+    """Get detailed ticket information for many IDs at once."""
+    validators = await handler.get_batch_validators(request_scope(request), ids, deadline=deadline)
+    if validators is not None and is_not_modified(request, validators):
+        return not_modified(validators)
+
+    result = await handler.get_tickets_batch(ids, deadline=deadline)
+    # Failed items may succeed on retry, so such a body must not be revalidated.
+    if not any(item.error for item in result.items):
+        apply_validators(response, validators)
+    return result
+
+
 @router.get("/tickets/{ticket_id}", response_model=TicketDetail)
 async def get_ticket(
+    request: Request,
+    response: Response,
     ticket_id: int = Path(..., description="Ticket ID"),
+    deadline: Deadline = Depends(default_deadline),
     handler: TicketHandler = Depends(get_ticket_handler)
 ):
     """Get detailed ticket information by ID."""
-    return await handler.get_ticket_by_id(ticket_id)
+    validators = await handler.get_ticket_validators(ticket_id, deadline=deadline)
+    if validators is not None and is_not_modified(request, validators):
+        return not_modified(validators)
+
+    result = await handler.get_ticket_by_id(ticket_id, deadline=deadline)
+    # The validators describe the upstream detail, not a fallback rebuilt from the snapshot.
+    if not result.from_snapshot:
+        apply_validators(response, validators)
+    return result
 
 
 @router.get("/stats", response_model=TicketStats)
 async def get_ticket_stats(
+    request: Request,
+    deadline: Deadline = Depends(default_deadline),
     handler: TicketHandler = Depends(get_ticket_handler)
 ):
     """Get aggregated ticket statistics."""
-    return await handler.get_ticket_stats()
+    validators = await handler.get_validators(request_scope(request), deadline=deadline)
+    return await _cached_response(request, validators, lambda: handler.get_ticket_stats(deadline=deadline))
@@ -0,0 +1,127 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Set
+
+from .columnar import TicketColumns
+from .indexes import _contains
+from .snapshot import TicketChanges
+
+_EMPTY: Set[int] = set()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Inverted index from lower-cased title trigrams to ticket ids.
+
+    Queries of three or more characters are narrowed to the ids sharing every
+    trigram of the query, then confirmed with the same substring check the
+    linear scan uses, so results are identical. ``apply`` only touches
+    the tickets whose titles changed since the previous snapshot.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Set[int]] = {}
+        self._titles: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def add(self, ticket_id: int, title: str) -> None:
+        normalized = title.lower()
+        previous = self._titles.get(ticket_id)
+        if previous == normalized:
+            return
+        if previous is not None:
+            self.remove(ticket_id)
+        self._titles[ticket_id] = normalized
+        for gram in _trigrams(normalized):
+            self._postings.setdefault(gram, set()).add(ticket_id)
+
+    def remove(self, ticket_id: int) -> None:
+        normalized = self._titles.pop(ticket_id, None)
+        if normalized is None:
+            return
+        for gram in _trigrams(normalized):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(ticket_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def apply(self, changes: TicketChanges) -> None:
+        new = changes.new
+        for position in changes.added:
+            self.add(new.ids[position], new.title(position))
+        for _, position in changes.updated:
+            self.add(new.ids[position], new.title(position))
+        for position in changes.removed:
+            self.remove(changes.old.ids[position])
+
+    def search(self, query: str) -> List[int]:
+        """Return the ids whose title contains ``query``, ignoring case."""
+        needle = query.lower()
+        grams = _trigrams(needle)
+        if grams:
+            postings = sorted((self._postings.get(gram, _EMPTY) for gram in grams), key=len)
+            if not postings[0]:
+                return []
+            candidates: Iterable[int] = postings[0].intersection(*postings[1:])
+        else:
+            candidates = self._titles.keys()
+        return [ticket_id for ticket_id in candidates if needle in self._titles[ticket_id]]
+
+
+class FrozenTrigramIndex:
+    """Immutable trigram index over one snapshot's column positions.
+
+    Posting lists are packed into a single positions buffer addressed by
+    ``offsets``, so the whole index can live in a shared, read-only segment
+    and be searched in place. ``search`` returns ticket ids, like
+    ``TrigramIndex``.
+    """
+
+    def __init__(self, columns: TicketColumns, grams: List[str], offsets: Sequence[int], positions: Sequence[int]):
+        self.columns = columns
+        self.grams = grams
+        self.offsets = offsets
+        self.positions = positions
+
+    @classmethod
+    def build(cls, columns: TicketColumns) -> "FrozenTrigramIndex":
+        postings: Dict[str, array] = {}
+        for position in range(len(columns)):
+            for gram in _trigrams(columns.title(position).lower()):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("i")
+                posting.append(position)
+
+        grams = sorted(postings)
+        # int32 positions: this buffer dominates a shared snapshot segment.
+        offsets, positions = array("q", [0]), array("i")
+        for gram in grams:
+            positions.extend(postings[gram])
+            offsets.append(len(positions))
+        return cls(columns, grams, offsets, positions)
+
+    def _posting(self, gram: str) -> Sequence[int]:
+        i = bisect_left(self.grams, gram)
+        if i == len(self.grams) or self.grams[i] != gram:
+            return ()
+        return self.positions[self.offsets[i]:self.offsets[i + 1]]
+
+    def search(self, query: str) -> List[int]:
+        needle = query.lower()
+        grams = _trigrams(needle)
+        candidates: Iterable[int]
+        if grams:
+            postings = sorted((self._posting(gram) for gram in grams), key=len)
+            shortest, others = postings[0], postings[1:]
+            candidates = (p for p in shortest if all(_contains(other, p) for other in others))
+        else:
+            candidates = range(len(self.columns))
+        columns = self.columns
+        return [columns.ids[p] for p in candidates if needle in columns.title(p).lower()]
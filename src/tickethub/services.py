@@ -1,118 +1,389 @@
 import asyncio
-from typing import Optional, Dict, Any, List
+import logging
+from contextlib import aclosing
+from itertools import islice
+from typing import Optional, Dict, Any, AsyncIterator, Iterable, Iterator, List, NamedTuple
 import httpx
-from .models import Ticket, TicketDetail, TicketStats, TicketStatus, TicketPriority
+from .cache import SnapshotCache, TTLCache
+from .columnar import TicketColumns
+from .config import settings
+from .feed import ChangeFeed
+from .models import Ticket, TicketBatch, TicketBatchItem, TicketDetail, TicketStats, TicketStatus, TicketPriority
+from .persistence import SnapshotPersister
+from .shared import SharedSnapshotCache
+from .singleflight import SingleFlight
+from .snapshot import LoadedTickets, TicketChanges, TicketSnapshot, column_digest, sources_digest
+from .metrics import register_cache, register_stats, tickets_transformed
+from .sources import TicketSource, create_source
+from .store import TicketStore
+from .upstream import CircuitOpenError
+from .users import UserDirectory
+
+logger = logging.getLogger(__name__)
+
+
+class TicketPage(NamedTuple):
+    """One page of tickets and the missing sources of the snapshot it was read from."""
+
+    tickets: List[Ticket]
+    total: Optional[int]
+    has_next: bool
+    missing_sources: List[str]
 
 
 class DummyJSONService:
-    BASE_URL = "https://dummyjson.com"
+    def __init__(
+        self,
+        source: Optional[TicketSource] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.flight = SingleFlight()
+        self.source = source or create_source(settings, flight=self.flight, transport=transport)
+        self.users = UserDirectory(
+            self._load_users,
+            self.source.lookup_users,
+            ttl=settings.user_directory_ttl,
+            negative_ttl=settings.user_negative_ttl,
+            max_batch=settings.user_lookup_batch_size,
+            flight=self.flight,
+        )
+        self.store = TicketStore(
+            self._load_tickets,
+            refresh_interval=settings.snapshot_refresh_interval,
+            max_staleness=settings.snapshot_max_staleness,
+            cache=SharedSnapshotCache(
+                settings.shared_snapshot_dir,
+                wait_timeout=settings.cache_lock_timeout,
+            ) if settings.shared_snapshot_dir else SnapshotCache(
+                settings.redis_url,
+                lock_timeout=settings.cache_lock_timeout,
+                entry_ttl=2 * settings.snapshot_max_staleness,
+            ),
+        )
+        self.detail_cache: TTLCache[TicketDetail] = TTLCache(
+            max_entries=settings.detail_cache_max_entries,
+            ttl=settings.detail_cache_ttl,
+            max_bytes=settings.detail_cache_max_bytes or None,
+            sizeof=lambda detail: len(detail.model_dump_json()),
+        )
+        self.not_found_cache: TTLCache[bool] = TTLCache(
+            max_entries=settings.detail_cache_max_entries,
+            ttl=settings.detail_negative_ttl,
+        )
+        self.persister = SnapshotPersister(
+            self.store,
+            settings.snapshot_file,
+            interval=settings.snapshot_file_save_interval,
+            max_age=settings.snapshot_file_max_age,
+        ) if settings.snapshot_file and not settings.shared_snapshot_dir else None
+        self.changes = ChangeFeed(
+            buffer_size=settings.changes_buffer_size,
+            history=settings.changes_history,
+            max_delta=settings.changes_max_delta,
+            max_subscribers=settings.changes_max_subscribers,
+            heartbeat=settings.changes_heartbeat,
+        )
+        self.store.subscribe(self._invalidate_details)
+        self.store.subscribe(self.changes.publish)
+        register_cache("detail", lambda: self.detail_cache.stats)
+        register_cache("not_found", lambda: self.not_found_cache.stats)
+        register_cache("users", lambda: self.users.stats)
+        register_stats("user_directory", "users", lambda: self.users.stats)
     
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
-        self._users_cache: Dict[int, str] = {}
+    async def start(self) -> None:
+        if self.persister is not None:
+            self.persister.restore()
+        await self.store.start()
+        if self.persister is not None:
+            self.persister.start()
     
     async def close(self):
-        await self.client.aclose()
+        if self.persister is not None:
+            await self.persister.stop()
+        await self.store.stop()
+        await self.source.close()
+
+    def _seed_users(self) -> None:
+        if not self.users and self.store.snapshot is not None:
+            # The snapshot may come from the shared cache, so reuse its user map.
+            self.users.seed(self.store.snapshot.users)
     
     async def _get_users(self) -> Dict[int, str]:
-        if not self._users_cache:
-            response = await self.client.get(f"{self.BASE_URL}/users")
-            response.raise_for_status()
-            users_data = response.json()
-            
-            for user in users_data.get("users", []):
-                self._users_cache[user["id"]] = user["username"]
-        
-        return self._users_cache
+        self._seed_users()
+        return await self.users.load()
+
+    async def _resolve_users(self, user_ids: Iterable[int]) -> Dict[int, str]:
+        self._seed_users()
+        return await self.users.resolve_many(user_ids)
+
+    async def _load_users(self) -> Dict[int, str]:
+        users: Dict[int, str] = {}
+        # A source that fails here only costs its users their names.
+        loaded, errors = await self.source.gather(lambda source: self._load_source_users(source, users))
+        if not loaded:
+            raise next(iter(errors.values()))
+        return users
+
+    async def _load_source_users(self, source: TicketSource, users: Dict[int, str]) -> None:
+        async for page in source.users():
+            for user in page:
+                users[user["id"]] = user["username"]
     
     def _calculate_priority(self, ticket_id: int) -> TicketPriority:
         priority_map = {0: TicketPriority.LOW, 1: TicketPriority.MEDIUM, 2: TicketPriority.HIGH}
         return priority_map[ticket_id % 3]
     
+    def _ticket_fields(self, todo_data: dict, users: Dict[int, str]) -> Dict[str, Any]:
+        return {
+            "id": todo_data["id"],
+            "title": todo_data["todo"],
+            "status": TicketStatus.CLOSED if todo_data["completed"] else TicketStatus.OPEN,
+            "priority": self._calculate_priority(todo_data["id"]),
+            "assignee": users.get(todo_data["userId"], f"user_{todo_data['userId']}"),
+        }
+
     async def _transform_ticket(self, todo_data: dict, users: Dict[int, str]) -> Ticket:
-        assignee = users.get(todo_data["userId"], f"user_{todo_data['userId']}")
-        
+        tickets_transformed.inc()
         return Ticket(
-            id=todo_data["id"],
-            title=todo_data["todo"],
-            status=TicketStatus.CLOSED if todo_data["completed"] else TicketStatus.OPEN,
-            priority=self._calculate_priority(todo_data["id"]),
-            assignee=assignee,
+            **self._ticket_fields(todo_data, users),
             description=todo_data["todo"][:100] if len(todo_data["todo"]) > 100 else todo_data["todo"]
         )
     
+    async def _load_tickets(self) -> LoadedTickets:
+        await self._get_users()
+        loaded, errors = await self.source.gather(self._load_source_tickets)
+        if not loaded:
+            raise next(iter(errors.values()))
+        previous = self.store.snapshot
+        parts: List[TicketColumns] = []
+        for source in self.source.sources:
+            part = loaded.get(source.name)
+            if part is None and previous is not None:
+                # Keep serving what the source returned last time, marked as missing.
+                part = previous.columns.id_range(*self.source.id_range(source))
+            if part is not None:
+                parts.append(part)
+        if len(parts) == 1:
+            # One source: nothing to merge, so skip copying every column.
+            return parts[0], dict(self.users.names), sorted(errors)
+        columns = TicketColumns()
+        for part in parts:
+            columns.extend(part)
+        return columns, dict(self.users.names), sorted(errors)
+
+    async def _load_source_tickets(self, source: TicketSource) -> TicketColumns:
+        # Rows go straight into the column store; no Ticket model per row.
+        columns = TicketColumns()
+        start, end = self.source.id_range(source)
+        async with aclosing(source.todos()) as pages:
+            async for todos in pages:
+                # Assignees missing from the directory cost one batched lookup per page.
+                users = await self._resolve_users({todo["userId"] for todo in todos})
+                for todo in todos:
+                    if todo["id"] < start or (end is not None and todo["id"] >= end):
+                        raise ValueError(f"Ticket source {source.name} returned id {todo['id']} outside [{start}, {end})")
+                    columns.append(**self._ticket_fields(todo, users))
+                tickets_transformed.inc(len(todos))
+        return columns
+
+    async def _search_positions(self, snapshot: TicketSnapshot, search: str) -> List[int]:
+        if snapshot.search_index is not None:
+            ticket_ids = snapshot.search_index.search(search)
+            positions = (snapshot.index.position_of(ticket_id) for ticket_id in ticket_ids)
+            return sorted(position for position in positions if position is not None)
+        await self.store.search_ready()
+        # The store's index may already reflect a newer refresh than this snapshot,
+        # so confirm each candidate against the pinned snapshot's own title.
+        needle = search.lower()
+        positions = (snapshot.index.position_of(ticket_id) for ticket_id in self.store.search_index.search(search))
+        return sorted(
+            position for position in positions
+            if position is not None and needle in snapshot.columns.title(position).lower()
+        )
+
     async def get_tickets(
         self, 
         skip: int = 0, 
         limit: int = 30,
         status: Optional[TicketStatus] = None,
         priority: Optional[TicketPriority] = None,
-        search: Optional[str] = None
-    ) -> tuple[List[Ticket], int]:
-        response = await self.client.get(f"{self.BASE_URL}/todos")
-        response.raise_for_status()
-        todos_data = response.json()
+        search: Optional[str] = None,
+        assignee: Optional[str] = None,
+        include_total: bool = True
+    ) -> TicketPage:
+        """Offset page of matching tickets; ``total`` is ``None`` unless ``include_total``."""
+        snapshot = await self.store.get()
         
-        users = await self._get_users()
+        matches = await self._search_positions(snapshot, search) if search else None
+        if not include_total:
+            # Walks only as far as one row past the page, to tell whether there is a next one.
+            selected = snapshot.index.iter_select(status, priority, assignee, matches)
+            window = list(islice(selected, skip, skip + limit + 1))
+            tickets = snapshot.columns.tickets(window[:limit])
+            return TicketPage(tickets, None, len(window) > limit, list(snapshot.missing_sources))
+        positions = snapshot.index.select(status=status, priority=priority, assignee=assignee, candidates=matches)
         
-        tickets = []
-        for todo in todos_data.get("todos", []):
-            ticket = await self._transform_ticket(todo, users)
-            
-            # Apply filters
-            if status and ticket.status != status:
-                continue
-            if priority and ticket.priority != priority:
-                continue
-            if search and search.lower() not in ticket.title.lower():
-                continue
-                
-            tickets.append(ticket)
+        total = len(positions)
+        paginated_tickets = snapshot.columns.tickets(positions[skip:skip + limit])
         
-        total = len(tickets)
-        paginated_tickets = tickets[skip:skip + limit]
+        return TicketPage(paginated_tickets, total, skip + limit < total, list(snapshot.missing_sources))
+
+    async def export_tickets(
+        self,
+        status: Optional[TicketStatus] = None,
+        priority: Optional[TicketPriority] = None,
+        search: Optional[str] = None,
+        assignee: Optional[str] = None
+    ) -> tuple[TicketColumns, Iterator[int]]:
+        """Pin the current snapshot and lazily walk its matching positions."""
+        snapshot = await self.store.get()
         
-        return paginated_tickets, total
+        matches = await self._search_positions(snapshot, search) if search else None
+        return snapshot.columns, snapshot.index.iter_select(status, priority, assignee, matches)
+
+    async def get_tickets_after(
+        self,
+        after: Optional[int] = None,
+        limit: int = 30,
+        status: Optional[TicketStatus] = None,
+        priority: Optional[TicketPriority] = None,
+        search: Optional[str] = None,
+        assignee: Optional[str] = None,
+        include_total: bool = False
+    ) -> TicketPage:
+        """Keyset page of tickets with ids greater than ``after``.
+
+        Only walks as many matches as one page needs; the exact total is
+        computed only when ``include_total`` is set.
+        """
+        snapshot = await self.store.get()
+        index = snapshot.index
+
+        matches = await self._search_positions(snapshot, search) if search else None
+        start = index.start_after(after) if after is not None else 0
+        positions = list(islice(index.iter_select(status, priority, assignee, matches, start=start), limit + 1))
+
+        tickets = snapshot.columns.tickets(positions[:limit])
+        total = len(index.select(status, priority, assignee, matches)) if include_total else None
+
+        return TicketPage(tickets, total, len(positions) > limit, list(snapshot.missing_sources))
+
+    def _invalidate_details(self, snapshot: TicketSnapshot, changes: TicketChanges) -> None:
+        for _, position in changes.updated:
+            self.detail_cache.invalidate(changes.new.ids[position])
+        for position in changes.removed:
+            self.detail_cache.invalidate(changes.old.ids[position])
+        for position in changes.added:
+            self.not_found_cache.invalidate(changes.new.ids[position])
     
     async def get_ticket_by_id(self, ticket_id: int) -> Optional[TicketDetail]:
+        cached = self.detail_cache.get(ticket_id)
+        if cached is not None:
+            return cached
         try:
-            response = await self.client.get(f"{self.BASE_URL}/todos/{ticket_id}")
-            response.raise_for_status()
-            todo_data = response.json()
-            
-            users = await self._get_users()
-            ticket = await self._transform_ticket(todo_data, users)
-            
-            return TicketDetail(
-                **ticket.model_dump(),
-                raw_data=todo_data
-            )
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return None
-            raise
+            return await self._fetch_ticket_detail(ticket_id)
+        except CircuitOpenError:
+            # Upstream is down; the snapshot row is better than an error.
+            fallback = self._detail_from_snapshot(ticket_id)
+            if fallback is None:
+                raise
+            return fallback
     
-    async def get_ticket_stats(self) -> TicketStats:
-        tickets, _ = await self.get_tickets(limit=1000)  # Get all tickets
+    def _detail_from_snapshot(self, ticket_id: int) -> Optional[TicketDetail]:
+        snapshot = self.store.snapshot
+        if snapshot is None:
+            return None
+        position = snapshot.index.position_of(ticket_id)
+        if position is None:
+            return None
+        ticket = snapshot.columns.ticket(position)
+        raw_data: Dict[str, Any] = {
+            "id": ticket.id,
+            "todo": ticket.title,
+            "completed": ticket.status == TicketStatus.CLOSED,
+        }
+        user_id = next((uid for uid, name in snapshot.users.items() if name == ticket.assignee), None)
+        if user_id is not None:
+            raw_data["userId"] = user_id
+        detail = TicketDetail(**ticket.model_dump(), raw_data=raw_data)
+        detail._from_snapshot = True
+        return detail
+
+    async def _fetch_ticket_detail(self, ticket_id: int) -> Optional[TicketDetail]:
+        if self.not_found_cache.get(ticket_id):
+            return None
+        todo_data = await self.source.todo(ticket_id)
+        if todo_data is None:
+            self.not_found_cache.set(ticket_id, True)
+            return None
+
+        users = await self._resolve_users((todo_data["userId"],))
+        ticket = await self._transform_ticket(todo_data, users)
         
-        total_tickets = len(tickets)
-        open_tickets = sum(1 for t in tickets if t.status == TicketStatus.OPEN)
-        closed_tickets = total_tickets - open_tickets
+        detail = TicketDetail(
+            **ticket.model_dump(),
+            raw_data=todo_data
+        )
+        self.detail_cache.set(ticket_id, detail)
+        return detail
+
+    async def get_tickets_by_ids(self, ticket_ids: List[int]) -> TicketBatch:
+        semaphore = asyncio.Semaphore(settings.batch_concurrency)
         
-        priority_counts = {TicketPriority.LOW.value: 0, TicketPriority.MEDIUM.value: 0, TicketPriority.HIGH.value: 0}
-        assignee_counts = {}
+        async def fetch(ticket_id: int) -> TicketBatchItem:
+            ticket = self.detail_cache.get(ticket_id)
+            if ticket is None:
+                # Only cache misses take a slot in the upstream fan-out.
+                async with semaphore:
+                    try:
+                        ticket = await self._fetch_ticket_detail(ticket_id)
+                    except Exception as e:
+                        logger.warning(f"Batch fetch of ticket {ticket_id} failed: {str(e)}")
+                        return TicketBatchItem(id=ticket_id, error="upstream_error")
+            if ticket is None:
+                return TicketBatchItem(id=ticket_id, error="not_found")
+            return TicketBatchItem(id=ticket_id, ticket=ticket)
         
-        for ticket in tickets:
-            priority_counts[ticket.priority.value] += 1
-            assignee_counts[ticket.assignee] = assignee_counts.get(ticket.assignee, 0) + 1
+        unique_ids = list(dict.fromkeys(ticket_ids))
+        items = await asyncio.gather(*(fetch(ticket_id) for ticket_id in unique_ids))
+        found = sum(1 for item in items if item.ticket is not None)
         
-        return TicketStats(
-            total_tickets=total_tickets,
-            open_tickets=open_tickets,
-            closed_tickets=closed_tickets,
-            priority_counts=priority_counts,
-            assignee_counts=assignee_counts
-        )
+        return TicketBatch(items=items, found=found, missing=len(items) - found)
+
+    async def get_data_version(self) -> tuple[int, float]:
+        """Fingerprint of the current ticket set and when it last changed."""
+        snapshot = await self.store.get()
+        # Partial results must not validate against complete ones, or vice versa.
+        return snapshot.fingerprint ^ sources_digest(snapshot.missing_sources), snapshot.modified_at
+
+    async def stream_changes(self, since: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Server-sent events with every ticket diff from now on (or since ``since``)."""
+        snapshot = await self.store.get()
+        return self.changes.subscribe(snapshot, since)
+
+    async def get_tickets_version(self, ticket_ids: List[int]) -> tuple[int, float]:
+        """Digest of the requested tickets' rows and when the ticket set last changed."""
+        snapshot = await self.store.get()
+        digest = 0
+        for ticket_id in dict.fromkeys(ticket_ids):
+            position = snapshot.index.position_of(ticket_id)
+            if position is not None:
+                digest ^= column_digest(snapshot.columns, position)
+        return digest, snapshot.modified_at
+
+    async def get_ticket_version(self, ticket_id: int) -> Optional[tuple[int, float]]:
+        snapshot = await self.store.get()
+        position = snapshot.index.position_of(ticket_id)
+        if position is None:
+            return None
+        return column_digest(snapshot.columns, position), snapshot.modified_at
+
+    async def get_ticket_stats(self) -> TicketStats:
+        snapshot = await self.store.get()
+        stats = self.store.stats.stats
+        if snapshot.missing_sources:
+            stats = stats.model_copy(update={"missing_sources": list(snapshot.missing_sources)})
+        return stats
 
 
 # Global service instance
@@ -123,5 +394,9 @@ async def get_service() -> DummyJSONService:
     return dummy_service
 
 
+async def start_service() -> None:
+    await dummy_service.start()
+
+
 async def cleanup_service():
     await dummy_service.close()
@@ -0,0 +1,242 @@
+import asyncio
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from array import array
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+from .columnar import TicketColumns
+from .indexes import TicketIndex
+from .search_index import FrozenTrigramIndex
+from .snapshot import SnapshotLoader, TicketSnapshot, unpack_loaded
+
+logger = logging.getLogger(__name__)
+
+# magic, format, generation, saved_at (wall clock), table of contents bytes
+_HEADER = struct.Struct("<4sHQdI")
+_MAGIC = b"THG1"
+_ALIGN = 8
+
+
+def _pack(posting_lists: Sequence[Sequence[int]]) -> Tuple[array, array]:
+    offsets, positions = array("q", [0]), array("l")
+    for posting in posting_lists:
+        positions.extend(posting)
+        offsets.append(len(positions))
+    return offsets, positions
+
+
+def _unpack(offsets: Sequence[int], positions: Sequence[int]) -> List[Sequence[int]]:
+    return [positions[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def write_generation(
+    path: str,
+    generation: int,
+    columns: TicketColumns,
+    users: Dict[int, str],
+    missing_sources: Sequence[str] = (),
+) -> None:
+    """Write one generation: columns, filter postings and the title search index,
+    each as a flat buffer that readers can map without parsing or copying."""
+    index = TicketIndex(columns)
+    search = FrozenTrigramIndex.build(columns)
+    posting_offsets, postings = _pack(index.postings())
+    sections: Dict[str, Any] = {
+        "columns": columns.dumps(),
+        "posting_offsets": posting_offsets,
+        "postings": postings,
+        "gram_offsets": search.offsets,
+        "gram_positions": search.positions,
+    }
+
+    layout: Dict[str, List[int]] = {}
+    offset = 0
+    for name, data in sections.items():
+        size = memoryview(data).nbytes
+        layout[name] = [offset, size]
+        offset += size + (-size % _ALIGN)
+    toc = json.dumps({
+        "users": users,
+        "missing_sources": list(missing_sources),
+        "grams": search.grams,
+        "sections": layout,
+    }).encode()
+    header = _HEADER.pack(_MAGIC, 1, generation, time.time(), len(toc))
+    start = _HEADER.size + len(toc)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(toc)
+        f.write(bytes(-start % _ALIGN))
+        for name, data in sections.items():
+            f.write(data)
+            f.write(bytes(-layout[name][1] % _ALIGN))
+    os.replace(tmp, path)
+
+
+def attach_generation(path: str) -> TicketSnapshot:
+    """Map a generation file read-only and wrap it in a snapshot that shares its pages."""
+    with open(path, "rb") as f:
+        # The mapping outlives the descriptor and, once unlinked, the file name.
+        segment = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(segment)
+    magic, _, generation, saved_at, toc_bytes = _HEADER.unpack_from(view)
+    if magic != _MAGIC:
+        raise ValueError(f"{path} is not a ticket snapshot generation")
+    toc = json.loads(bytes(view[_HEADER.size:_HEADER.size + toc_bytes]))
+    start = _HEADER.size + toc_bytes
+    start += -start % _ALIGN
+
+    def section(name: str, typecode: Optional[Literal["i", "l", "q"]] = None) -> Any:
+        offset, size = toc["sections"][name]
+        data = view[start + offset:start + offset + size]
+        return data.cast(typecode) if typecode else data
+
+    columns = TicketColumns.attach(section("columns"))
+    postings = _unpack(section("posting_offsets", "q"), section("postings", "l"))
+    return TicketSnapshot(
+        columns=columns,
+        users={int(user_id): name for user_id, name in toc["users"].items()},
+        version=generation,
+        fetched_at=time.monotonic() - max(0.0, time.time() - saved_at),
+        prebuilt_index=TicketIndex.from_postings(columns, postings),
+        search_index=FrozenTrigramIndex(
+            columns, toc["grams"], section("gram_offsets", "q"), section("gram_positions", "i")
+        ),
+        missing_sources=toc["missing_sources"],
+    )
+
+
+class SharedSnapshotCache:
+    """Snapshot tier shared by the worker processes of one host through files
+    mapped into memory, typically under ``/dev/shm``.
+
+    The worker holding the directory's leader lock is the only one that loads
+    from upstream; it publishes each snapshot as a new generation file and
+    then atomically repoints ``CURRENT`` at it. Every worker, the leader
+    included, serves straight from the mapped generation, so the ticket data
+    and its indexes exist once per host rather than once per worker. A worker
+    swaps generations by replacing its snapshot reference; requests still
+    holding the old one keep its mapping alive until they finish.
+
+    If the leader dies its lock is released and the next worker whose
+    snapshot goes stale takes over.
+    """
+
+    # Generations kept on disk besides the current one, for readers that
+    # looked up CURRENT just before it moved.
+    KEEP_GENERATIONS = 1
+
+    def __init__(self, directory: str, wait_timeout: float = 30.0, poll_interval: float = 0.1):
+        self.directory = directory
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        os.makedirs(directory, exist_ok=True)
+        self._lock_fd: Optional[int] = None
+        self._attached: Optional[TicketSnapshot] = None
+        self._local_version = 0
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_fd is not None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _lead(self) -> bool:
+        if self._lock_fd is None:
+            fd = os.open(self._path("leader.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+            self._lock_fd = fd
+            logger.info(f"Leading shared ticket snapshots in {self.directory} (pid {os.getpid()})")
+        return True
+
+    async def close(self) -> None:
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # releases the leader lock
+            self._lock_fd = None
+
+    def _current_generation(self) -> Optional[int]:
+        try:
+            with open(self._path("CURRENT")) as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def current(self) -> Optional[TicketSnapshot]:
+        """The published snapshot, attaching to it if the generation changed."""
+        generation = self._current_generation()
+        if generation is None:
+            return None
+        if self._attached is not None and self._attached.version == generation:
+            return self._attached
+        try:
+            self._attached = attach_generation(self._path(f"gen-{generation}.bin"))
+        except FileNotFoundError:
+            # Superseded and removed between reading CURRENT and opening it.
+            return self._attached
+        return self._attached
+
+    async def get_or_load(self, loader: SnapshotLoader, max_age: float) -> TicketSnapshot:
+        current = self.current()
+        if current is not None and current.age <= max_age:
+            return current
+        if self._lead():
+            columns, users, missing = unpack_loaded(await loader())
+            generation = (self._current_generation() or 0) + 1
+            await asyncio.to_thread(self._publish, generation, columns, users, missing)
+            return self.current() or TicketSnapshot(
+                columns=columns, users=users, version=generation, missing_sources=missing
+            )
+        if current is not None:
+            # The leader is alive and will publish; keep serving what it last wrote.
+            return current
+        return await self._wait_for_first_generation(loader)
+
+    def _publish(
+        self,
+        generation: int,
+        columns: TicketColumns,
+        users: Dict[int, str],
+        missing_sources: Sequence[str] = (),
+    ) -> None:
+        started = time.perf_counter()
+        write_generation(self._path(f"gen-{generation}.bin"), generation, columns, users, missing_sources)
+        tmp = self._path("CURRENT.tmp")
+        with open(tmp, "w") as f:
+            f.write(str(generation))
+        os.replace(tmp, self._path("CURRENT"))
+        for name in os.listdir(self.directory):
+            if name.startswith("gen-") and name.endswith(".bin"):
+                old = int(name[4:-4])
+                if old < generation - self.KEEP_GENERATIONS:
+                    os.unlink(self._path(name))
+        logger.info(
+            f"Published shared ticket snapshot generation {generation} with {len(columns)} tickets "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+    async def _wait_for_first_generation(self, loader: SnapshotLoader) -> TicketSnapshot:
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            current = self.current()
+            if current is not None:
+                return current
+            if self._lead():
+                return await self.get_or_load(loader, max_age=0)
+        logger.warning("No shared ticket snapshot was published in time; loading one for this process")
+        columns, users, missing = unpack_loaded(await loader())
+        # Negative, so it never matches a published generation number.
+        self._local_version -= 1
+        return TicketSnapshot(columns=columns, users=users, version=self._local_version, missing_sources=missing)
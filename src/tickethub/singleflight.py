@@ -0,0 +1,89 @@
+import asyncio
+import contextvars
+from typing import Any, Callable, Coroutine, Dict, Hashable, Mapping, Optional, TypeVar
+from urllib.parse import urlsplit
+
+from .deadline import current, detached, extend
+from .metrics import endpoint_label, singleflight_abandoned, singleflight_calls, singleflight_coalesced
+
+T = TypeVar("T")
+
+
+def request_key(url: str, params: Optional[Mapping[str, Any]] = None) -> Hashable:
+    return ("GET", url, tuple(sorted((params or {}).items())))
+
+
+def key_kind(key: Hashable) -> str:
+    """Bounded metric label for a key: the endpoint of a ``request_key``, else the key itself."""
+    if isinstance(key, tuple) and len(key) == 3 and key[0] == "GET":
+        return endpoint_label(urlsplit(key[1]).path)
+    return str(key)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one in-flight call.
+
+    Callers that arrive while a call is running await the same task and get
+    its result or its exception. The shared task is shielded, so one caller
+    being cancelled does not cancel the call for everyone else; once every
+    caller has given up (e.g. all hit their deadline), the call is cancelled.
+    The call runs under the latest of its callers' deadlines, extended as
+    callers with later ones join, so its upstream timeouts and retries fit
+    the longest wait; each caller's own deadline bounds only how long that
+    caller waits for it.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._waiters: Dict["asyncio.Task[Any]", int] = {}
+        self._contexts: Dict["asyncio.Task[Any]", contextvars.Context] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._in_flight
+
+    async def do(self, key: Hashable, fn: Callable[[], Coroutine[Any, Any, T]]) -> T:
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            singleflight_coalesced.labels(key_kind(key)).inc()
+            extend(self._contexts[task], current())
+        else:
+            self.calls += 1
+            singleflight_calls.labels(key_kind(key)).inc()
+            context = detached(current())
+            task = asyncio.create_task(fn(), context=context)
+            self._in_flight[key] = task
+            self._contexts[task] = context
+            task.add_done_callback(lambda t: self._finish(key, t))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            result: T = await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    self.abandoned += 1
+                    singleflight_abandoned.labels(key_kind(key)).inc()
+                    task.cancel()
+        return result
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        self._contexts.pop(task, None)
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away.
+            task.exception()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,125 @@
+import hashlib
+import time
+from dataclasses import InitVar, dataclass, field
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Union
+
+from .columnar import TicketColumns, merge_diff
+from .indexes import TicketIndex
+from .models import Ticket, TicketStats, TicketStatus, TicketPriority
+
+if TYPE_CHECKING:
+    from .search_index import FrozenTrigramIndex
+
+
+def build_stats(columns: TicketColumns) -> TicketStats:
+    status_counts = columns.status_counts()
+    return TicketStats(
+        total_tickets=len(columns),
+        open_tickets=status_counts[TicketStatus.OPEN],
+        closed_tickets=status_counts[TicketStatus.CLOSED],
+        priority_counts={priority.value: count for priority, count in columns.priority_counts().items()},
+        assignee_counts=columns.assignee_counts()
+    )
+
+
+def ticket_digest(ticket: Ticket) -> int:
+    """Stable 64-bit content hash of a ticket, identical across processes."""
+    return row_digest(ticket.id, ticket.title, ticket.status, ticket.priority, ticket.assignee)
+
+
+def row_digest(id: int, title: str, status: TicketStatus, priority: TicketPriority, assignee: str) -> int:
+    content = "\x1f".join((str(id), title, status.value, priority.value, assignee))
+    return int.from_bytes(hashlib.blake2b(content.encode(), digest_size=8).digest(), "big")
+
+
+def sources_digest(names: List[str]) -> int:
+    """Digest of a set of source names; 0 when there are none."""
+    if not names:
+        return 0
+    content = "\x1f".join(sorted(names))
+    return int.from_bytes(hashlib.blake2b(content.encode(), digest_size=8).digest(), "big")
+
+
+def column_digest(columns: TicketColumns, position: int) -> int:
+    return row_digest(
+        columns.ids[position],
+        columns.title(position),
+        columns.status(position),
+        columns.priority(position),
+        columns.assignee(position),
+    )
+
+
+@dataclass
+class TicketChanges:
+    """Rows that differ between two snapshots, as column positions.
+
+    ``added`` are positions in ``new``, ``removed`` positions in ``old`` and
+    ``updated`` pairs of (old, new) positions; ``Ticket`` models are only
+    built on demand.
+    """
+
+    old: TicketColumns
+    new: TicketColumns
+    added: List[int] = field(default_factory=list)
+    updated: List[tuple[int, int]] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+    def added_tickets(self) -> List[Ticket]:
+        return self.new.tickets(self.added)
+
+    def updated_tickets(self) -> List[tuple[Ticket, Ticket]]:
+        return [(self.old.ticket(old), self.new.ticket(new)) for old, new in self.updated]
+
+    def removed_tickets(self) -> List[Ticket]:
+        return self.old.tickets(self.removed)
+
+    def changed_ids(self) -> List[int]:
+        ids = [self.new.ids[position] for position in self.added]
+        ids.extend(self.new.ids[new] for _, new in self.updated)
+        ids.extend(self.old.ids[position] for position in self.removed)
+        return ids
+
+
+def diff_columns(old: TicketColumns, new: TicketColumns) -> TicketChanges:
+    added, updated, removed = merge_diff(old, new)
+    return TicketChanges(old=old, new=new, added=added, updated=updated, removed=removed)
+
+
+@dataclass
+class TicketSnapshot:
+    columns: TicketColumns
+    users: Dict[int, str]
+    version: int
+    stats: Optional[TicketStats] = None
+    # XOR of every ticket_digest, and when it last changed (wall clock).
+    fingerprint: int = 0
+    modified_at: float = 0.0
+    fetched_at: float = field(default_factory=time.monotonic)
+    index: TicketIndex = field(init=False, repr=False)
+    # Title search shipped with the snapshot; otherwise the store's TrigramIndex is used.
+    search_index: Optional["FrozenTrigramIndex"] = field(default=None, repr=False)
+    # Configured sources that could not be loaded in time; their rows are stale or absent.
+    missing_sources: List[str] = field(default_factory=list)
+    # Becomes ``index``; built from the columns unless the snapshot arrives with one (shared memory).
+    prebuilt_index: InitVar[Optional[TicketIndex]] = None
+
+    def __post_init__(self, prebuilt_index: Optional[TicketIndex]) -> None:
+        self.index = prebuilt_index if prebuilt_index is not None else TicketIndex(self.columns)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+# (columns, users) or (columns, users, names of the sources that could not be loaded)
+LoadedTickets = Union[tuple[TicketColumns, Dict[int, str]], tuple[TicketColumns, Dict[int, str], List[str]]]
+SnapshotLoader = Callable[[], Awaitable[LoadedTickets]]
+
+
+def unpack_loaded(loaded: LoadedTickets) -> tuple[TicketColumns, Dict[int, str], List[str]]:
+    columns, users, *missing = loaded
+    return columns, users, list(missing[0]) if missing else []
@@ -0,0 +1,532 @@
+import asyncio
+import json
+import logging
+import mmap
+import os
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+import httpx
+
+from .config import Settings
+from .ingest import PagedFetcher
+from .metrics import register_stats
+from .singleflight import SingleFlight, request_key
+from .upstream import CircuitBreaker, Hedger, UpstreamClient
+
+logger = logging.getLogger(__name__)
+
+Todo = Dict[str, Any]
+T = TypeVar("T")
+
+
+class TicketSource(ABC):
+    """Where raw DummyJSON-shaped todos and users come from.
+
+    Todos carry ``id``, ``todo``, ``completed`` and ``userId``; users carry
+    ``id`` and ``username``. The service owns transformation and caching.
+    """
+
+    name = "source"
+
+    @abstractmethod
+    def users(self) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """Yield every user, page by page."""
+
+    @abstractmethod
+    def todos(self) -> AsyncGenerator[List[Todo], None]:
+        """Yield every todo, page by page, so callers can drop each page after use."""
+
+    @abstractmethod
+    async def todo(self, todo_id: int) -> Optional[Todo]:
+        """One todo, or ``None`` when the source does not have it."""
+
+    @property
+    def sources(self) -> Sequence["TicketSource"]:
+        """The separately failing sources behind this one; a plain source is its only one."""
+        return [self]
+
+    def id_range(self, source: "TicketSource") -> Tuple[int, Optional[int]]:
+        """Ticket ids owned by ``source``: ``[start, end)``, ``end`` is ``None`` for the last one."""
+        return 0, None
+
+    async def gather(
+        self, call: Callable[["TicketSource"], Awaitable[T]]
+    ) -> Tuple[Dict[str, T], Dict[str, BaseException]]:
+        """Run ``call`` against every one of ``sources``, reporting failures per source name."""
+        try:
+            return {self.name: await call(self)}, {}
+        except Exception as e:
+            return {}, {self.name: e}
+
+    async def lookup_users(self, user_ids: List[int]) -> List[Dict[str, Any]]:
+        """The users with these ids; ids the source does not know are left out.
+
+        Scans ``users()`` until every id is found. Sources with a cheaper
+        way to look up a handful of users override this.
+        """
+        wanted = set(user_ids)
+        found: List[Dict[str, Any]] = []
+        async with aclosing(self.users()) as pages:
+            async for page in pages:
+                found += [user for user in page if user["id"] in wanted]
+                if len(found) >= len(wanted):
+                    break
+        return found
+
+    async def close(self) -> None:
+        pass
+
+
+class DummyJSONSource(TicketSource):
+    """Todos and users read over HTTP from DummyJSON (or anything shaped like it)."""
+
+    name = "dummyjson"
+
+    def __init__(
+        self,
+        settings: Settings,
+        base_url: Optional[str] = None,
+        flight: Optional[SingleFlight] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = (base_url or settings.external_api_base_url).rstrip("/")
+        self.client = UpstreamClient(
+            max_connections=settings.upstream_max_connections,
+            max_keepalive=settings.upstream_max_keepalive,
+            keepalive_expiry=settings.upstream_keepalive_expiry,
+            http2=settings.upstream_http2,
+            retries=settings.upstream_retries,
+            backoff=settings.upstream_retry_backoff,
+            max_backoff=settings.upstream_retry_max_backoff,
+            breaker=CircuitBreaker(settings.breaker_failure_threshold, settings.breaker_reset_timeout),
+            transport=transport,
+        )
+        register_stats("upstream", self.base_url, lambda: self.client.stats)
+        # Paged list reads may legitimately take a while; single details should not.
+        self.list_timeout = httpx.Timeout(settings.upstream_list_timeout, connect=settings.upstream_connect_timeout)
+        self.detail_timeout = httpx.Timeout(settings.upstream_detail_timeout, connect=settings.upstream_connect_timeout)
+        self.flight = flight or SingleFlight()
+        # Detail reads are idempotent, so a slow one can be raced by a second copy.
+        self.hedger = Hedger(
+            settings.upstream_hedge_quantile, settings.upstream_hedge_min_delay
+        ) if settings.upstream_hedge else None
+        self.fetcher = PagedFetcher(
+            self.client,
+            page_size=settings.ingest_page_size,
+            concurrency=settings.ingest_concurrency,
+            flight=self.flight,
+            timeout=self.list_timeout,
+        )
+
+    def users(self) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        return self.fetcher.pages(f"{self.base_url}/users", "users", select="username")
+
+    def todos(self) -> AsyncGenerator[List[Todo], None]:
+        return self.fetcher.pages(f"{self.base_url}/todos", "todos")
+
+    async def todo(self, todo_id: int) -> Optional[Todo]:
+        url = f"{self.base_url}/todos/{todo_id}"
+        try:
+            return await self.flight.do(request_key(url), lambda: self._get_detail(url))
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+
+    async def lookup_users(self, user_ids: List[int]) -> List[Dict[str, Any]]:
+        # DummyJSON cannot filter on several ids, but its user ids follow list
+        # order, so each run of ids within one page size is one skip/limit read.
+        wanted = set(user_ids)
+        runs: List[Tuple[int, int]] = []
+        for user_id in sorted(user_id for user_id in wanted if user_id > 0):
+            if runs and user_id - runs[-1][0] < self.fetcher.page_size:
+                runs[-1] = (runs[-1][0], user_id)
+            else:
+                runs.append((user_id, user_id))
+        pages = await asyncio.gather(*(self._users_page(first - 1, last - first + 1) for first, last in runs))
+        return [user for page in pages for user in page if user["id"] in wanted]
+
+    async def _users_page(self, skip: int, limit: int) -> List[Dict[str, Any]]:
+        params = {"limit": limit, "skip": skip, "select": "username"}
+        response = await self.client.get(f"{self.base_url}/users", params=params, timeout=self.list_timeout)
+        response.raise_for_status()
+        users: List[Dict[str, Any]] = response.json().get("users", [])
+        return users
+
+    async def _get_detail(self, url: str) -> Todo:
+        if self.hedger is None:
+            return await self._request_json(url)
+        return await self.hedger.run(lambda: self._request_json(url))
+
+    async def _request_json(self, url: str) -> Todo:
+        response = await self.client.get(url, timeout=self.detail_timeout)
+        response.raise_for_status()
+        data: Todo = response.json()
+        return data
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def _is_ndjson(path: str) -> bool:
+    return path.endswith((".ndjson", ".jsonl"))
+
+
+class _NDJSONFile:
+    """Memory-mapped NDJSON file read one line at a time.
+
+    Byte offsets of every record are remembered on the first full pass, so
+    single-record lookups afterwards parse one line instead of the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._ids: Optional[array] = None
+        self._offsets: Optional[array] = None
+
+    def _open(self) -> Optional[mmap.mmap]:
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def _lines(mm: mmap.mmap) -> Iterator[tuple[int, bytes]]:
+        size = len(mm)
+        start = 0
+        while start < size:
+            end = mm.find(b"\n", start)
+            if end == -1:
+                end = size
+            line = mm[start:end].strip()
+            if line:
+                yield start, line
+            start = end + 1
+
+    def pages(self, page_size: int) -> Iterator[List[Todo]]:
+        mm = self._open()
+        if mm is None:
+            return
+        ids, offsets = array("q"), array("q")
+        page: List[Todo] = []
+        try:
+            for offset, line in self._lines(mm):
+                record: Todo = json.loads(line)
+                ids.append(record["id"])
+                offsets.append(offset)
+                page.append(record)
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+            if page:
+                yield page
+        finally:
+            mm.close()
+        self._set_index(ids, offsets)
+
+    def _set_index(self, ids: array, offsets: array) -> None:
+        if any(ids[i] > ids[i + 1] for i in range(len(ids) - 1)):
+            order = sorted(range(len(ids)), key=ids.__getitem__)
+            ids = array("q", (ids[i] for i in order))
+            offsets = array("q", (offsets[i] for i in order))
+        self._ids, self._offsets = ids, offsets
+
+    def get(self, record_id: int) -> Optional[Todo]:
+        if self._ids is None:
+            for _ in self.pages(1024):
+                pass
+        assert self._ids is not None and self._offsets is not None
+        i = bisect_left(self._ids, record_id)
+        if i == len(self._ids) or self._ids[i] != record_id:
+            return None
+        mm = self._open()
+        if mm is None:
+            return None
+        try:
+            start = self._offsets[i]
+            end = mm.find(b"\n", start)
+            record: Todo = json.loads(mm[start:end if end != -1 else len(mm)])
+            return record
+        finally:
+            mm.close()
+
+
+def _load_json(path: str, key: str) -> List[Dict[str, Any]]:
+    """A whole JSON file: either a bare list or a DummyJSON page like ``{"todos": [...]}``."""
+    with open(path, "rb") as f:
+        data = json.load(f)
+    records: List[Dict[str, Any]] = data.get(key, []) if isinstance(data, dict) else data
+    return records
+
+
+class FileSource(TicketSource):
+    """Todos and users read from local files instead of the network.
+
+    ``.ndjson``/``.jsonl`` files are memory-mapped and parsed line by line,
+    page by page, so large datasets never sit in memory as one parsed
+    document. Any other file is treated as a single JSON document (a list,
+    or a DummyJSON response body) and is parsed whole, which is fine for
+    fixtures but not for millions of rows.
+    """
+
+    name = "file"
+
+    def __init__(self, todos_path: str, users_path: Optional[str] = None, page_size: int = 1000):
+        self.todos_path = todos_path
+        self.users_path = users_path
+        self.page_size = max(1, page_size)
+        self._ndjson = _NDJSONFile(todos_path) if _is_ndjson(todos_path) else None
+        self._by_id: Optional[Dict[int, Todo]] = None
+
+    async def users(self) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        if not self.users_path:
+            return
+        if _is_ndjson(self.users_path):
+            for page in _NDJSONFile(self.users_path).pages(self.page_size):
+                yield page
+                await asyncio.sleep(0)
+        else:
+            yield _load_json(self.users_path, "users")
+
+    async def todos(self) -> AsyncGenerator[List[Todo], None]:
+        if self._ndjson is not None:
+            for page in self._ndjson.pages(self.page_size):
+                yield page
+                # Parsing is CPU-bound; let requests in between pages.
+                await asyncio.sleep(0)
+            return
+        todos = _load_json(self.todos_path, "todos")
+        self._by_id = {todo["id"]: todo for todo in todos}
+        for start in range(0, len(todos), self.page_size):
+            yield todos[start:start + self.page_size]
+            await asyncio.sleep(0)
+
+    async def todo(self, todo_id: int) -> Optional[Todo]:
+        if self._ndjson is not None:
+            return self._ndjson.get(todo_id)
+        if self._by_id is None:
+            self._by_id = {todo["id"]: todo for todo in _load_json(self.todos_path, "todos")}
+        return self._by_id.get(todo_id)
+
+
+class NamespacedSource(TicketSource):
+    """One of several configured sources, with its own deadline, field mapping and id range.
+
+    ``fields`` maps our record fields (``todo``, ``completed``, ``userId``,
+    ``username``) to the source's own names. Todo and user ids are shifted by
+    ``id_offset``, so sources whose ids overlap can share one ticket id space.
+    """
+
+    def __init__(
+        self,
+        source: TicketSource,
+        name: str,
+        id_offset: int = 0,
+        deadline: Optional[float] = None,
+        fields: Optional[Dict[str, str]] = None,
+    ):
+        self.source = source
+        self.name = name
+        self.id_offset = id_offset
+        self.deadline = deadline
+        self.fields = fields or {}
+
+    def _map(self, record: Dict[str, Any], *id_fields: str) -> Dict[str, Any]:
+        if self.fields:
+            record = {**record, **{ours: record[theirs] for ours, theirs in self.fields.items() if theirs in record}}
+        if self.id_offset:
+            record = {**record, **{key: record[key] + self.id_offset for key in id_fields if key in record}}
+        return record
+
+    async def users(self) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        async for page in self.source.users():
+            yield [self._map(user, "id") for user in page]
+
+    async def todos(self) -> AsyncGenerator[List[Todo], None]:
+        async for page in self.source.todos():
+            yield [self._map(todo, "id", "userId") for todo in page]
+
+    async def todo(self, todo_id: int) -> Optional[Todo]:
+        record = await self.source.todo(todo_id - self.id_offset)
+        return self._map(record, "id", "userId") if record is not None else None
+
+    async def lookup_users(self, user_ids: List[int]) -> List[Dict[str, Any]]:
+        users = await self.source.lookup_users([user_id - self.id_offset for user_id in user_ids])
+        return [self._map(user, "id") for user in users]
+
+    async def close(self) -> None:
+        await self.source.close()
+
+
+class MultiSource(TicketSource):
+    """Several ``NamespacedSource``s behind one interface.
+
+    A ticket id belongs to the source with the highest ``id_offset`` not above
+    it; offsets must differ, and a source returning ids outside its range
+    fails its load instead of shadowing its neighbour. ``gather`` runs one call against every source concurrently, each
+    bounded by that source's deadline, and reports failures per source
+    instead of failing the whole load.
+    """
+
+    name = "multi"
+
+    def __init__(self, sources: List[NamespacedSource]):
+        if not sources:
+            raise ValueError("MultiSource needs at least one source")
+        self._sources = sorted(sources, key=lambda source: source.id_offset)
+        self._offsets = [source.id_offset for source in self._sources]
+        for before, after in zip(self._sources, self._sources[1:]):
+            if before.id_offset == after.id_offset:
+                raise ValueError(f"Ticket sources {before.name} and {after.name} share id_offset {after.id_offset}")
+
+    @property
+    def sources(self) -> List[NamespacedSource]:
+        return self._sources
+
+    def owner(self, ticket_id: int) -> Optional[NamespacedSource]:
+        i = bisect_right(self._offsets, ticket_id)
+        return self.sources[i - 1] if i else None
+
+    def id_range(self, source: TicketSource) -> Tuple[int, Optional[int]]:
+        for i, candidate in enumerate(self._sources):
+            if candidate is source:
+                return self._offsets[i], self._offsets[i + 1] if i + 1 < len(self._offsets) else None
+        raise ValueError(f"{source.name} is not one of these ticket sources")
+
+    async def gather(
+        self, call: Callable[[TicketSource], Awaitable[T]]
+    ) -> Tuple[Dict[str, T], Dict[str, BaseException]]:
+        # Each source is bounded by its own deadline.
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(call(source), source.deadline) for source in self.sources),
+            return_exceptions=True,
+        )
+        results: Dict[str, T] = {}
+        errors: Dict[str, BaseException] = {}
+        for source, outcome in zip(self.sources, outcomes):
+            if isinstance(outcome, BaseException):
+                reason = f"no answer within {source.deadline}s" if isinstance(outcome, asyncio.TimeoutError) else repr(outcome)
+                logger.warning(f"Ticket source {source.name} failed: {reason}")
+                errors[source.name] = outcome
+            else:
+                results[source.name] = outcome
+        return results, errors
+
+    async def users(self) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        for source in self.sources:
+            async for page in source.users():
+                yield page
+
+    async def todos(self) -> AsyncGenerator[List[Todo], None]:
+        for source in self.sources:
+            async for page in source.todos():
+                yield page
+
+    async def todo(self, todo_id: int) -> Optional[Todo]:
+        source = self.owner(todo_id)
+        if source is None:
+            return None
+        return await asyncio.wait_for(source.todo(todo_id), source.deadline)
+
+    async def lookup_users(self, user_ids: List[int]) -> List[Dict[str, Any]]:
+        groups: Dict[NamespacedSource, List[int]] = {}
+        for user_id in user_ids:
+            source = self.owner(user_id)
+            if source is not None:
+                groups.setdefault(source, []).append(user_id)
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(source.lookup_users(ids), source.deadline) for source, ids in groups.items()),
+            return_exceptions=True,
+        )
+        found: List[Dict[str, Any]] = []
+        failed: List[BaseException] = []
+        for source, outcome in zip(groups, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.warning(f"User lookup on ticket source {source.name} failed: {outcome!r}")
+                failed.append(outcome)
+            else:
+                found += outcome
+        if failed and len(failed) == len(groups):
+            raise failed[0]
+        return found
+
+    async def close(self) -> None:
+        await asyncio.gather(*(source.close() for source in self.sources), return_exceptions=True)
+
+
+@dataclass(frozen=True)
+class SourceConfig:
+    """One entry of ``TICKET_SOURCES``."""
+
+    name: str
+    kind: str = DummyJSONSource.name
+    base_url: Optional[str] = None
+    todos: Optional[str] = None
+    users: Optional[str] = None
+    id_offset: int = 0
+    deadline: Optional[float] = None
+    fields: Dict[str, str] = field(default_factory=dict)
+
+
+def parse_source_configs(raw: str) -> List[SourceConfig]:
+    """Parse the ``TICKET_SOURCES`` JSON list of source objects."""
+    configs = [SourceConfig(**entry) for entry in json.loads(raw)]
+    names = [config.name for config in configs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate ticket source names in {names}")
+    offsets = [config.id_offset for config in configs]
+    if len(set(offsets)) != len(offsets):
+        raise ValueError(f"Ticket sources need distinct id_offset values, got {offsets}")
+    return configs
+
+
+def _create_one(
+    settings: Settings,
+    kind: str,
+    base_url: Optional[str] = None,
+    todos: Optional[str] = None,
+    users: Optional[str] = None,
+    flight: Optional[SingleFlight] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> TicketSource:
+    if kind == FileSource.name:
+        if not todos:
+            raise ValueError("A file ticket source needs a todos path")
+        logger.info(f"Reading tickets from {todos}")
+        return FileSource(todos, users, settings.ingest_page_size)
+    if kind != DummyJSONSource.name:
+        raise ValueError(f"Unknown ticket source kind {kind!r}")
+    return DummyJSONSource(settings, base_url=base_url, flight=flight, transport=transport)
+
+
+def create_source(
+    settings: Settings,
+    flight: Optional[SingleFlight] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> TicketSource:
+    if settings.ticket_sources:
+        return MultiSource([
+            NamespacedSource(
+                _create_one(
+                    settings, config.kind, config.base_url, config.todos, config.users, flight=flight, transport=transport
+                ),
+                name=config.name,
+                id_offset=config.id_offset,
+                deadline=config.deadline,
+                fields=config.fields,
+            )
+            for config in parse_source_configs(settings.ticket_sources)
+        ])
+    return _create_one(
+        settings,
+        settings.ticket_source,
+        todos=settings.ticket_source_todos,
+        users=settings.ticket_source_users,
+        flight=flight,
+        transport=transport,
+    )
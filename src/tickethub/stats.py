@@ -0,0 +1,74 @@
+from typing import Dict, Optional
+
+from .columnar import TicketColumns
+from .models import TicketStats, TicketStatus, TicketPriority
+from .snapshot import TicketChanges, build_stats
+
+
+class StatsAggregator:
+    """``TicketStats`` counters kept up to date from ticket deltas.
+
+    Applying a change set costs O(changes); reading the stats returns a model
+    that is only rebuilt after the counters actually changed.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self, columns: Optional[TicketColumns] = None) -> None:
+        self._total = 0
+        self._open = 0
+        self._priority_counts: Dict[str, int] = {priority.value: 0 for priority in TicketPriority}
+        self._assignee_counts: Dict[str, int] = {}
+        self._model: Optional[TicketStats] = None
+        if columns is not None:
+            self.load(build_stats(columns))
+
+    def load(self, stats: TicketStats) -> None:
+        """Start counting from already computed stats."""
+        self._total = stats.total_tickets
+        self._open = stats.open_tickets
+        self._priority_counts.update(stats.priority_counts)
+        self._assignee_counts = dict(stats.assignee_counts)
+        self._model = None
+
+    def apply(self, changes: TicketChanges) -> None:
+        old, new = changes.old, changes.new
+        for position in changes.added:
+            self._count_row(new, position, 1)
+        for before, after in changes.updated:
+            self._count_row(old, before, -1)
+            self._count_row(new, after, 1)
+        for position in changes.removed:
+            self._count_row(old, position, -1)
+
+    def _count_row(self, columns: TicketColumns, position: int, delta: int) -> None:
+        self._count(columns.status(position), columns.priority(position), columns.assignee(position), delta)
+
+    def _count(self, status: TicketStatus, priority: TicketPriority, assignee: str, delta: int) -> None:
+        self._model = None
+        self._total += delta
+        if status == TicketStatus.OPEN:
+            self._open += delta
+        self._priority_counts[priority.value] += delta
+        count = self._assignee_counts.get(assignee, 0) + delta
+        if count:
+            self._assignee_counts[assignee] = count
+        else:
+            self._assignee_counts.pop(assignee, None)
+
+    @property
+    def stats(self) -> TicketStats:
+        if self._model is None:
+            self._model = TicketStats(
+                total_tickets=self._total,
+                open_tickets=self._open,
+                closed_tickets=self._total - self._open,
+                priority_counts=dict(self._priority_counts),
+                assignee_counts=dict(self._assignee_counts)
+            )
+        return self._model
+
+    def verify(self, columns: TicketColumns) -> bool:
+        """Check the running counters against a full recomputation."""
+        return self.stats == build_stats(columns)
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Union
+
+from .cache import SnapshotCache
+from .columnar import TicketColumns
+from .deadline import Deadline, current, detached, extend
+from .search_index import TrigramIndex
+from .shared import SharedSnapshotCache
+from .snapshot import SnapshotLoader, TicketChanges, TicketSnapshot, column_digest, diff_columns, unpack_loaded
+from .stats import StatsAggregator
+
+logger = logging.getLogger(__name__)
+
+SnapshotListener = Callable[[TicketSnapshot, TicketChanges], None]
+
+
+class TicketStore:
+    """Process-wide ticket snapshot served from memory.
+
+    Snapshots older than ``refresh_interval`` are still served while a refresh
+    runs in the background; only once a snapshot is older than ``max_staleness``
+    do reads wait for the refresh to finish, and if that refresh fails they
+    still get the old snapshot.
+    """
+
+    # Recount stats from scratch every N snapshots to catch drift in the deltas.
+    STATS_VERIFY_EVERY = 10
+    # Titles indexed per event-loop turn when rebuilding the search index.
+    INDEX_SLICE = 5000
+
+    def __init__(
+        self,
+        loader: SnapshotLoader,
+        refresh_interval: float = 60.0,
+        max_staleness: float = 300.0,
+        cache: Optional[Union[SnapshotCache, SharedSnapshotCache]] = None,
+    ):
+        self._loader = loader
+        self._cache = cache or SnapshotCache()
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max(max_staleness, refresh_interval)
+        self._snapshot: Optional[TicketSnapshot] = None
+        self.search_index = TrigramIndex()
+        self.stats = StatsAggregator()
+        self._snapshots_loaded = 0
+        self._listeners: List[SnapshotListener] = []
+        self._fingerprint = 0
+        self._modified_at = time.time()
+        self._refresh_task: Optional[asyncio.Task[TicketSnapshot]] = None
+        self._refresh_context = detached()
+        self._background_task: Optional[asyncio.Task[None]] = None
+        self._index_task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def snapshot(self) -> Optional[TicketSnapshot]:
+        return self._snapshot
+
+    def subscribe(self, listener: SnapshotListener) -> None:
+        """Call ``listener`` with each new snapshot and its changes."""
+        self._listeners.append(listener)
+
+    def restore(self, snapshot: TicketSnapshot) -> None:
+        """Serve a snapshot saved by an earlier process until the first refresh.
+
+        It counts as due for refresh whatever its age, and its search index is
+        rebuilt in the background; searches wait for that in ``search_ready``.
+        """
+        if self._snapshot is not None:
+            return
+        if snapshot.stats is not None:
+            self.stats.load(snapshot.stats)
+        else:
+            self.stats.reset(snapshot.columns)
+        snapshot.stats = self.stats.stats
+        snapshot.fetched_at = time.monotonic() - self.refresh_interval
+        self._fingerprint = snapshot.fingerprint
+        self._modified_at = snapshot.modified_at
+        self._snapshot = snapshot
+        self._index_task = asyncio.create_task(self._index_titles(snapshot.columns))
+
+    async def _index_titles(self, columns: TicketColumns) -> None:
+        started = time.perf_counter()
+        for start in range(0, len(columns), self.INDEX_SLICE):
+            for position in range(start, min(start + self.INDEX_SLICE, len(columns))):
+                self.search_index.add(columns.ids[position], columns.title(position))
+            await asyncio.sleep(0)
+        logger.info(f"Indexed {len(columns)} restored titles in {time.perf_counter() - started:.2f}s")
+
+    async def search_ready(self) -> None:
+        """Wait until ``search_index`` covers the current snapshot."""
+        if self._index_task is not None and not self._index_task.done():
+            await asyncio.shield(self._index_task)
+
+    async def start(self) -> None:
+        if self._snapshot is not None:
+            # Serve the restored snapshot while the first refresh runs.
+            self._ensure_refresh()
+        else:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Initial ticket snapshot load failed: {str(e)}")
+        self._background_task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        for task in (self._background_task, self._refresh_task, self._index_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._background_task = None
+        self._refresh_task = None
+        self._index_task = None
+        await self._cache.close()
+
+    async def get(self) -> TicketSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.age > self.max_staleness:
+            try:
+                return await self.refresh()
+            except Exception as e:
+                if snapshot is None:
+                    raise
+                # Upstream is failing; old data beats no data.
+                logger.warning(f"Serving ticket snapshot v{snapshot.version} past max staleness: {str(e)}")
+                return snapshot
+        if snapshot.age > self.refresh_interval:
+            self._ensure_refresh()
+        return snapshot
+
+    async def refresh(self) -> TicketSnapshot:
+        """Reload the snapshot, joining a refresh that is already in flight."""
+        return await asyncio.shield(self._ensure_refresh(current()))
+
+    def _ensure_refresh(self, deadline: Optional[Deadline] = None) -> "asyncio.Task[TicketSnapshot]":
+        """Start a refresh unless one is running; it runs under the latest
+        ``deadline`` of its waiters, or none for a background refresh."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_context = detached(deadline)
+            self._refresh_task = asyncio.create_task(self._load(), context=self._refresh_context)
+            self._refresh_task.add_done_callback(self._log_refresh_failure)
+        else:
+            extend(self._refresh_context, deadline)
+        return self._refresh_task
+
+    async def _load(self) -> TicketSnapshot:
+        snapshot = await self._cache.get_or_load(self._load_sorted, max_age=self.refresh_interval)
+        previous = self._snapshot
+        if previous is not None and snapshot.version == previous.version:
+            return previous
+
+        changes = diff_columns(previous.columns if previous else TicketColumns(), snapshot.columns)
+        if snapshot.search_index is None:
+            await self.search_ready()
+            self.search_index.apply(changes)
+        self.stats.apply(changes)
+        self._snapshots_loaded += 1
+        if self._snapshots_loaded % self.STATS_VERIFY_EVERY == 0 and not self.stats.verify(snapshot.columns):
+            logger.warning("Incremental ticket stats drifted from a full recount; resetting")
+            self.stats.reset(snapshot.columns)
+        snapshot.stats = self.stats.stats
+        if changes:
+            self._fingerprint ^= _changes_digest(changes)
+            self._modified_at = time.time()
+        snapshot.fingerprint = self._fingerprint
+        snapshot.modified_at = self._modified_at
+
+        logger.info(
+            f"Loaded ticket snapshot v{snapshot.version} with {len(snapshot.columns)} tickets "
+            f"(+{len(changes.added)} ~{len(changes.updated)} -{len(changes.removed)})"
+        )
+        self._snapshot = snapshot
+        for listener in self._listeners:
+            try:
+                listener(snapshot, changes)
+            except Exception as e:
+                logger.error(f"Snapshot listener failed: {str(e)}")
+        return snapshot
+
+    async def _load_sorted(self) -> tuple[TicketColumns, Dict[int, str], List[str]]:
+        columns, users, missing = unpack_loaded(await self._loader())
+        # Keyset pagination and snapshot diffs walk ids in order.
+        return columns.sorted_by_id(), users, missing
+
+    @staticmethod
+    def _log_refresh_failure(task: "asyncio.Task[TicketSnapshot]") -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Ticket snapshot refresh failed: {str(task.exception())}")
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Already logged by the done callback; keep serving the old snapshot.
+                pass
+
+
+def _changes_digest(changes: TicketChanges) -> int:
+    digest = 0
+    for position in changes.added:
+        digest ^= column_digest(changes.new, position)
+    for old, new in changes.updated:
+        digest ^= column_digest(changes.old, old) ^ column_digest(changes.new, new)
+    for position in changes.removed:
+        digest ^= column_digest(changes.old, position)
+    return digest
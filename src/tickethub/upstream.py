@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Mapping, Optional, TypeVar, Union
+
+import httpx
+
+from .deadline import cap_timeout, remaining
+from .metrics import endpoint_label, upstream_errors, upstream_hedges, upstream_request_duration
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - h2 is optional at runtime
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that is currently failing."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Upstream circuit is open; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after ``failure_threshold`` consecutive failures.
+
+    While open, calls fail fast. Once ``reset_timeout`` has passed a single
+    probe call is let through (half-open): success closes the circuit, failure
+    keeps it open for another ``reset_timeout``.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if self._probing else "open"
+
+    @property
+    def retry_after(self) -> float:
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        if self.retry_after > 0:
+            return False
+        # Let one probe through; the next one waits another reset_timeout,
+        # so a probe that never reports back cannot wedge the circuit.
+        self._opened_at = time.monotonic()
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.warning(f"Upstream circuit opened after {self.failures} consecutive failures")
+                self.opened += 1
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class UpstreamClient:
+    """Pooled HTTP client for the upstream API.
+
+    GETs are idempotent, so transport errors and 429/502/503/504 responses are
+    retried up to ``retries`` times with full-jitter exponential backoff. Every
+    call goes through a ``CircuitBreaker``; a final transport error or 5xx
+    counts as one failure.
+    """
+
+    RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+    def __init__(
+        self,
+        base_url: str = "",
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        keepalive_expiry: float = 5.0,
+        http2: bool = False,
+        timeout: httpx.Timeout = httpx.Timeout(10.0, connect=2.0),
+        retries: int = 2,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.retried = 0
+        self.rejected = 0
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+            timeout=timeout,
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Mapping[str, Any]] = None,
+        timeout: Union[httpx.Timeout, Any] = httpx.USE_CLIENT_DEFAULT,
+    ) -> httpx.Response:
+        endpoint = endpoint_label(httpx.URL(url).path)
+        if not self.breaker.allow():
+            self.rejected += 1
+            upstream_errors.labels(endpoint, "circuit_open").inc()
+            raise CircuitOpenError(self.breaker.retry_after)
+
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = await self._client.get(
+                    url, params=params, timeout=cap_timeout(timeout, self._client.timeout)
+                )
+            except httpx.TransportError as e:
+                upstream_request_duration.labels(endpoint, "error").observe(time.perf_counter() - started)
+                upstream_errors.labels(endpoint, type(e).__name__).inc()
+                if attempt >= self.retries or not self._has_time_for_retry(attempt):
+                    self.breaker.record_failure()
+                    raise
+                logger.info(f"Retrying GET {url} after {type(e).__name__}")
+            else:
+                upstream_request_duration.labels(endpoint, str(response.status_code)).observe(
+                    time.perf_counter() - started
+                )
+                if response.status_code >= 500 or response.status_code == 429:
+                    upstream_errors.labels(endpoint, f"http_{response.status_code}").inc()
+                if (
+                    response.status_code not in self.RETRY_STATUSES
+                    or attempt >= self.retries
+                    or not self._has_time_for_retry(attempt)
+                ):
+                    if response.status_code >= 500:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    return response
+                logger.info(f"Retrying GET {url} after HTTP {response.status_code}")
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(self._backoff(attempt))
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def _has_time_for_retry(self, attempt: int) -> bool:
+        """A retry is pointless if the request's deadline passes during the backoff."""
+        left = remaining()
+        return left is None or left > min(self.max_backoff, self.backoff * 2 ** attempt)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "circuit_opened": self.breaker.opened,
+            "retried": self.retried,
+            "rejected": self.rejected,
+        }
+
+
+class Hedger:
+    """Sends a backup copy of an idempotent call that is slower than usual.
+
+    The backup goes out once the first call has been running for longer than
+    the ``quantile`` of recent call latencies (but at least ``min_delay``);
+    whichever call answers first wins and the other is cancelled. No backups
+    are sent until ``min_samples`` latencies have been seen, so at most about
+    ``1 - quantile`` of calls are duplicated.
+    """
+
+    def __init__(self, quantile: float = 0.95, min_delay: float = 0.01, window: int = 256, min_samples: int = 20):
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.min_samples = max(1, min_samples)
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self.sent = 0
+        self.won = 0
+
+    def delay(self) -> Optional[float]:
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return max(self.min_delay, ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))])
+
+    async def _timed(self, call: Callable[[], Awaitable[T]]) -> T:
+        started = time.perf_counter()
+        result = await call()
+        # Only answers count; cancelled losers and failures say nothing about normal latency.
+        self._latencies.append(time.perf_counter() - started)
+        return result
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        delay = self.delay()
+        primary = asyncio.ensure_future(self._timed(call))
+        attempts: List["asyncio.Future[T]"] = [primary]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done:
+                    self.sent += 1
+                    attempts.append(asyncio.ensure_future(self._timed(call)))
+            pending = set(attempts)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                finished = sorted(done, key=attempts.index)
+                # Fetch every exception, so a failed loser is never reported as unretrieved.
+                errors = [attempt.exception() for attempt in finished]
+                for attempt, attempt_error in zip(finished, errors):
+                    if attempt_error is None:
+                        if len(attempts) > 1:
+                            won = attempt is not primary
+                            self.won += won
+                            upstream_hedges.labels("won" if won else "lost").inc()
+                        return attempt.result()
+                    error = error or attempt_error
+            assert error is not None
+            if len(attempts) > 1:
+                upstream_hedges.labels("lost").inc()
+            raise error
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {"sent": self.sent, "won": self.won, "delay": self.delay()}
@@ -0,0 +1,205 @@
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from .deadline import Deadline, current, detached, extend, latest
+from .metrics import user_lookup_batch_size
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+UserRecords = List[Dict[str, Any]]
+
+
+class UserDirectory:
+    """User id to username, reloaded every ``ttl`` seconds and filled in lazily.
+
+    ``load`` reads the whole directory when it is first needed and again
+    once it is older than ``ttl``. Ids it did not cover, or whose entry has
+    expired, are resolved on demand: every miss asked for during one event
+    loop tick is queued, and the queue goes to ``lookup`` as one batch (of at
+    most ``max_batch`` ids) once the loop has run that tick's other
+    callbacks. A page of tickets or a burst of detail reads costs one
+    upstream call instead of a reload or a call per id. A batch runs under
+    the latest deadline of the callers waiting on it. Ids the lookup does
+    not return are remembered as unknown for ``negative_ttl``.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], Awaitable[Dict[int, str]]],
+        lookup: Callable[[List[int]], Awaitable[UserRecords]],
+        ttl: float = 300.0,
+        negative_ttl: float = 60.0,
+        max_batch: int = 100,
+        flight: Optional[SingleFlight] = None,
+    ):
+        self._load = load
+        self._lookup = lookup
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_batch = max(1, max_batch)
+        self.flight = flight or SingleFlight()
+        self._names: Dict[int, str] = {}
+        self._fetched_at: Dict[int, float] = {}
+        self._unknown: Dict[int, float] = {}
+        self._loaded_at: Optional[float] = None
+        self._pending: Dict[int, "asyncio.Future[Optional[str]]"] = {}
+        self._in_flight: Dict[int, "asyncio.Future[Optional[str]]"] = {}
+        self._pending_deadline: Optional[Deadline] = None
+        self._contexts: Dict[int, contextvars.Context] = {}
+        self._lookups: Set["asyncio.Task[None]"] = set()
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+        self.batched_ids = 0
+        self.largest_batch = 0
+        self.reloads = 0
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def names(self) -> Dict[int, str]:
+        return self._names
+
+    def seed(self, names: Dict[int, str]) -> None:
+        """Start from an existing map (a shared snapshot's) instead of loading."""
+        if self._names:
+            return
+        now = time.monotonic()
+        self._names = dict(names)
+        self._fetched_at = dict.fromkeys(self._names, now)
+        self._loaded_at = now
+
+    async def load(self) -> Dict[int, str]:
+        """The whole directory, reloaded first if it is missing or older than ``ttl``."""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+            # Cold callers all wait for one full load instead of each paging /users.
+            await self.flight.do("users", self._reload)
+        return self._names
+
+    async def _reload(self) -> None:
+        try:
+            names = await self._load()
+        except Exception as e:
+            if self._loaded_at is None:
+                raise
+            logger.warning(f"User directory reload failed, keeping {len(self._names)} names: {e!r}")
+            return
+        now = time.monotonic()
+        # Replaced, not merged, so renames and deletions take effect.
+        self._names = dict(names)
+        self._fetched_at = dict.fromkeys(self._names, now)
+        self._unknown.clear()
+        self._loaded_at = now
+        self.reloads += 1
+
+    def _cached(self, user_id: int, now: float) -> Optional[str]:
+        name = self._names.get(user_id)
+        if name is not None and now - self._fetched_at[user_id] < self.ttl:
+            return name
+        return None
+
+    async def resolve(self, user_id: int) -> Optional[str]:
+        """Username for ``user_id``, or ``None`` if the source does not know it."""
+        return (await self.resolve_many((user_id,))).get(user_id)
+
+    async def resolve_many(self, user_ids: Iterable[int]) -> Dict[int, str]:
+        """Usernames for the known ids among ``user_ids``; misses join the current batch."""
+        now = time.monotonic()
+        found: Dict[int, str] = {}
+        waiting: Dict[int, "asyncio.Future[Optional[str]]"] = {}
+        for user_id in user_ids:
+            if user_id in found or user_id in waiting:
+                continue
+            name = self._cached(user_id, now)
+            if name is not None:
+                found[user_id] = name
+                self.hits += 1
+            elif self._unknown.get(user_id, 0.0) > now:
+                self.hits += 1
+            else:
+                waiting[user_id] = self._enqueue(user_id)
+                self.misses += 1
+        if waiting:
+            # Shielded: other callers may be waiting on the same lookups.
+            names = await asyncio.shield(asyncio.gather(*waiting.values()))
+            found.update((user_id, name) for user_id, name in zip(waiting, names) if name is not None)
+        return found
+
+    def _enqueue(self, user_id: int) -> "asyncio.Future[Optional[str]]":
+        future = self._in_flight.get(user_id)
+        if future is not None:
+            extend(self._contexts[user_id], current())
+            return future
+        loop = asyncio.get_running_loop()
+        if not self._pending:
+            # Runs after everything already scheduled, so the whole tick's misses batch up.
+            loop.call_soon(self._dispatch)
+            self._pending_deadline = current()
+        else:
+            self._pending_deadline = latest(self._pending_deadline, current())
+        future = self._pending.get(user_id)
+        if future is None:
+            future = self._pending[user_id] = loop.create_future()
+        return future
+
+    def _dispatch(self) -> None:
+        batch, self._pending = self._pending, {}
+        self._in_flight.update(batch)
+        user_ids = list(batch)
+        for start in range(0, len(user_ids), self.max_batch):
+            chunk = {user_id: batch[user_id] for user_id in user_ids[start:start + self.max_batch]}
+            # Shared by every waiter, so bound by the latest deadline among them.
+            context = detached(self._pending_deadline)
+            self._contexts.update(dict.fromkeys(chunk, context))
+            task = asyncio.create_task(self._lookup_batch(chunk), context=context)
+            self._lookups.add(task)
+            task.add_done_callback(self._lookups.discard)
+
+    async def _lookup_batch(self, batch: Dict[int, "asyncio.Future[Optional[str]]"]) -> None:
+        self.batches += 1
+        self.batched_ids += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        user_lookup_batch_size.observe(len(batch))
+        users: Optional[UserRecords] = None
+        try:
+            users = await self._lookup(list(batch))
+        except Exception as e:
+            logger.warning(f"User lookup of {len(batch)} ids failed: {e!r}")
+        finally:
+            self._settle(batch, users)
+
+    def _settle(self, batch: Dict[int, "asyncio.Future[Optional[str]]"], users: Optional[UserRecords]) -> None:
+        now = time.monotonic()
+        returned = set()
+        for user in users or ():
+            self._names[user["id"]] = user["username"]
+            self._fetched_at[user["id"]] = now
+            returned.add(user["id"])
+        for user_id, future in batch.items():
+            self._in_flight.pop(user_id, None)
+            self._contexts.pop(user_id, None)
+            if users is not None and user_id not in returned:
+                self._names.pop(user_id, None)
+                self._fetched_at.pop(user_id, None)
+                self._unknown[user_id] = now + self.negative_ttl
+            # After a failed lookup an expired name is still better than none.
+            if not future.done():
+                future.set_result(self._names.get(user_id))
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._names),
+            "unknown": len(self._unknown),
+            "hits": self.hits,
+            "misses": self.misses,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_ids / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.largest_batch,
+            "reloads": self.reloads,
+        }
@@ -0,0 +1,117 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.tickethub.admission import (
+    CHEAP,
+    EXPENSIVE,
+    NORMAL,
+    AdmissionController,
+    AdmissionMiddleware,
+    ConcurrencyLimiter,
+    Rejected,
+    parse_route_limits,
+)
+from src.tickethub.metrics import admission_rejected
+
+
+@pytest.mark.asyncio
+async def test_limiter_admits_most_urgent_waiter_first():
+    limiter = ConcurrencyLimiter("test", limit=1, queue_size=4)
+    admitted = []
+
+    async def request(name, priority):
+        assert await limiter.acquire(priority, timeout=1) is None
+        admitted.append(name)
+        limiter.release()
+
+    assert await limiter.acquire(NORMAL, timeout=1) is None
+    waiters = [asyncio.create_task(request("search", EXPENSIVE)), asyncio.create_task(request("stats", CHEAP))]
+    await asyncio.sleep(0)
+    limiter.release()
+    await asyncio.gather(*waiters)
+
+    assert admitted == ["stats", "search"]
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_less_urgent_waiters():
+    limiter = ConcurrencyLimiter("test", limit=1, queue_size=1)
+    assert await limiter.acquire(NORMAL, timeout=1) is None
+
+    expensive = asyncio.create_task(limiter.acquire(EXPENSIVE, timeout=1))
+    await asyncio.sleep(0)
+    assert await limiter.acquire(EXPENSIVE, timeout=1) == "queue_full"
+
+    cheap = asyncio.create_task(limiter.acquire(CHEAP, timeout=1))
+    assert await expensive == "shed"
+    limiter.release()
+    assert await cheap is None
+    limiter.release()
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_times_out():
+    limiter = ConcurrencyLimiter("test", limit=1, queue_size=4)
+    assert await limiter.acquire(NORMAL, timeout=1) is None
+
+    assert await limiter.acquire(NORMAL, timeout=0.01) == "queue_timeout"
+    limiter.release()
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_client_over_its_limit_gets_429():
+    controller = AdmissionController(max_concurrency=10, client_max_concurrency=1)
+
+    async with controller.admit("/tickets", "10.0.0.1", NORMAL):
+        with pytest.raises(Rejected) as exc_info:
+            async with controller.admit("/tickets", "10.0.0.1", NORMAL):
+                pass
+        assert exc_info.value.status_code == 429
+        async with controller.admit("/tickets", "10.0.0.2", NORMAL):
+            pass
+
+
+def test_parse_route_limits():
+    assert parse_route_limits(None) is None
+    assert parse_route_limits('{"/tickets/search": 16}')["/tickets/search"] == 16
+    with pytest.raises(ValueError):
+        parse_route_limits('{"/nope": 1}')
+
+
+@pytest.mark.asyncio
+async def test_middleware_sheds_overload_but_not_health():
+    release = asyncio.Event()
+    app = FastAPI()
+
+    @app.get("/tickets/search")
+    async def search():
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    app.add_middleware(
+        AdmissionMiddleware, controller=AdmissionController(max_concurrency=1, queue_size=0, queue_timeout=3)
+    )
+    rejected = admission_rejected.labels("/tickets/search", "queue_full").value
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        first = asyncio.create_task(client.get("/tickets/search"))
+        await asyncio.sleep(0.05)
+
+        overflow = await client.get("/tickets/search")
+        assert overflow.status_code == 503
+        assert overflow.headers["Retry-After"] == "3"
+        assert (await client.get("/health")).status_code == 200
+
+        release.set()
+        assert (await first).status_code == 200
+    assert admission_rejected.labels("/tickets/search", "queue_full").value == rejected + 1
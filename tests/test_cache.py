@@ -0,0 +1,235 @@
+import asyncio
+import pytest
+
+from src.tickethub.cache import RedisError, SnapshotCache, TTLCache
+from src.tickethub.columnar import TicketColumns
+from src.tickethub.models import Ticket, TicketStatus, TicketPriority
+
+
+def _encode(value) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class FakeLock:
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+
+    async def acquire(self) -> bool:
+        await self.redis.lock_.acquire()
+        return True
+
+    async def release(self) -> None:
+        self.redis.lock_.release()
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def hset(self, key, mapping):
+        self.ops.append(lambda: self.redis.data.__setitem__(key, {_encode(k): _encode(v) for k, v in mapping.items()}))
+
+    def expire(self, key, seconds):
+        pass
+
+    def set(self, key, value):
+        self.ops.append(lambda: self.redis.data.__setitem__(key, _encode(value)))
+
+    async def execute(self):
+        for op in self.ops:
+            op()
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio.Redis for SnapshotCache."""
+
+    def __init__(self):
+        self.data = {}
+        self.lock_ = asyncio.Lock()
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise RedisError("connection refused")
+
+    async def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    async def hgetall(self, key):
+        self._check()
+        return self.data.get(key, {})
+
+    async def incr(self, key):
+        self._check()
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = _encode(value)
+        return value
+
+    def lock(self, name, timeout=None, blocking_timeout=None):
+        return FakeLock(self)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        tickets = [
+            Ticket(id=1, title="First", status=TicketStatus.OPEN, priority=TicketPriority.MEDIUM, assignee="alice"),
+            Ticket(id=2, title="Second", status=TicketStatus.CLOSED, priority=TicketPriority.HIGH, assignee="bob"),
+        ]
+        return TicketColumns.from_tickets(tickets), {1: "alice", 2: "bob"}
+
+
+def make_worker(redis: FakeRedis) -> SnapshotCache:
+    cache = SnapshotCache()
+    cache._redis = redis
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_memory_only_cache_loads_every_time():
+    loader = CountingLoader()
+    cache = SnapshotCache()
+
+    first = await cache.get_or_load(loader, max_age=60)
+    second = await cache.get_or_load(loader, max_age=60)
+
+    assert loader.calls == 2
+    assert (first.version, second.version) == (-1, -2)
+    assert len(first.columns) == 2
+
+
+@pytest.mark.asyncio
+async def test_workers_share_one_refresh():
+    redis = FakeRedis()
+    loader = CountingLoader()
+    workers = [make_worker(redis) for _ in range(4)]
+
+    snapshots = await asyncio.gather(*(w.get_or_load(loader, max_age=60) for w in workers))
+
+    assert loader.calls == 1
+    assert {s.version for s in snapshots} == {1}
+    for snapshot in snapshots:
+        assert snapshot.columns.tickets(range(2)) == [
+            Ticket(
+                id=1, title="First", status=TicketStatus.OPEN, priority=TicketPriority.MEDIUM,
+                assignee="alice", description="First"
+            ),
+            Ticket(
+                id=2, title="Second", status=TicketStatus.CLOSED, priority=TicketPriority.HIGH,
+                assignee="bob", description="Second"
+            ),
+        ]
+        assert snapshot.users == {1: "alice", 2: "bob"}
+        assert snapshot.stats.assignee_counts == {"alice": 1, "bob": 1}
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_reloaded_under_new_version():
+    redis = FakeRedis()
+    loader = CountingLoader()
+    cache = make_worker(redis)
+
+    await cache.get_or_load(loader, max_age=60)
+    snapshot = await cache.get_or_load(loader, max_age=0)
+
+    assert loader.calls == 2
+    assert snapshot.version == 2
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_memory_when_redis_is_down():
+    redis = FakeRedis()
+    redis.down = True
+    loader = CountingLoader()
+    cache = make_worker(redis)
+
+    snapshot = await cache.get_or_load(loader, max_age=60)
+
+    assert loader.calls == 1
+    assert len(snapshot.columns) == 2
+
+
+def test_ttl_cache_hits_and_misses():
+    cache = TTLCache(max_entries=10, ttl=60)
+
+    assert cache.get(1) is None
+    cache.set(1, "one")
+    assert cache.get(1) == "one"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl=60)
+    cache.set(1, "one")
+    cache.set(2, "two")
+    cache.get(1)
+
+    cache.set(3, "three")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "one"
+    assert cache.evictions == 1
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_entries=10, ttl=0)
+    cache.set(1, "one")
+
+    assert cache.get(1) is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+
+def test_ttl_cache_bounded_by_bytes():
+    cache = TTLCache(max_entries=100, ttl=60, max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+    cache.set("c", "xxxx")
+
+    assert len(cache) == 2
+    assert cache.bytes == 8
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_invalidate():
+    cache = TTLCache(max_entries=10, ttl=60, max_bytes=100, sizeof=len)
+    cache.set(1, "one")
+
+    cache.invalidate(1)
+    cache.invalidate(2)
+
+    assert cache.get(1) is None
+    assert cache.bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_local_versions_never_collide_with_redis_versions():
+    redis = FakeRedis()
+    redis.down = True
+    loader = CountingLoader()
+    cache = make_worker(redis)
+
+    local = await cache.get_or_load(loader, max_age=60)
+    redis.down = False
+    shared = await cache.get_or_load(loader, max_age=60)
+
+    assert shared.version == 1
+    assert local.version != shared.version
@@ -0,0 +1,104 @@
+import pytest
+
+from src.tickethub.columnar import TicketColumns, merge_diff
+from src.tickethub.models import Ticket, TicketStatus, TicketPriority
+
+
+def make_ticket(ticket_id: int, title: str = "", status=TicketStatus.OPEN, assignee="alice") -> Ticket:
+    title = title or f"Ticket {ticket_id}"
+    return Ticket(
+        id=ticket_id,
+        title=title,
+        status=status,
+        priority=TicketPriority.MEDIUM,
+        assignee=assignee,
+        description=title[:100]
+    )
+
+
+@pytest.fixture
+def tickets():
+    return [
+        make_ticket(1, "Fix login"),
+        make_ticket(2, "Café menu ÜBER", status=TicketStatus.CLOSED, assignee="bob"),
+        make_ticket(3, "x" * 150),
+    ]
+
+
+def test_round_trips_tickets(tickets):
+    columns = TicketColumns.from_tickets(tickets)
+
+    assert len(columns) == 3
+    assert columns.tickets(range(3)) == tickets
+    assert list(columns.iter_tickets()) == tickets
+    assert len(columns.ticket(2).description) == 100
+
+
+def test_assignees_are_interned(tickets):
+    columns = TicketColumns.from_tickets(tickets)
+
+    assert columns.assignee_names == ["alice", "bob"]
+    assert list(columns.assignees) == [0, 1, 0]
+    assert columns.assignee_counts() == {"alice": 2, "bob": 1}
+
+
+def test_dumps_and_loads(tickets):
+    columns = TicketColumns.from_tickets(tickets)
+
+    restored = TicketColumns.loads(columns.dumps())
+
+    assert restored.tickets(range(3)) == tickets
+    restored.append(4, "New", TicketStatus.OPEN, TicketPriority.LOW, "bob")
+    assert list(restored.assignees) == [0, 1, 0, 1]
+
+
+def test_attach_views_the_blob_without_copying(tickets):
+    columns = TicketColumns.from_tickets(tickets)
+
+    attached = TicketColumns.attach(bytearray(columns.dumps()))
+
+    assert isinstance(attached.ids, memoryview)
+    assert attached.tickets(range(3)) == tickets
+    assert attached.status_counts() == columns.status_counts()
+    assert attached.priority_counts() == columns.priority_counts()
+    assert TicketColumns.loads(attached.dumps()).tickets(range(3)) == tickets
+    with pytest.raises(TypeError):
+        attached.extend(columns)
+
+
+def test_loads_rejects_other_data():
+    with pytest.raises(ValueError):
+        TicketColumns.loads(b"\0" * 64)
+
+
+def test_sorted_by_id(tickets):
+    columns = TicketColumns.from_tickets(reversed(tickets))
+
+    assert columns.sorted_by_id().tickets(range(3)) == tickets
+    ordered = TicketColumns.from_tickets(tickets)
+    assert ordered.sorted_by_id() is ordered
+
+
+def test_extend_and_id_range(tickets):
+    columns = TicketColumns.from_tickets([make_ticket(10, "Other", assignee="carol")])
+
+    columns.extend(TicketColumns.from_tickets(tickets))
+
+    assert columns.assignee_names == ["carol", "alice", "bob"]
+    assert columns.tickets(range(1, 4)) == tickets
+    ordered = columns.sorted_by_id()
+    assert ordered.id_range(2, 10).tickets(range(2)) == tickets[1:]
+    assert list(ordered.id_range(10).ids) == [10]
+    attached = TicketColumns.attach(bytearray(ordered.dumps()))
+    assert attached.id_range(0, 10).tickets(range(3)) == tickets
+
+
+def test_merge_diff_walks_sorted_ids():
+    old = TicketColumns.from_tickets([make_ticket(1), make_ticket(2), make_ticket(4)])
+    new = TicketColumns.from_tickets([make_ticket(2, "Renamed"), make_ticket(3), make_ticket(4), make_ticket(5)])
+
+    added, updated, removed = merge_diff(old, new)
+
+    assert [new.ids[p] for p in added] == [3, 5]
+    assert updated == [(1, 0)]
+    assert [old.ids[p] for p in removed] == [1]
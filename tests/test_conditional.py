@@ -0,0 +1,53 @@
+from starlette.requests import Request
+
+from src.tickethub.conditional import Validators, is_not_modified, make_etag, request_scope
+
+
+def make_request(path="/tickets", query=b"", headers=None):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query,
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+    return Request(scope)
+
+
+def test_make_etag_is_quoted_and_stable():
+    etag = make_etag("00ff", "/stats?")
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("00ff", "/stats?")
+    assert etag != make_etag("00fe", "/stats?")
+
+
+def test_request_scope_normalizes_query_order():
+    first = make_request(query=b"status=open&page=2")
+    second = make_request(query=b"page=2&status=open")
+
+    assert request_scope(first) == request_scope(second) == "/tickets?page=2&status=open"
+
+
+def test_if_none_match():
+    validators = Validators(etag='"abc"', last_modified=1_700_000_000)
+
+    assert is_not_modified(make_request(headers={"If-None-Match": '"abc"'}), validators)
+    assert is_not_modified(make_request(headers={"If-None-Match": '"x", W/"abc"'}), validators)
+    assert is_not_modified(make_request(headers={"If-None-Match": "*"}), validators)
+    assert not is_not_modified(make_request(headers={"If-None-Match": '"other"'}), validators)
+    assert not is_not_modified(make_request(), validators)
+
+
+def test_if_modified_since_only_without_if_none_match():
+    validators = Validators(etag='"abc"', last_modified=1_700_000_000)
+    headers = validators.headers
+
+    assert is_not_modified(make_request(headers={"If-Modified-Since": headers["Last-Modified"]}), validators)
+    assert not is_not_modified(
+        make_request(headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}), validators
+    )
+    assert not is_not_modified(
+        make_request(headers={"If-Modified-Since": headers["Last-Modified"], "If-None-Match": '"x"'}), validators
+    )
+    assert not is_not_modified(make_request(headers={"If-Modified-Since": "garbage"}), validators)
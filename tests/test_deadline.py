@@ -0,0 +1,91 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException, Request
+
+from src.tickethub.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    cap_timeout,
+    detached,
+    remaining,
+    request_deadline,
+    within,
+)
+
+
+def make_request(headers=()):
+    return Request({"type": "http", "headers": [(name.encode(), value.encode()) for name, value in headers]})
+
+
+@pytest.mark.asyncio
+async def test_within_cancels_work_past_the_deadline():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(DeadlineExceeded):
+        async with within(Deadline.after(0.01)):
+            await slow()
+    assert cancelled.is_set()
+    assert remaining() is None
+
+
+@pytest.mark.asyncio
+async def test_nested_deadline_cannot_extend_the_outer_one():
+    async with within(Deadline.after(0.5)):
+        async with within(Deadline.after(60)):
+            assert remaining() <= 0.5
+        async with within(None):
+            assert remaining() <= 0.5
+
+
+@pytest.mark.asyncio
+async def test_cap_timeout_shortens_every_phase():
+    timeout = httpx.Timeout(10.0, connect=2.0)
+
+    assert cap_timeout(timeout, timeout) is timeout
+    async with within(Deadline.after(0.5)):
+        capped = cap_timeout(httpx.USE_CLIENT_DEFAULT, timeout)
+        assert 0 < capped.read <= 0.5 and 0 < capped.connect <= 0.5
+    async with within(Deadline(asyncio.get_running_loop().time() - 1)):
+        with pytest.raises(DeadlineExceeded):
+            cap_timeout(timeout, timeout)
+
+
+@pytest.mark.asyncio
+async def test_detached_tasks_do_not_inherit_the_deadline():
+    async def budget():
+        return remaining()
+
+    async with within(Deadline.after(0.5)):
+        inherited = await asyncio.create_task(budget())
+        background = await asyncio.create_task(budget(), context=detached())
+
+    assert inherited is not None
+    assert background is None
+
+
+@pytest.mark.asyncio
+async def test_request_deadline_reads_header_and_route_default():
+    loop = asyncio.get_running_loop()
+
+    deadline = await request_deadline(2.0)(make_request())
+    assert 1.9 < deadline.expires_at - loop.time() <= 2.0
+
+    deadline = await request_deadline(2.0)(make_request([("x-request-timeout", "0.25")]))
+    assert deadline.expires_at - loop.time() <= 0.25
+
+    deadline = await request_deadline(2.0)(make_request([("x-request-timeout", "3600")]))
+    assert deadline.expires_at - loop.time() <= 30.0
+
+    for bad in ("soon", "0", "-1", "nan"):
+        with pytest.raises(HTTPException) as excinfo:
+            await request_deadline(2.0)(make_request([("x-request-timeout", bad)]))
+        assert excinfo.value.status_code == 400
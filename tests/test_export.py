@@ -0,0 +1,53 @@
+import csv
+import io
+import json
+import pytest
+
+from src.tickethub.columnar import TicketColumns
+from src.tickethub.export import ExportFormat, stream_export
+from src.tickethub.models import TicketStatus, TicketPriority
+
+
+@pytest.fixture
+def columns():
+    columns = TicketColumns()
+    for i in range(1, 1201):
+        columns.append(i, f"Ticket \"{i}\"\nline two", TicketStatus.OPEN, TicketPriority.LOW, "alice")
+    return columns
+
+
+async def collect(columns, positions, fmt):
+    return [chunk async for chunk in stream_export(columns, positions, fmt, chunk_rows=500)]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_is_chunked(columns):
+    chunks = await collect(columns, range(len(columns)), ExportFormat.NDJSON)
+
+    assert len(chunks) == 3
+    rows = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+    assert len(rows) == 1200
+    assert rows[0] == {
+        "id": 1,
+        "title": "Ticket \"1\"\nline two",
+        "status": "open",
+        "priority": "low",
+        "assignee": "alice",
+        "description": "Ticket \"1\"\nline two",
+    }
+
+
+@pytest.mark.asyncio
+async def test_csv_export_round_trips(columns):
+    chunks = await collect(columns, iter([0, 599, 1199]), ExportFormat.CSV)
+
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == ["id", "title", "status", "priority", "assignee", "description"]
+    assert [row[0] for row in rows[1:]] == ["1", "600", "1200"]
+    assert rows[2][1] == "Ticket \"600\"\nline two"
+
+
+@pytest.mark.asyncio
+async def test_empty_export(columns):
+    assert await collect(columns, [], ExportFormat.NDJSON) == []
+    assert await collect(columns, [], ExportFormat.CSV) == [b"id,title,status,priority,assignee,description\r\n"]
@@ -0,0 +1,131 @@
+import asyncio
+import json
+
+import pytest
+
+from src.tickethub.columnar import TicketColumns
+from src.tickethub.feed import ChangeFeed, FeedFull
+from src.tickethub.models import Ticket, TicketPriority, TicketStatus
+from src.tickethub.services import DummyJSONService
+from src.tickethub.snapshot import TicketSnapshot, diff_columns
+from src.tickethub.sources import FileSource
+
+
+def make_columns(*tickets):
+    return TicketColumns.from_tickets([
+        Ticket(id=ticket_id, title=title, status=TicketStatus.OPEN, priority=TicketPriority.LOW, assignee="alice")
+        for ticket_id, title in tickets
+    ])
+
+
+def snapshot_of(columns):
+    return TicketSnapshot(columns=columns, users={}, version=1)
+
+
+def parse(frame):
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return fields.get("id"), fields["event"], json.loads(fields["data"])
+
+
+async def next_event(stream):
+    return parse(await asyncio.wait_for(anext(stream), 1))
+
+
+@pytest.fixture
+def versions():
+    return make_columns((1, "One"), (2, "Two")), make_columns((2, "Two!"), (3, "Three"))
+
+
+@pytest.mark.asyncio
+async def test_subscribers_receive_ticket_deltas(versions):
+    old, new = versions
+    feed = ChangeFeed()
+    stream = feed.subscribe(snapshot_of(old))
+
+    _, kind, data = await next_event(stream)
+    assert kind == "ready" and data["cursor"] == feed.cursor
+    feed.publish(snapshot_of(new), diff_columns(old, new))
+
+    cursor, kind, data = await next_event(stream)
+    assert cursor == feed.cursor and kind == "changes"
+    assert [ticket["id"] for ticket in data["added"]] == [3]
+    assert [ticket["title"] for ticket in data["updated"]] == ["Two!"]
+    assert data["removed"] == [1]
+    await stream.aclose()
+    assert feed.subscribers == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_dropped_to_a_resync(versions):
+    old, new = versions
+    feed = ChangeFeed(buffer_size=1)
+    slow, fast = feed.subscribe(snapshot_of(old)), feed.subscribe(snapshot_of(old))
+    await next_event(slow)
+    await next_event(fast)
+
+    for before, after in ((old, new), (new, old)):
+        feed.publish(snapshot_of(after), diff_columns(before, after))
+        assert (await next_event(fast))[1] == "changes"
+
+    _, kind, data = await next_event(slow)
+    assert kind == "resync" and data["reason"] == "slow_consumer"
+    with pytest.raises(StopAsyncIteration):
+        await anext(slow)
+    assert feed.dropped == 1 and feed.subscribers == 1
+    await fast.aclose()
+
+
+@pytest.mark.asyncio
+async def test_resume_replays_missed_events(versions):
+    old, new = versions
+    feed = ChangeFeed()
+    start = feed.cursor
+    feed.publish(snapshot_of(new), diff_columns(old, new))
+
+    stream = feed.subscribe(snapshot_of(new), since=start)
+    assert (await next_event(stream))[1] == "ready"
+    assert (await next_event(stream))[1] == "changes"
+    await stream.aclose()
+
+    stream = feed.subscribe(snapshot_of(new), since="elsewhere-3")
+    await next_event(stream)
+    _, kind, data = await next_event(stream)
+    assert kind == "resync" and data["reason"] == "unknown_cursor"
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_large_diffs_and_subscriber_limit(versions):
+    old, new = versions
+    feed = ChangeFeed(max_delta=2, max_subscribers=1)
+    stream = feed.subscribe(snapshot_of(old))
+    await next_event(stream)
+
+    with pytest.raises(FeedFull):
+        feed.subscribe(snapshot_of(old))
+    feed.publish(snapshot_of(new), diff_columns(old, new))
+    _, kind, data = await next_event(stream)
+    assert kind == "resync" and data["reason"] == "too_many_changes"
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_service_streams_diffs_of_successive_loads(tmp_path):
+    todos = tmp_path / "todos.json"
+    todos.write_text(json.dumps([{"id": 1, "todo": "One", "completed": False, "userId": 1}]))
+    service = DummyJSONService(source=FileSource(str(todos)))
+    await service.store.refresh()
+
+    stream = await service.stream_changes()
+    _, _, ready = await next_event(stream)
+    assert ready["stats"]["total_tickets"] == 1
+
+    todos.write_text(json.dumps([{"id": 1, "todo": "One", "completed": True, "userId": 1}]))
+    service.source = FileSource(str(todos))
+    await service.store.refresh()
+
+    _, kind, data = await next_event(stream)
+    assert kind == "changes" and data["updated"][0]["status"] == "closed"
+    assert data["stats"]["closed_tickets"] == 1
+    await stream.aclose()
+    await service.close()
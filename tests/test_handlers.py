@@ -1,9 +1,14 @@
+import asyncio
 import pytest
 from unittest.mock import AsyncMock
 from fastapi import HTTPException
 
+from src.tickethub.deadline import Deadline
 from src.tickethub.handlers import TicketHandler
-from src.tickethub.models import Ticket, TicketDetail, TicketStats, TicketStatus, TicketPriority
+from src.tickethub.pagination import decode_cursor, encode_cursor
+from src.tickethub.services import TicketPage
+from src.tickethub.upstream import CircuitOpenError
+from src.tickethub.models import Ticket, TicketBatch, TicketBatchItem, TicketDetail, TicketStats, TicketStatus, TicketPriority
 
 
 @pytest.fixture
@@ -18,12 +23,14 @@ def handler(mock_service):
 
 @pytest.mark.asyncio
 async def test_get_tickets_success(handler, mock_service):
-    mock_service.get_tickets.return_value = (
+    mock_service.get_tickets.return_value = TicketPage(
         [
             Ticket(id=1, title="Test 1", status=TicketStatus.OPEN, priority=TicketPriority.HIGH, assignee="user1"),
             Ticket(id=2, title="Test 2", status=TicketStatus.CLOSED, priority=TicketPriority.LOW, assignee="user2")
         ],
-        2
+        2,
+        False,
+        []
     )
 
     result = await handler.get_tickets(page=1, limit=10)
@@ -35,15 +42,39 @@ async def test_get_tickets_success(handler, mock_service):
     assert result.has_next is False
 
     mock_service.get_tickets.assert_called_once_with(
-        skip=0, limit=10, status=None, priority=None
+        skip=0, limit=10, status=None, priority=None, assignee=None, include_total=True
     )
 
 
+@pytest.mark.asyncio
+async def test_get_tickets_reports_missing_sources(handler, mock_service):
+    mock_service.get_tickets.return_value = TicketPage([], 0, False, ["us"])
+
+    result = await handler.get_tickets(page=1, limit=10)
+
+    assert result.missing_sources == ["us"]
+
+
+@pytest.mark.asyncio
+async def test_slow_detail_past_deadline_returns_504(handler, mock_service):
+    async def slow(ticket_id):
+        await asyncio.sleep(1)
+
+    mock_service.get_ticket_by_id.side_effect = slow
+
+    with pytest.raises(HTTPException) as exc_info:
+        await handler.get_ticket_by_id(1, deadline=Deadline.after(0.01))
+
+    assert exc_info.value.status_code == 504
+
+
 @pytest.mark.asyncio
 async def test_get_tickets_with_filters(handler, mock_service):
-    mock_service.get_tickets.return_value = (
+    mock_service.get_tickets.return_value = TicketPage(
         [Ticket(id=1, title="Open high", status=TicketStatus.OPEN, priority=TicketPriority.HIGH, assignee="user1")],
-        1
+        1,
+        False,
+        []
     )
 
     result = await handler.get_tickets(
@@ -58,15 +89,17 @@ async def test_get_tickets_with_filters(handler, mock_service):
     assert result.tickets[0].priority == TicketPriority.HIGH
 
     mock_service.get_tickets.assert_called_once_with(
-        skip=0, limit=10, status=TicketStatus.OPEN, priority=TicketPriority.HIGH
+        skip=0, limit=10, status=TicketStatus.OPEN, priority=TicketPriority.HIGH, assignee=None, include_total=True
     )
 
 
 @pytest.mark.asyncio
 async def test_get_tickets_with_pagination(handler, mock_service):
-    mock_service.get_tickets.return_value = (
+    mock_service.get_tickets.return_value = TicketPage(
         [Ticket(id=11, title="Test 11", status=TicketStatus.OPEN, priority=TicketPriority.MEDIUM, assignee="user1")],
-        15  # Total tickets
+        15,  # Total tickets
+        False,  # 10 + 10 = 20 > 15, so no next page
+        []
     )
 
     result = await handler.get_tickets(page=2, limit=10)
@@ -74,10 +107,10 @@ async def test_get_tickets_with_pagination(handler, mock_service):
     assert result.page == 2
     assert result.limit == 10
     assert result.total == 15
-    assert result.has_next is False  # 10 + 10 = 20 > 15, so no next page
+    assert result.has_next is False
 
     mock_service.get_tickets.assert_called_once_with(
-        skip=10, limit=10, status=None, priority=None
+        skip=10, limit=10, status=None, priority=None, assignee=None, include_total=True
     )
 
 
@@ -94,9 +127,11 @@ async def test_get_tickets_error(handler, mock_service):
 
 @pytest.mark.asyncio
 async def test_search_tickets_success(handler, mock_service):
-    mock_service.get_tickets.return_value = (
+    mock_service.get_tickets.return_value = TicketPage(
         [Ticket(id=1, title="Important task", status=TicketStatus.OPEN, priority=TicketPriority.HIGH, assignee="user1")],
-        1
+        1,
+        False,
+        []
     )
 
     result = await handler.search_tickets("important", page=1, limit=10)
@@ -105,7 +140,7 @@ async def test_search_tickets_success(handler, mock_service):
     assert "Important" in result.tickets[0].title
 
     mock_service.get_tickets.assert_called_once_with(
-        skip=0, limit=10, search="important"
+        skip=0, limit=10, search="important", include_total=True
     )
 
 
@@ -151,6 +186,17 @@ async def test_get_ticket_by_id_not_found(handler, mock_service):
     assert exc_info.value.detail == "Ticket not found"
 
 
+@pytest.mark.asyncio
+async def test_get_ticket_by_id_upstream_unavailable(handler, mock_service):
+    mock_service.get_ticket_by_id.side_effect = CircuitOpenError(12.3)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await handler.get_ticket_by_id(1)
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers == {"Retry-After": "13"}
+
+
 @pytest.mark.asyncio
 async def test_get_ticket_by_id_error(handler, mock_service):
     mock_service.get_ticket_by_id.side_effect = Exception("Database error")
@@ -190,3 +236,158 @@ async def test_get_ticket_stats_error(handler, mock_service):
 
     assert exc_info.value.status_code == 500
     assert exc_info.value.detail == "Internal server error"
+
+
+@pytest.mark.asyncio
+async def test_get_tickets_batch_success(handler, mock_service):
+    mock_service.get_tickets_by_ids.return_value = TicketBatch(
+        items=[
+            TicketBatchItem(id=1, ticket=TicketDetail(
+                id=1, title="Test", status=TicketStatus.OPEN, priority=TicketPriority.MEDIUM,
+                assignee="user1", raw_data={"id": 1}
+            )),
+            TicketBatchItem(id=999, error="not_found"),
+        ],
+        found=1,
+        missing=1
+    )
+
+    result = await handler.get_tickets_batch([1, 999])
+
+    assert result.found == 1
+    assert result.items[1].error == "not_found"
+    mock_service.get_tickets_by_ids.assert_called_once_with([1, 999])
+
+
+@pytest.mark.asyncio
+async def test_get_tickets_batch_error(handler, mock_service):
+    mock_service.get_tickets_by_ids.side_effect = Exception("Batch error")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await handler.get_tickets_batch([1])
+
+    assert exc_info.value.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_get_tickets_with_cursor(handler, mock_service):
+    mock_service.get_tickets_after.return_value = TicketPage(
+        [Ticket(id=12, title="Test 12", status=TicketStatus.OPEN, priority=TicketPriority.LOW, assignee="user1")],
+        None,
+        True,
+        []
+    )
+    cursor = encode_cursor(11)
+
+    result = await handler.get_tickets(limit=1, cursor=cursor)
+
+    assert result.total is None
+    assert result.page is None
+    assert result.has_next is True
+    assert decode_cursor(result.next_cursor) == 12
+    mock_service.get_tickets_after.assert_called_once_with(
+        after=11, limit=1, include_total=False, status=None, priority=None, assignee=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_tickets_page_without_total(handler, mock_service):
+    mock_service.get_tickets.return_value = TicketPage(
+        [
+            Ticket(id=i, title=f"Test {i}", status=TicketStatus.OPEN, priority=TicketPriority.LOW, assignee="user1")
+            for i in (9, 10)
+        ],
+        None,
+        True,
+        []
+    )
+
+    result = await handler.get_tickets(page=5, limit=2, include_total=False)
+
+    assert [t.id for t in result.tickets] == [9, 10]
+    assert result.page == 5
+    assert result.total is None
+    assert result.has_next is True
+    assert decode_cursor(result.next_cursor) == 10
+    mock_service.get_tickets.assert_called_once_with(
+        skip=8, limit=2, status=None, priority=None, assignee=None, include_total=False
+    )
+    mock_service.get_tickets_after.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_tickets_last_page_without_total(handler, mock_service):
+    mock_service.get_tickets.return_value = TicketPage([], None, False, [])
+
+    result = await handler.search_tickets("test", page=3, include_total=False)
+
+    assert result.page == 3
+    assert result.total is None
+    assert result.has_next is False
+    assert result.next_cursor is None
+    mock_service.get_tickets.assert_called_once_with(skip=20, limit=10, search="test", include_total=False)
+
+
+@pytest.mark.asyncio
+async def test_get_tickets_invalid_cursor(handler, mock_service):
+    with pytest.raises(HTTPException) as exc_info:
+        await handler.get_tickets(cursor="garbage!")
+
+    assert exc_info.value.status_code == 400
+    mock_service.get_tickets_after.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_page_mode_returns_next_cursor(handler, mock_service):
+    mock_service.get_tickets.return_value = TicketPage(
+        [Ticket(id=3, title="Test 3", status=TicketStatus.OPEN, priority=TicketPriority.LOW, assignee="user1")],
+        5,
+        True,
+        []
+    )
+
+    result = await handler.get_tickets(page=1, limit=1)
+
+    assert decode_cursor(result.next_cursor) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_validators(handler, mock_service):
+    mock_service.get_data_version.return_value = (0xABC, 1_700_000_000.0)
+
+    first = await handler.get_validators("/tickets?page=1")
+    second = await handler.get_validators("/tickets?page=2")
+
+    assert first.etag != second.etag
+    assert first.last_modified == 1_700_000_000.0
+
+
+@pytest.mark.asyncio
+async def test_get_validators_tolerates_service_errors(handler, mock_service):
+    mock_service.get_data_version.side_effect = Exception("upstream down")
+
+    assert await handler.get_validators("/stats?") is None
+
+
+@pytest.mark.asyncio
+async def test_get_ticket_validators_unknown_ticket(handler, mock_service):
+    mock_service.get_ticket_version.return_value = None
+
+    assert await handler.get_ticket_validators(999) is None
+
+
+@pytest.mark.asyncio
+async def test_validators_past_deadline_return_504(handler, mock_service):
+    async def cold_store(*args):
+        await asyncio.sleep(1)
+
+    mock_service.get_data_version.side_effect = cold_store
+    mock_service.get_ticket_version.side_effect = cold_store
+
+    with pytest.raises(HTTPException) as exc_info:
+        await handler.get_validators("/stats?", deadline=Deadline.after(0.01))
+    assert exc_info.value.status_code == 504
+
+    with pytest.raises(HTTPException) as exc_info:
+        await handler.get_ticket_validators(1, deadline=Deadline.after(0.01))
+    assert exc_info.value.status_code == 504
@@ -0,0 +1,83 @@
+import pytest
+
+from src.tickethub.columnar import TicketColumns
+from src.tickethub.indexes import TicketIndex
+from src.tickethub.models import Ticket, TicketStatus, TicketPriority
+
+
+@pytest.fixture
+def tickets():
+    priorities = [TicketPriority.LOW, TicketPriority.MEDIUM, TicketPriority.HIGH]
+    return [
+        Ticket(
+            id=i,
+            title=f"Ticket {i}",
+            status=TicketStatus.CLOSED if i % 2 else TicketStatus.OPEN,
+            priority=priorities[i % 3],
+            assignee=f"user{i % 4}"
+        )
+        for i in range(1, 61)
+    ]
+
+
+def brute_force(tickets, status=None, priority=None, assignee=None):
+    return [
+        position for position, t in enumerate(tickets)
+        if (status is None or t.status == status)
+        and (priority is None or t.priority == priority)
+        and (assignee is None or t.assignee == assignee)
+    ]
+
+
+def test_no_filters_selects_everything(tickets):
+    index = TicketIndex(TicketColumns.from_tickets(tickets))
+
+    assert list(index.select()) == list(range(len(tickets)))
+
+
+@pytest.mark.parametrize("status", [None, TicketStatus.OPEN, TicketStatus.CLOSED])
+@pytest.mark.parametrize("priority", [None, TicketPriority.LOW, TicketPriority.HIGH])
+@pytest.mark.parametrize("assignee", [None, "user1", "user2"])
+def test_select_matches_full_scan(tickets, status, priority, assignee):
+    index = TicketIndex(TicketColumns.from_tickets(tickets))
+
+    selected = list(index.select(status=status, priority=priority, assignee=assignee))
+
+    assert selected == brute_force(tickets, status, priority, assignee)
+
+
+def test_unknown_assignee_selects_nothing(tickets):
+    index = TicketIndex(TicketColumns.from_tickets(tickets))
+
+    assert list(index.select(assignee="nobody")) == []
+    assert list(index.select(status=TicketStatus.OPEN, assignee="nobody")) == []
+
+
+@pytest.mark.parametrize("start", [0, 7, 30, 59, 60])
+def test_iter_select_resumes_from_start(tickets, start):
+    index = TicketIndex(TicketColumns.from_tickets(tickets))
+
+    resumed = list(index.iter_select(status=TicketStatus.OPEN, assignee="user2", start=start))
+
+    expected = [p for p in brute_force(tickets, status=TicketStatus.OPEN, assignee="user2") if p >= start]
+    assert resumed == expected
+    assert list(index.iter_select(start=start)) == list(range(start, len(tickets)))
+
+
+def test_start_after_handles_missing_ids(tickets):
+    index = TicketIndex(TicketColumns.from_tickets([t for t in tickets if t.id != 10]))
+
+    # ids 1..9 sit at positions 0..8 and id 11 at position 9
+    assert index.start_after(9) == 9
+    assert index.start_after(10) == 9
+    assert index.start_after(0) == 0
+    assert index.start_after(1000) == len(tickets) - 1
+
+
+def test_position_of(tickets):
+    index = TicketIndex(TicketColumns.from_tickets([t for t in tickets if t.id != 10]))
+
+    assert index.position_of(1) == 0
+    assert index.position_of(11) == 9
+    assert index.position_of(10) is None
+    assert index.position_of(1000) is None
@@ -0,0 +1,97 @@
+import asyncio
+import httpx
+import pytest
+
+from src.tickethub.ingest import PagedFetcher
+
+
+def make_upstream(total: int, max_limit: int = 1000, delay: float = 0.0):
+    state = {"in_flight": 0, "max_in_flight": 0, "requests": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state["requests"] += 1
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(delay)
+            skip = int(request.url.params.get("skip", 0))
+            limit = min(int(request.url.params.get("limit", 30)), max_limit)
+            todos = [{"id": i + 1} for i in range(skip, min(skip + limit, total))]
+            return httpx.Response(200, json={"todos": todos, "total": total, "skip": skip, "limit": len(todos)})
+        finally:
+            state["in_flight"] -= 1
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), state
+
+
+async def collect(fetcher: PagedFetcher) -> list[int]:
+    ids = []
+    async for page in fetcher.pages("http://upstream/todos", "todos"):
+        ids.extend(todo["id"] for todo in page)
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_fetches_every_page_in_order():
+    client, state = make_upstream(total=250)
+    fetcher = PagedFetcher(client, page_size=100, concurrency=2)
+
+    ids = await collect(fetcher)
+
+    assert ids == list(range(1, 251))
+    assert state["requests"] == 3
+    stats = fetcher.last_run["todos"]
+    assert stats.records == 250
+    assert stats.pages == 3
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_bounds_requests_in_flight():
+    client, state = make_upstream(total=1000, delay=0.01)
+    fetcher = PagedFetcher(client, page_size=50, concurrency=3)
+
+    ids = await collect(fetcher)
+
+    assert len(ids) == 1000
+    assert state["max_in_flight"] <= 3
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_steps_by_upstream_capped_limit():
+    client, state = make_upstream(total=95, max_limit=30)
+    fetcher = PagedFetcher(client, page_size=100, concurrency=4)
+
+    ids = await collect(fetcher)
+
+    assert ids == list(range(1, 96))
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_single_page_without_total():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"todos": [{"id": 1}, {"id": 2}]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    fetcher = PagedFetcher(client)
+
+    assert await collect(fetcher) == [1, 2]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_page_error_propagates():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params.get("skip") == "10":
+            return httpx.Response(500)
+        skip = int(request.url.params["skip"])
+        return httpx.Response(200, json={"todos": [{"id": skip + i} for i in range(10)], "total": 30})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    fetcher = PagedFetcher(client, page_size=10)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await collect(fetcher)
+    await client.aclose()
@@ -1,8 +1,12 @@
+import json
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import AsyncMock, patch
+from src.tickethub.columnar import TicketColumns
 from src.tickethub.main import app
-from src.tickethub.models import Ticket, TicketDetail, TicketStats, TicketStatus, TicketPriority
+from src.tickethub.services import DummyJSONService, TicketPage, get_service
+from src.tickethub.models import Ticket, TicketBatch, TicketBatchItem, TicketDetail, TicketStats, TicketStatus, TicketPriority
 
 
 @pytest.fixture
@@ -31,12 +35,14 @@ def test_root_redirect(client):
 @patch('src.tickethub.handlers.get_service')
 def test_get_tickets(mock_get_service, client):
     mock_service = AsyncMock()
-    mock_service.get_tickets.return_value = (
+    mock_service.get_tickets.return_value = TicketPage(
         [
             Ticket(id=1, title="Test 1", status=TicketStatus.OPEN, priority=TicketPriority.HIGH, assignee="user1"),
             Ticket(id=2, title="Test 2", status=TicketStatus.CLOSED, priority=TicketPriority.LOW, assignee="user2")
         ],
-        2
+        2,
+        False,
+        []
     )
     mock_get_service.return_value = mock_service
     
@@ -54,9 +60,11 @@ def test_get_tickets(mock_get_service, client):
 @patch('src.tickethub.handlers.get_service')
 def test_get_tickets_with_filters(mock_get_service, client):
     mock_service = AsyncMock()
-    mock_service.get_tickets.return_value = (
+    mock_service.get_tickets.return_value = TicketPage(
         [Ticket(id=1, title="Open ticket", status=TicketStatus.OPEN, priority=TicketPriority.HIGH, assignee="user1")],
-        1
+        1,
+        False,
+        []
     )
     mock_get_service.return_value = mock_service
     
@@ -64,16 +72,18 @@ def test_get_tickets_with_filters(mock_get_service, client):
     assert response.status_code == 200
     
     mock_service.get_tickets.assert_called_once_with(
-        skip=0, limit=10, status=TicketStatus.OPEN, priority=TicketPriority.HIGH
+        skip=0, limit=10, status=TicketStatus.OPEN, priority=TicketPriority.HIGH, assignee=None, include_total=True
     )
 
 
 @patch('src.tickethub.handlers.get_service')
 def test_search_tickets(mock_get_service, client):
     mock_service = AsyncMock()
-    mock_service.get_tickets.return_value = (
+    mock_service.get_tickets.return_value = TicketPage(
         [Ticket(id=1, title="Important task", status=TicketStatus.OPEN, priority=TicketPriority.HIGH, assignee="user1")],
-        1
+        1,
+        False,
+        []
     )
     mock_get_service.return_value = mock_service
     
@@ -81,7 +91,7 @@ def test_search_tickets(mock_get_service, client):
     assert response.status_code == 200
     
     mock_service.get_tickets.assert_called_once_with(
-        skip=0, limit=10, search="important"
+        skip=0, limit=10, search="important", include_total=True
     )
 
 
@@ -157,3 +167,167 @@ def test_invalid_page_number(client):
 def test_search_without_query(client):
     response = client.get("/tickets/search")
     assert response.status_code == 422
+
+
+def test_batch_requires_ids(client):
+    response = client.get("/tickets/batch")
+    assert response.status_code == 422
+
+
+def test_batch_rejects_too_many_ids(client):
+    query = "&".join(f"ids={i}" for i in range(1, 202))
+    response = client.get(f"/tickets/batch?{query}")
+    assert response.status_code == 422
+
+
+def test_stats_conditional_get(client):
+    mock_service = AsyncMock()
+    mock_service.get_data_version.return_value = (0x1234, 1_700_000_000.0)
+    mock_service.get_ticket_stats.return_value = TicketStats(
+        total_tickets=1, open_tickets=1, closed_tickets=0,
+        priority_counts={"low": 1, "medium": 0, "high": 0}, assignee_counts={"user1": 1}
+    )
+    app.dependency_overrides[get_service] = lambda: mock_service
+    try:
+        response = client.get("/stats")
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert "max-age" in response.headers["cache-control"]
+        assert "last-modified" in response.headers
+
+        cached = client.get("/stats", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+        assert mock_service.get_ticket_stats.call_count == 1
+
+        mock_service.get_data_version.return_value = (0x5678, 1_700_000_100.0)
+        changed = client.get("/stats", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_hot_list_page_is_served_from_response_cache(client):
+    mock_service = AsyncMock()
+    mock_service.get_data_version.return_value = (0xCAFE, 1_700_000_000.0)
+    mock_service.get_tickets.return_value = TicketPage(
+        [Ticket(id=1, title="Test 1", status=TicketStatus.OPEN, priority=TicketPriority.HIGH, assignee="user1")],
+        1,
+        False,
+        []
+    )
+    app.dependency_overrides[get_service] = lambda: mock_service
+    try:
+        first = client.get("/tickets?status=open&page=1")
+        second = client.get("/tickets?page=1&status=open")
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assert first.json()["tickets"][0]["id"] == 1
+        assert mock_service.get_tickets.call_count == 1
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_export_streams_ndjson_and_csv(client):
+    columns = TicketColumns.from_tickets([
+        Ticket(id=1, title="First, with comma", status=TicketStatus.OPEN, priority=TicketPriority.HIGH, assignee="user1"),
+        Ticket(id=2, title="Second", status=TicketStatus.CLOSED, priority=TicketPriority.LOW, assignee="user2"),
+    ])
+    mock_service = AsyncMock()
+    mock_service.get_data_version.return_value = (0xBEEF, 1_700_000_000.0)
+    mock_service.export_tickets.side_effect = lambda **filters: (columns, iter(range(len(columns))))
+    app.dependency_overrides[get_service] = lambda: mock_service
+    try:
+        response = client.get("/tickets/export?status=open&q=first")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert "etag" in response.headers
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == [1, 2]
+        assert rows[0]["description"] == "First, with comma"
+        mock_service.export_tickets.assert_called_with(
+            status=TicketStatus.OPEN, priority=None, search="first", assignee=None
+        )
+
+        response = client.get("/tickets/export?format=csv")
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="tickets.csv"' in response.headers["content-disposition"]
+        lines = response.text.splitlines()
+        assert lines[0] == "id,title,status,priority,assignee,description"
+        assert lines[1] == '1,"First, with comma",open,high,user1,"First, with comma"'
+
+        assert client.get("/tickets/export?format=xml").status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_batch_etag_skips_bodies_with_failed_items(client):
+    detail = TicketDetail(
+        id=1, title="Test 1", status=TicketStatus.OPEN, priority=TicketPriority.HIGH, assignee="user1", raw_data={}
+    )
+    mock_service = AsyncMock()
+    mock_service.get_tickets_version.return_value = (0xABC, 1_700_000_000.0)
+    mock_service.get_tickets_by_ids.return_value = TicketBatch(
+        items=[TicketBatchItem(id=1, ticket=detail), TicketBatchItem(id=2, error="upstream_error")], found=1, missing=1
+    )
+    app.dependency_overrides[get_service] = lambda: mock_service
+    try:
+        failed = client.get("/tickets/batch?ids=1&ids=2")
+        assert failed.status_code == 200
+        assert "etag" not in failed.headers
+
+        mock_service.get_tickets_by_ids.return_value = TicketBatch(
+            items=[TicketBatchItem(id=1, ticket=detail)], found=1, missing=0
+        )
+        ok = client.get("/tickets/batch?ids=1")
+        etag = ok.headers["etag"]
+        assert client.get("/tickets/batch?ids=1", headers={"If-None-Match": etag}).status_code == 304
+        mock_service.get_tickets_version.assert_called_with([1])
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_detail_fallback_from_snapshot_has_no_etag(client):
+    detail = TicketDetail(
+        id=1, title="Test 1", status=TicketStatus.OPEN, priority=TicketPriority.HIGH, assignee="user1", raw_data={}
+    )
+    mock_service = AsyncMock()
+    mock_service.get_ticket_version.return_value = (0xABC, 1_700_000_000.0)
+    mock_service.get_ticket_by_id.return_value = detail
+    app.dependency_overrides[get_service] = lambda: mock_service
+    try:
+        assert "etag" in client.get("/tickets/1").headers
+
+        detail._from_snapshot = True
+        fallback = client.get("/tickets/1")
+        assert fallback.status_code == 200
+        assert "etag" not in fallback.headers
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_detail_upstream_calls_are_capped_by_the_request_deadline(client):
+    timeouts = {}
+
+    def upstream(request):
+        timeouts.setdefault(request.url.path, []).append(request.extensions["timeout"]["read"])
+        if request.url.path == "/todos/5":
+            return httpx.Response(200, json={"id": 5, "todo": "Fix login", "completed": False, "userId": 7})
+        if request.url.path == "/users":
+            return httpx.Response(200, json={"users": [{"id": 7, "username": "alice"}], "total": 1})
+        return httpx.Response(200, json={"todos": [], "total": 0})
+
+    service = DummyJSONService(transport=httpx.MockTransport(upstream))
+    app.dependency_overrides[get_service] = lambda: service
+    try:
+        response = client.get("/tickets/5", headers={"X-Request-Timeout": "1"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["assignee"] == "alice"
+    assert 0 < timeouts["/todos/5"][0] <= 1.0
+    assert all(0 < read <= 1.0 for reads in timeouts.values() for read in reads)
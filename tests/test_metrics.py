@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+
+from src.tickethub.main import app
+from src.tickethub.metrics import (
+    CallbackGauge,
+    Counter,
+    Histogram,
+    LoopLagMonitor,
+    Registry,
+    endpoint_label,
+    event_loop_lag_histogram,
+    register_stats,
+)
+from src.tickethub.singleflight import SingleFlight, request_key
+from src.tickethub.upstream import UpstreamClient
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)))
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.labels("/x").observe(value)
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP latency_seconds Latency.", "# TYPE latency_seconds histogram"]
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/x",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{route="/x"} 3.65' in lines
+    assert 'latency_seconds_count{route="/x"} 4' in lines
+
+
+def test_counters_and_callback_gauges():
+    registry = Registry()
+    counter = registry.register(Counter("events_total", "Events.", ("kind",)))
+    plain = registry.register(Counter("plain_total", "Plain."))
+    registry.register(CallbackGauge("ratio", "Ratio.", lambda: [({"cache": 'a"b'}, 0.5)]))
+
+    counter.labels("x").inc()
+    counter.labels("x").inc(2)
+
+    text = registry.render()
+    assert 'events_total{kind="x"} 3' in text
+    assert "plain_total 0" in text
+    assert 'ratio{cache="a\\"b"} 0.5' in text
+    with pytest.raises(ValueError):
+        counter.labels()
+    assert plain.labels() is plain.labels()
+
+
+def test_endpoint_label_collapses_ids():
+    assert endpoint_label("/todos/17") == "/todos/{id}"
+    assert endpoint_label("/todos") == "/todos"
+    assert endpoint_label("/users/3/todos") == "/users/{id}/todos"
+
+
+def test_metrics_endpoint_reports_route_templates():
+    client = TestClient(app)
+    client.get("/health")
+    client.get("/tickets/not-a-number")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'tickethub_http_request_duration_seconds_count{route="/health",method="GET",status="200"}' in text
+    assert 'route="/tickets/{ticket_id}",method="GET",status="422"' in text
+    assert "tickethub_tickets_transformed_total" in text
+    assert 'tickethub_cache_hit_ratio{cache="response"}' in text
+
+
+def test_metrics_endpoint_reports_component_stats():
+    upstream = UpstreamClient()
+    upstream.retried = 2
+    register_stats("upstream", "http://upstream.test", lambda: upstream.stats)
+    register_stats("user_directory", "test", lambda: {"entries": 3, "unknown": 1, "reloads": 1, "batches": 4})
+
+    text = TestClient(app).get("/metrics").text
+
+    assert 'tickethub_upstream_circuit_state{upstream="http://upstream.test",state="closed"} 1' in text
+    assert 'tickethub_upstream_circuit_state{upstream="http://upstream.test",state="open"} 0' in text
+    assert 'tickethub_upstream_retries_total{upstream="http://upstream.test"} 2' in text
+    assert 'tickethub_user_directory_entries{user_directory="test"} 3' in text
+    assert 'tickethub_user_directory_batches_total{user_directory="test"} 4' in text
+    assert "tickethub_change_feed_published_total" in text
+
+
+def test_metrics_endpoint_reports_coalesced_calls():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def burst():
+        key = request_key("http://upstream.test/todos/17")
+        return await asyncio.gather(*(flight.do(key, fetch) for _ in range(3)))
+
+    client = TestClient(app)
+    before = client.get("/metrics").text
+    assert asyncio.run(burst()) == ["value"] * 3
+    after = client.get("/metrics").text
+
+    def count(text, name):
+        line = next((line for line in text.splitlines() if line.startswith(f'{name}{{key_kind="/todos/{{id}}"}}')), None)
+        return float(line.split()[-1]) if line else 0.0
+
+    calls, coalesced = "tickethub_singleflight_calls_total", "tickethub_singleflight_coalesced_total"
+    assert count(after, calls) - count(before, calls) == 1
+    assert count(after, coalesced) - count(before, coalesced) == 2
+    assert "# TYPE tickethub_singleflight_abandoned_total counter" in after
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_observes_probes():
+    before = event_loop_lag_histogram.labels().counts[:]
+    monitor = LoopLagMonitor(interval=0.01)
+
+    monitor.start()
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    assert sum(event_loop_lag_histogram.labels().counts) > sum(before)
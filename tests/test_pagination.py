@@ -0,0 +1,16 @@
+import pytest
+
+from src.tickethub.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(12345)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == 12345
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "e30", "WzFd", "eyJhZnRlciI6ICJ4In0", "eyJhZnRlciI6dHJ1ZX0"])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
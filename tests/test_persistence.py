@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+import pytest
+
+from src.tickethub.columnar import TicketColumns
+from src.tickethub.models import Ticket, TicketStatus, TicketPriority
+from src.tickethub.persistence import SnapshotFile, SnapshotPersister
+from src.tickethub.store import TicketStore
+
+
+def make_columns(count: int, prefix: str = "Task") -> TicketColumns:
+    return TicketColumns.from_tickets([
+        Ticket(
+            id=i,
+            title=f"{prefix} {i}",
+            status=TicketStatus.OPEN if i % 2 else TicketStatus.CLOSED,
+            priority=TicketPriority.HIGH,
+            assignee=f"user{i % 3}",
+        )
+        for i in range(1, count + 1)
+    ])
+
+
+class Loader:
+    def __init__(self, columns: TicketColumns, delay: float = 0.0):
+        self.columns = columns
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.columns, {1: "user1"}
+
+
+async def loaded_store(columns: TicketColumns) -> TicketStore:
+    store = TicketStore(Loader(columns))
+    await store.refresh()
+    return store
+
+
+@pytest.mark.asyncio
+async def test_snapshot_file_round_trip(tmp_path):
+    store = await loaded_store(make_columns(50))
+    path = tmp_path / "snapshot.bin"
+
+    SnapshotFile(str(path)).write(store.snapshot)
+    restored = SnapshotFile(str(path)).read()
+
+    assert list(restored.columns.ids) == list(store.snapshot.columns.ids)
+    assert restored.columns.title(10) == store.snapshot.columns.title(10)
+    assert restored.users == {1: "user1"}
+    assert restored.stats == store.snapshot.stats
+    assert restored.fingerprint == store.snapshot.fingerprint
+    assert restored.modified_at == store.snapshot.modified_at
+    assert restored.version == 0
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_snapshot_file_rejects_corrupt_stale_and_missing_files(tmp_path):
+    store = await loaded_store(make_columns(5))
+    path = tmp_path / "snapshot.bin"
+    snapshot_file = SnapshotFile(str(path))
+
+    assert snapshot_file.read() is None
+    snapshot_file.write(store.snapshot)
+    assert snapshot_file.read(max_age=60) is not None
+    assert snapshot_file.read(max_age=-1) is None
+
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    assert snapshot_file.read() is None
+
+
+@pytest.mark.asyncio
+async def test_restored_snapshot_is_served_while_revalidating(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    SnapshotFile(path).write((await loaded_store(make_columns(20, "Old"))).snapshot)
+
+    loader = Loader(make_columns(20, "New"), delay=0.05)
+    store = TicketStore(loader, refresh_interval=60, max_staleness=300)
+    store.restore(SnapshotFile(path).read())
+    await store.start()
+
+    snapshot = await store.get()
+    assert snapshot.columns.title(0) == "Old 1"
+    assert snapshot.stats.total_tickets == 20
+    await store.search_ready()
+    assert sorted(store.search_index.search("old 1")) == [1] + list(range(10, 20))
+
+    refreshed = await store.refresh()
+    assert loader.calls == 1
+    assert refreshed.columns.title(0) == "New 1"
+    assert store.search_index.search("old") == []
+    assert len(store.search_index.search("new")) == 20
+    await store.stop()
+
+
+@pytest.mark.asyncio
+async def test_persister_saves_changed_snapshots_only(tmp_path):
+    store = await loaded_store(make_columns(10))
+    persister = SnapshotPersister(store, str(tmp_path / "snapshot.bin"), interval=3600)
+
+    assert await persister.save()
+    assert not await persister.save()
+    await persister.stop()  # final save is a no-op as well
+
+    fresh = TicketStore(Loader(make_columns(1)))
+    restored = SnapshotPersister(fresh, persister.file.path)
+    started = time.perf_counter()
+    assert restored.restore()
+    assert time.perf_counter() - started < 1
+    assert len(fresh.snapshot.columns) == 10
+    assert not await restored.save()
+    await fresh.stop()
@@ -0,0 +1,52 @@
+import json
+
+from src.tickethub.conditional import Validators
+from src.tickethub.models import TicketStats
+from src.tickethub.response_cache import ResponseCache
+
+
+def make_stats(total: int) -> TicketStats:
+    return TicketStats(
+        total_tickets=total,
+        open_tickets=total,
+        closed_tickets=0,
+        priority_counts={"low": total, "medium": 0, "high": 0},
+        assignee_counts={"user1": total}
+    )
+
+
+def test_render_then_hit():
+    cache = ResponseCache(max_entries=10)
+    validators = Validators(etag='"v1"', last_modified=1_700_000_000)
+
+    assert cache.get(validators) is None
+    rendered = cache.render(make_stats(3), validators)
+    hit = cache.get(validators)
+
+    assert hit is not None
+    assert hit.body == rendered.body
+    assert json.loads(hit.body)["total_tickets"] == 3
+    assert hit.headers["etag"] == '"v1"'
+    assert hit.media_type == "application/json"
+    assert cache.stats["hits"] == 1
+
+
+def test_render_without_validators_is_not_cached():
+    cache = ResponseCache(max_entries=10)
+
+    response = cache.render(make_stats(1), None)
+
+    assert json.loads(response.body)["total_tickets"] == 1
+    assert "etag" not in response.headers
+    assert cache.stats["entries"] == 0
+
+
+def test_bounded_by_bytes():
+    cache = ResponseCache(max_entries=100, max_bytes=300)
+
+    for version in range(5):
+        cache.render(make_stats(version), Validators(etag=f'"v{version}"', last_modified=0))
+
+    assert cache.stats["bytes"] <= 300
+    assert cache.stats["evictions"] > 0
+    assert cache.get(Validators(etag='"v4"', last_modified=0)) is not None
@@ -0,0 +1,66 @@
+import random
+import pytest
+
+from src.tickethub.models import Ticket, TicketStatus, TicketPriority
+from src.tickethub.columnar import TicketColumns
+from src.tickethub.search_index import FrozenTrigramIndex, TrigramIndex
+from src.tickethub.snapshot import diff_columns
+
+WORDS = ["Fix", "login", "Bug", "update", "README", "deploy", "Café", "cache", "ÜBER", "timeout"]
+
+
+def make_ticket(ticket_id: int, title: str) -> Ticket:
+    return Ticket(id=ticket_id, title=title, status=TicketStatus.OPEN, priority=TicketPriority.LOW, assignee="u")
+
+
+def indexed(tickets) -> TrigramIndex:
+    index = TrigramIndex()
+    index.apply(diff_columns(TicketColumns.from_tickets([]), TicketColumns.from_tickets(tickets)))
+    return index
+
+
+def scan(tickets, query):
+    return sorted(t.id for t in tickets if query.lower() in t.title.lower())
+
+
+@pytest.fixture
+def tickets():
+    rng = random.Random(42)
+    return [make_ticket(i, " ".join(rng.choice(WORDS) for _ in range(4))) for i in range(1, 301)]
+
+
+@pytest.mark.parametrize("query", ["a", "fi", "fix", "FIX LOG", "café", "über", "ache t", "x login", "zzz", "deploy README"])
+def test_search_matches_linear_scan(tickets, query):
+    index = indexed(tickets)
+
+    assert sorted(index.search(query)) == scan(tickets, query)
+
+
+@pytest.mark.parametrize("query", ["a", "fix", "FIX LOG", "café", "über", "ache t", "zzz"])
+def test_frozen_index_matches_linear_scan(tickets, query):
+    index = FrozenTrigramIndex.build(TicketColumns.from_tickets(tickets))
+
+    assert sorted(index.search(query)) == scan(tickets, query)
+
+
+def test_apply_indexes_title_changes_and_removals(tickets):
+    index = indexed(tickets)
+
+    changed = [make_ticket(1, "Brand new wording")] + tickets[2:]
+    index.apply(diff_columns(TicketColumns.from_tickets(tickets), TicketColumns.from_tickets(changed)))
+
+    assert len(index) == len(tickets) - 1
+    assert index.search("brand new") == [1]
+    assert 2 not in index.search(tickets[1].title)
+    for query in ["fix", "login bug", "o"]:
+        assert sorted(index.search(query)) == scan(changed, query)
+
+
+def test_remove_drops_empty_postings():
+    index = TrigramIndex()
+    index.add(1, "unique words")
+
+    index.remove(1)
+
+    assert index.search("unique") == []
+    assert index._postings == {}
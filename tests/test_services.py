@@ -1,7 +1,10 @@
+import asyncio
 import pytest
 import httpx
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.tickethub.columnar import TicketColumns
 from src.tickethub.services import DummyJSONService
+from src.tickethub.upstream import CircuitOpenError
 from src.tickethub.models import TicketStatus, TicketPriority
 
 
@@ -32,7 +35,7 @@ async def test_get_users_caching(service):
     }
     mock_response.raise_for_status = AsyncMock()
     
-    with patch.object(service.client, 'get', return_value=mock_response):
+    with patch.object(service.source.client, 'get', return_value=mock_response):
         # First call should make HTTP request
         users = await service._get_users()
         assert users[1] == "atuny0"
@@ -43,7 +46,7 @@ async def test_get_users_caching(service):
         assert users2 == users
         
         # Should only have made one HTTP call
-        service.client.get.assert_called_once()
+        service.source.client.get.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -94,7 +97,7 @@ async def test_get_ticket_by_id_not_found(service):
         response=httpx.Response(404)
     )
     
-    with patch.object(service.client, 'get', return_value=mock_response):
+    with patch.object(service.source.client, 'get', return_value=mock_response):
         ticket = await service.get_ticket_by_id(999)
         assert ticket is None
 
@@ -117,18 +120,294 @@ async def test_get_tickets_filtering(service):
     }
     mock_users_response.raise_for_status = AsyncMock()
     
-    with patch.object(service.client, 'get') as mock_get:
-        mock_get.side_effect = [mock_todos_response, mock_users_response]
+    with patch.object(service.source.client, 'get') as mock_get:
+        mock_get.side_effect = [mock_users_response, mock_todos_response]
         
         # Test status filtering
-        tickets, total = await service.get_tickets(status=TicketStatus.OPEN)
+        tickets, total, _, _ = await service.get_tickets(status=TicketStatus.OPEN)
         assert len(tickets) == 2
         assert all(t.status == TicketStatus.OPEN for t in tickets)
         
-        # Reset mock
-        mock_get.side_effect = [mock_todos_response, mock_users_response]
-        
-        # Test search filtering
-        tickets, total = await service.get_tickets(search="Open")
+        # Test search filtering (served from the snapshot, no new upstream calls)
+        tickets, total, _, _ = await service.get_tickets(search="Open")
         assert len(tickets) == 2
         assert all("open" in t.title.lower() for t in tickets)
+
+
+@pytest.mark.asyncio
+async def test_get_tickets_uses_snapshot_indexes():
+    service = DummyJSONService()
+
+    async def loader():
+        users = {1: "alice", 2: "bob"}
+        todos = [
+            {"id": i, "todo": f"Task {i}", "completed": i % 2 == 0, "userId": 1 + i % 2}
+            for i in range(1, 13)
+        ]
+        return TicketColumns.from_tickets([await service._transform_ticket(todo, users) for todo in todos]), users
+
+    service.store._loader = loader
+
+    tickets, total, _, _ = await service.get_tickets(
+        skip=1, limit=2, status=TicketStatus.OPEN, priority=TicketPriority.HIGH, assignee="bob"
+    )
+
+    # open = odd ids, high = id % 3 == 2, bob = odd ids -> 5, 11
+    assert total == 2
+    assert [t.id for t in tickets] == [11]
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cold_detail_requests_are_coalesced():
+    service = DummyJSONService()
+    calls = []
+
+    async def fake_get(url, params=None, timeout=None):
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        response = MagicMock()
+        if url.endswith("/users"):
+            response.json.return_value = {"users": [{"id": 1, "username": "testuser"}], "total": 1}
+        else:
+            response.json.return_value = {"id": 1, "todo": "Task", "completed": False, "userId": 1}
+        return response
+
+    with patch.object(service.source.client, 'get', side_effect=fake_get):
+        details = await asyncio.gather(*(service.get_ticket_by_id(1) for _ in range(10)))
+
+    assert all(d.assignee == "testuser" for d in details)
+    assert calls.count(f"{service.source.base_url}/todos/1") == 1
+    assert calls.count(f"{service.source.base_url}/users") == 1
+    assert service.flight.coalesced >= 9
+    # The assignee misses of all ten requests share one batched lookup.
+    assert service.users.stats["batches"] == 1
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_get_tickets_by_ids_reports_missing_items():
+    service = DummyJSONService()
+    service.users.seed({1: "testuser"})
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_get(url, params=None, timeout=None):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        ticket_id = int(url.rsplit("/", 1)[1])
+        request = httpx.Request("GET", url)
+        if ticket_id == 404:
+            return httpx.Response(404, request=request)
+        if ticket_id == 500:
+            return httpx.Response(500, request=request)
+        return httpx.Response(
+            200, request=request, json={"id": ticket_id, "todo": "Task", "completed": False, "userId": 1}
+        )
+
+    with patch.object(service.source.client, 'get', side_effect=fake_get):
+        batch = await service.get_tickets_by_ids(list(range(1, 31)) + [404, 500, 3])
+
+    assert [item.id for item in batch.items] == list(range(1, 31)) + [404, 500]
+    assert batch.found == 30
+    assert batch.missing == 2
+    assert batch.items[-2].error == "not_found"
+    assert batch.items[-1].error == "upstream_error"
+    assert max_in_flight <= 10
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_get_ticket_by_id_caches_details_and_not_found():
+    service = DummyJSONService()
+    service.users.seed({1: "testuser"})
+    calls = []
+
+    async def fake_get(url, params=None, timeout=None):
+        calls.append(url)
+        request = httpx.Request("GET", url)
+        if url.endswith("/999"):
+            return httpx.Response(404, request=request)
+        return httpx.Response(200, request=request, json={"id": 1, "todo": "Task", "completed": False, "userId": 1})
+
+    with patch.object(service.source.client, 'get', side_effect=fake_get):
+        first = await service.get_ticket_by_id(1)
+        second = await service.get_ticket_by_id(1)
+        assert await service.get_ticket_by_id(999) is None
+        assert await service.get_ticket_by_id(999) is None
+
+    assert first is second
+    assert len(calls) == 2
+    assert service.detail_cache.hits == 1
+    assert service.not_found_cache.hits == 1
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_changes_invalidate_detail_cache():
+    service = DummyJSONService()
+    titles = {1: "Old title"}
+
+    async def loader():
+        users = {1: "testuser"}
+        todos = [{"id": i, "todo": title, "completed": False, "userId": 1} for i, title in titles.items()]
+        return TicketColumns.from_tickets([await service._transform_ticket(todo, users) for todo in todos]), users
+
+    service.store._loader = loader
+    await service.store.refresh()
+    service.detail_cache.set(1, MagicMock())
+    service.not_found_cache.set(2, True)
+
+    titles[1] = "New title"
+    titles[2] = "Just created"
+    await service.store.refresh()
+
+    assert 1 not in service.detail_cache._entries
+    assert service.not_found_cache.get(2) is None
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_get_tickets_after_walks_keyset_pages():
+    service = DummyJSONService()
+
+    async def loader():
+        users = {1: "alice"}
+        todos = [{"id": i, "todo": f"Task {i}", "completed": i % 2 == 0, "userId": 1} for i in range(25, 0, -1)]
+        return TicketColumns.from_tickets([await service._transform_ticket(todo, users) for todo in todos]), users
+
+    service.store._loader = loader
+
+    seen, after = [], None
+    while True:
+        tickets, total, has_next, _ = await service.get_tickets_after(after=after, limit=4, status=TicketStatus.OPEN)
+        seen.extend(t.id for t in tickets)
+        assert total is None
+        if not has_next:
+            break
+        after = tickets[-1].id
+
+    assert seen == list(range(1, 26, 2))
+
+    tickets, total, has_next, _ = await service.get_tickets_after(after=20, limit=10, search="task 2", include_total=True)
+    assert [t.id for t in tickets] == [21, 22, 23, 24, 25]
+    assert total == 7
+    assert has_next is False
+
+    tickets, total, has_next, _ = await service.get_tickets(skip=4, limit=3, status=TicketStatus.OPEN, include_total=False)
+    assert [t.id for t in tickets] == [9, 11, 13]
+    assert total is None
+    assert has_next is True
+    tickets, total, has_next, _ = await service.get_tickets(skip=12, limit=3, status=TicketStatus.OPEN, include_total=False)
+    assert [t.id for t in tickets] == [25]
+    assert has_next is False
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_serves_details_from_snapshot():
+    service = DummyJSONService()
+
+    async def loader():
+        users = {7: "alice"}
+        todo = {"id": 1, "todo": "Task", "completed": True, "userId": 7}
+        return TicketColumns.from_tickets([await service._transform_ticket(todo, users)]), users
+
+    service.store._loader = loader
+    await service.store.refresh()
+
+    with patch.object(service.source.client, 'get', side_effect=CircuitOpenError(30)):
+        detail = await service.get_ticket_by_id(1)
+        with pytest.raises(CircuitOpenError):
+            await service.get_ticket_by_id(2)
+
+    assert detail.assignee == "alice"
+    assert detail.raw_data == {"id": 1, "todo": "Task", "completed": True, "userId": 7}
+    assert detail.from_snapshot
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_tickets_version_covers_only_requested_rows():
+    service = DummyJSONService()
+    titles = {1: "One", 2: "Two", 3: "Three"}
+
+    async def loader():
+        users = {1: "alice"}
+        todos = [{"id": i, "todo": title, "completed": False, "userId": 1} for i, title in titles.items()]
+        return TicketColumns.from_tickets([await service._transform_ticket(todo, users) for todo in todos]), users
+
+    service.store._loader = loader
+    await service.store.refresh()
+    before = (await service.get_tickets_version([1, 2, 2]))[0]
+
+    titles[3] = "Three, renamed"
+    await service.store.refresh()
+    assert (await service.get_tickets_version([2, 1]))[0] == before
+
+    titles[2] = "Two, renamed"
+    await service.store.refresh()
+    assert (await service.get_tickets_version([1, 2]))[0] != before
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_export_tickets_pins_snapshot_and_filters():
+    service = DummyJSONService()
+
+    async def loader():
+        users = {1: "alice"}
+        todos = [{"id": i, "todo": f"Task {i}", "completed": i % 2 == 0, "userId": 1} for i in range(1, 26)]
+        return TicketColumns.from_tickets([await service._transform_ticket(todo, users) for todo in todos]), users
+
+    service.store._loader = loader
+
+    columns, positions = await service.export_tickets(status=TicketStatus.OPEN, search="task 2")
+
+    assert [columns.ids[p] for p in positions] == [21, 23, 25]
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_search_on_a_pinned_snapshot_ignores_newer_titles():
+    service = DummyJSONService()
+    titles = {1: "Fix login", 2: "Update docs"}
+
+    async def loader():
+        users = {1: "alice"}
+        todos = [{"id": i, "todo": title, "completed": False, "userId": 1} for i, title in titles.items()]
+        return TicketColumns.from_tickets([await service._transform_ticket(todo, users) for todo in todos]), users
+
+    service.store._loader = loader
+    pinned = await service.store.refresh()
+    titles[2] = "Fix docs"
+    await service.store.refresh()
+
+    # The store's index now matches ticket 2, whose pinned title does not.
+    assert sorted(service.store.search_index.search("fix")) == [1, 2]
+    assert [pinned.columns.ids[p] for p in await service._search_positions(pinned, "fix")] == [1]
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_loads_through_injected_transport():
+    def handler(request: httpx.Request) -> httpx.Response:
+        skip = int(request.url.params.get("skip", 0))
+        if request.url.path == "/users":
+            return httpx.Response(200, json={"users": [{"id": 1, "username": "alice"}], "total": 1})
+        todos = [
+            {"id": i, "todo": f"Task {i}", "completed": False, "userId": 1}
+            for i in range(skip + 1, min(skip + 100, 150) + 1)
+        ]
+        return httpx.Response(200, json={"todos": todos, "total": 150})
+
+    service = DummyJSONService(transport=httpx.MockTransport(handler))
+
+    snapshot = await service.store.refresh()
+
+    assert len(snapshot.columns) == 150
+    assert snapshot.columns.assignee(0) == "alice"
+    await service.close()
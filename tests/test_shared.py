@@ -0,0 +1,117 @@
+import asyncio
+import os
+
+import pytest
+
+from src.tickethub.columnar import TicketColumns
+from src.tickethub.models import Ticket, TicketStatus, TicketPriority
+from src.tickethub.shared import SharedSnapshotCache
+from src.tickethub.store import TicketStore
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        tickets = [
+            Ticket(
+                id=i,
+                title=f"Gen {self.calls} task {i}",
+                status=TicketStatus.OPEN if i % 2 else TicketStatus.CLOSED,
+                priority=TicketPriority.MEDIUM,
+                assignee=f"user{i % 2}",
+            )
+            for i in range(1, 11)
+        ]
+        return TicketColumns.from_tickets(tickets), {1: "user1"}
+
+
+def generations(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith("gen-"))
+
+
+@pytest.mark.asyncio
+async def test_only_the_leader_loads_and_followers_attach(tmp_path):
+    leader_loader, follower_loader = Loader(), Loader()
+    leader = SharedSnapshotCache(str(tmp_path))
+    follower = SharedSnapshotCache(str(tmp_path))
+
+    published = await leader.get_or_load(leader_loader, max_age=60)
+    attached = await follower.get_or_load(follower_loader, max_age=60)
+
+    assert leader.is_leader and not follower.is_leader
+    assert leader_loader.calls == 1 and follower_loader.calls == 0
+    assert attached.version == published.version == 1
+    assert isinstance(attached.columns.ids, memoryview)
+    assert attached.columns.tickets(range(10)) == published.columns.tickets(range(10))
+    assert attached.users == {1: "user1"}
+    assert list(attached.index.select(status=TicketStatus.CLOSED)) == [1, 3, 5, 7, 9]
+    assert sorted(attached.search_index.search("task 1")) == [1, 10]
+    await leader.close()
+    await follower.close()
+
+
+@pytest.mark.asyncio
+async def test_followers_swap_to_new_generations(tmp_path):
+    loader = Loader()
+    leader = SharedSnapshotCache(str(tmp_path))
+    follower = SharedSnapshotCache(str(tmp_path))
+    await leader.get_or_load(loader, max_age=60)
+    first = follower.current()
+
+    for _ in range(3):
+        await leader.get_or_load(loader, max_age=0)
+    latest = await follower.get_or_load(Loader(), max_age=60)
+
+    assert latest.version == 4
+    assert latest.columns.title(0) == "Gen 4 task 1"
+    # The superseded mapping stays readable for requests still holding it.
+    assert first.columns.title(0) == "Gen 1 task 1"
+    assert generations(tmp_path) == ["gen-3.bin", "gen-4.bin"]
+    await leader.close()
+
+
+@pytest.mark.asyncio
+async def test_next_worker_takes_over_when_the_leader_goes_away(tmp_path):
+    leader = SharedSnapshotCache(str(tmp_path))
+    follower = SharedSnapshotCache(str(tmp_path))
+    await leader.get_or_load(Loader(), max_age=60)
+    await leader.close()
+
+    loader = Loader()
+    snapshot = await follower.get_or_load(loader, max_age=0)
+
+    assert follower.is_leader
+    assert loader.calls == 1 and snapshot.version == 2
+    await follower.close()
+
+
+@pytest.mark.asyncio
+async def test_follower_waits_for_the_first_generation(tmp_path):
+    leader = SharedSnapshotCache(str(tmp_path))
+    assert leader._lead()
+    follower = SharedSnapshotCache(str(tmp_path), wait_timeout=5, poll_interval=0.01)
+
+    waiting = asyncio.create_task(follower.get_or_load(Loader(), max_age=60))
+    await asyncio.sleep(0.05)
+    await leader.get_or_load(Loader(), max_age=60)
+
+    assert (await waiting).version == 1
+    await leader.close()
+
+
+@pytest.mark.asyncio
+async def test_store_searches_the_shared_index(tmp_path):
+    leader = TicketStore(Loader(), cache=SharedSnapshotCache(str(tmp_path)))
+    follower = TicketStore(Loader(), cache=SharedSnapshotCache(str(tmp_path)))
+
+    await leader.refresh()
+    snapshot = await follower.refresh()
+
+    assert snapshot.stats.total_tickets == 10
+    assert len(follower.search_index) == 0  # nothing indexed per worker
+    assert sorted(snapshot.search_index.search("gen 1 task 2")) == [2]
+    await leader.stop()
+    await follower.stop()
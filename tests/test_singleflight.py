@@ -0,0 +1,136 @@
+import asyncio
+import pytest
+
+from src.tickethub.deadline import Deadline, DeadlineExceeded, remaining, within
+from src.tickethub.singleflight import SingleFlight, request_key
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = 0
+
+    async def fetch():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.01)
+        return {"id": 1}
+
+    results = await asyncio.gather(*(flight.do("todo:1", fetch) for _ in range(20)))
+
+    assert executions == 1
+    assert all(r is results[0] for r in results)
+    assert flight.stats == {"calls": 1, "coalesced": 19, "abandoned": 0, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def fetch(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    results = await asyncio.gather(flight.do("a", lambda: fetch("a")), flight.do("b", lambda: fetch("b")))
+
+    assert results == ["a", "b"]
+    assert flight.coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter_and_next_call_retries():
+    flight = SingleFlight()
+    attempts = 0
+
+    async def fetch():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.01)
+        if attempts == 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert await flight.do("k", fetch) == "ok"
+    assert attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.create_task(flight.do("k", fetch))
+    second = asyncio.create_task(flight.do("k", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+def test_request_key_ignores_param_order():
+    assert request_key("/todos", {"skip": 0, "limit": 10}) == request_key("/todos", {"limit": 10, "skip": 0})
+    assert request_key("/todos/1") != request_key("/todos/2")
+
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_once_every_caller_gave_up():
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def fetch():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    callers = [asyncio.create_task(flight.do("k", fetch)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert cancelled.is_set()
+    assert flight.stats["abandoned"] == 1 and "k" not in flight
+
+
+@pytest.mark.asyncio
+async def test_shared_call_runs_under_the_latest_waiters_deadline():
+    flight = SingleFlight()
+    seen = []
+
+    async def fetch():
+        seen.append(remaining())
+        await asyncio.sleep(0.1)
+        seen.append(remaining())
+        return "value"
+
+    async def call(seconds):
+        async with within(Deadline.after(seconds)):
+            return await flight.do("key", fetch)
+
+    leader = asyncio.create_task(call(0.02))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(call(5.0))
+
+    with pytest.raises(DeadlineExceeded):
+        await leader
+    assert await follower == "value"
+    assert seen[0] <= 0.02
+    assert 4.0 < seen[1] <= 5.0
+
+    # A caller without a deadline lifts it altogether.
+    seen.clear()
+    leader = asyncio.create_task(call(5.0))
+    await asyncio.sleep(0)
+    assert await asyncio.gather(leader, flight.do("key", fetch)) == ["value", "value"]
+    assert seen[0] <= 5.0 and seen[1] is None
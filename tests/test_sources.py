@@ -0,0 +1,244 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.tickethub.config import Settings
+from src.tickethub.services import DummyJSONService
+from src.tickethub.singleflight import SingleFlight
+from src.tickethub.sources import DummyJSONSource, FileSource, MultiSource, NamespacedSource, create_source
+
+
+def todo(i, user_id=1):
+    return {"id": i, "todo": f"Task {i}", "completed": i % 2 == 0, "userId": user_id}
+
+
+async def collect(pages):
+    return [record async for page in pages for record in page]
+
+
+@pytest.fixture
+def ndjson_files(tmp_path):
+    todos = tmp_path / "todos.ndjson"
+    # Out of order, with a blank line and no trailing newline.
+    todos.write_text("\n".join(json.dumps(todo(i)) for i in (3, 1, 2)) + "\n\n" + json.dumps(todo(4)))
+    users = tmp_path / "users.jsonl"
+    users.write_text(json.dumps({"id": 1, "username": "alice"}) + "\n")
+    return str(todos), str(users)
+
+
+@pytest.mark.asyncio
+async def test_file_source_pages_ndjson(ndjson_files):
+    source = FileSource(*ndjson_files, page_size=2)
+
+    pages = [page async for page in source.todos()]
+
+    assert [[t["id"] for t in page] for page in pages] == [[3, 1], [2, 4]]
+    assert await collect(source.users()) == [{"id": 1, "username": "alice"}]
+
+
+@pytest.mark.asyncio
+async def test_file_source_looks_up_ndjson_records_by_offset(ndjson_files):
+    source = FileSource(*ndjson_files)
+
+    # Lookups work before and after a full pass.
+    assert await source.todo(2) == todo(2)
+    await collect(source.todos())
+    assert await source.todo(4) == todo(4)
+    assert await source.todo(3) == todo(3)
+    assert await source.todo(99) is None
+
+
+@pytest.mark.asyncio
+async def test_file_source_reads_dummyjson_documents(tmp_path):
+    todos = tmp_path / "todos.json"
+    todos.write_text(json.dumps({"todos": [todo(1), todo(2)], "total": 2}))
+    users = tmp_path / "users.json"
+    users.write_text(json.dumps([{"id": 1, "username": "alice"}]))
+    source = FileSource(str(todos), str(users))
+
+    assert [t["id"] for t in await collect(source.todos())] == [1, 2]
+    assert await collect(source.users()) == [{"id": 1, "username": "alice"}]
+    assert await source.todo(2) == todo(2)
+    assert await source.todo(3) is None
+
+
+@pytest.mark.asyncio
+async def test_service_serves_from_file_source(ndjson_files):
+    service = DummyJSONService(source=FileSource(*ndjson_files))
+
+    snapshot = await service.store.refresh()
+    detail = await service.get_ticket_by_id(3)
+
+    assert sorted(snapshot.columns.ids) == [1, 2, 3, 4]
+    assert snapshot.users == {1: "alice"}
+    assert detail.assignee == "alice" and detail.raw_data == todo(3)
+    assert await service.get_ticket_by_id(42) is None
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_dummyjson_source_maps_404_to_none():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/todos/1":
+            return httpx.Response(200, json=todo(1))
+        return httpx.Response(404, json={})
+
+    source = DummyJSONSource(Settings(upstream_retries=0), base_url="http://upstream/", transport=httpx.MockTransport(handler))
+
+    assert await source.todo(1) == todo(1)
+    assert await source.todo(2) is None
+    await source.close()
+
+
+@pytest.mark.asyncio
+async def test_dummyjson_source_looks_up_users_by_page_runs():
+    users = [{"id": i, "username": f"user{i}"} for i in range(1, 301)]
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        skip, limit = int(request.url.params["skip"]), int(request.url.params["limit"])
+        requests.append((skip, limit))
+        return httpx.Response(200, json={"users": users[skip:skip + limit], "total": len(users)})
+
+    source = DummyJSONSource(Settings(upstream_retries=0), base_url="http://upstream/", transport=httpx.MockTransport(handler))
+
+    found = await source.lookup_users([5, 3, 250, 999])
+
+    assert sorted(user["id"] for user in found) == [3, 5, 250]
+    assert sorted(requests) == [(2, 3), (249, 1), (998, 1)]
+    await source.close()
+
+
+def test_create_source_from_settings(tmp_path):
+    assert isinstance(create_source(Settings()), DummyJSONSource)
+    source = create_source(Settings(ticket_source="file", ticket_source_todos=str(tmp_path / "todos.ndjson")))
+    assert isinstance(source, FileSource)
+    with pytest.raises(ValueError):
+        create_source(Settings(ticket_source="file"))
+    with pytest.raises(ValueError):
+        create_source(Settings(ticket_source="ftp"))
+
+
+def test_create_multi_source_from_settings(tmp_path):
+    sources = json.dumps([
+        {"name": "eu", "kind": "file", "todos": str(tmp_path / "eu.ndjson")},
+        {"name": "us", "kind": "file", "todos": str(tmp_path / "us.ndjson"), "id_offset": 1000, "deadline": 2},
+    ])
+    source = create_source(Settings(ticket_sources=sources))
+
+    assert isinstance(source, MultiSource)
+    assert [(s.name, s.id_offset, s.deadline) for s in source.sources] == [("eu", 0, None), ("us", 1000, 2)]
+    assert source.owner(999).name == "eu" and source.owner(1000).name == "us"
+    assert source.id_range(source.sources[0]) == (0, 1000)
+    with pytest.raises(ValueError):
+        create_source(Settings(ticket_sources=json.dumps([{"name": "a"}, {"name": "b"}])))
+
+    flight = SingleFlight()
+    upstream = create_source(Settings(ticket_sources=json.dumps([{"name": "a"}])), flight=flight)
+    assert upstream.sources[0].source.flight is flight
+
+
+class SlowSource(FileSource):
+    def __init__(self, *args, delay=0.0):
+        super().__init__(*args)
+        self.delay = delay
+
+    async def todos(self):
+        await asyncio.sleep(self.delay)
+        async for page in super().todos():
+            yield page
+
+
+@pytest.fixture
+def two_sources(tmp_path, ndjson_files):
+    other = tmp_path / "other.ndjson"
+    # Same ids as the first source, with the source's own field names.
+    other.write_text("\n".join(
+        json.dumps({"id": i, "summary": f"Other {i}", "done": False, "owner": 1}) for i in (1, 2)
+    ))
+    users = tmp_path / "other-users.ndjson"
+    users.write_text(json.dumps({"id": 1, "login": "bob"}))
+    first = NamespacedSource(FileSource(*ndjson_files), "first", deadline=1.0)
+    second = NamespacedSource(
+        SlowSource(str(other), str(users)), "second", id_offset=100, deadline=0.05,
+        fields={"todo": "summary", "completed": "done", "userId": "owner", "username": "login"},
+    )
+    return first, second
+
+
+@pytest.mark.asyncio
+async def test_namespaced_source_maps_fields_and_ids(two_sources):
+    _, second = two_sources
+
+    assert await collect(second.todos()) == [
+        {"id": 101, "summary": "Other 1", "done": False, "owner": 1, "todo": "Other 1", "completed": False, "userId": 101},
+        {"id": 102, "summary": "Other 2", "done": False, "owner": 1, "todo": "Other 2", "completed": False, "userId": 101},
+    ]
+    assert (await second.todo(102))["todo"] == "Other 2"
+    assert await second.todo(2) is None
+
+
+@pytest.mark.asyncio
+async def test_multi_source_load_tolerates_a_slow_source(two_sources):
+    first, second = two_sources
+    service = DummyJSONService(source=MultiSource([first, second]))
+
+    snapshot = await service.store.refresh()
+    assert sorted(snapshot.columns.ids) == [1, 2, 3, 4, 101, 102]
+    assert snapshot.users == {1: "alice", 101: "bob"}
+    assert snapshot.missing_sources == []
+    assert (await service.get_ticket_by_id(102)).assignee == "bob"
+
+    # The second source now misses its deadline: its last rows stay, flagged as missing.
+    second.source.delay = 1.0
+    version, _ = await service.get_data_version()
+    snapshot = await service.store.refresh()
+    assert sorted(snapshot.columns.ids) == [1, 2, 3, 4, 101, 102]
+    assert snapshot.missing_sources == ["second"]
+    assert (await service.get_ticket_stats()).missing_sources == ["second"]
+    assert (await service.get_tickets()).missing_sources == ["second"]
+    assert (await service.get_data_version())[0] != version
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_multi_source_rejects_colliding_id_ranges(two_sources):
+    first, second = two_sources
+    with pytest.raises(ValueError):
+        MultiSource([first, NamespacedSource(second.source, "third")])
+    with pytest.raises(ValueError):
+        MultiSource([second]).id_range(first)
+
+    # The first source's ids 3 and 4 run into the second source's range.
+    second.id_offset = 3
+    service = DummyJSONService(source=MultiSource([first, second]))
+    snapshot = await service.store.refresh()
+    assert sorted(snapshot.columns.ids) == [4, 5]
+    assert snapshot.missing_sources == ["first"]
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_multi_source_looks_up_users_on_their_owners(two_sources):
+    source = MultiSource(list(two_sources))
+
+    found = await source.lookup_users([1, 101, 150])
+
+    assert sorted((user["id"], user["username"]) for user in found) == [(1, "alice"), (101, "bob")]
+
+
+@pytest.mark.asyncio
+async def test_plain_source_gathers_as_its_only_source(ndjson_files):
+    source = FileSource(*ndjson_files)
+
+    async def fail(_):
+        raise RuntimeError("down")
+
+    assert source.sources == [source]
+    assert source.id_range(source) == (0, None)
+    loaded, errors = await source.gather(lambda s: collect(s.todos()))
+    assert [todo["id"] for todo in loaded["file"]] == [3, 1, 2, 4] and errors == {}
+    loaded, errors = await source.gather(fail)
+    assert loaded == {} and isinstance(errors["file"], RuntimeError)
@@ -0,0 +1,96 @@
+import random
+import pytest
+
+from src.tickethub.columnar import TicketColumns
+from src.tickethub.models import Ticket, TicketStatus, TicketPriority
+from src.tickethub.snapshot import build_stats, diff_columns
+from src.tickethub.stats import StatsAggregator
+
+
+def make_ticket(ticket_id: int, status=TicketStatus.OPEN, priority=TicketPriority.LOW, assignee="alice") -> Ticket:
+    return Ticket(id=ticket_id, title=f"Ticket {ticket_id}", status=status, priority=priority, assignee=assignee)
+
+
+def random_tickets(rng: random.Random, ids) -> list[Ticket]:
+    return [
+        make_ticket(
+            i,
+            status=rng.choice(list(TicketStatus)),
+            priority=rng.choice(list(TicketPriority)),
+            assignee=rng.choice(["alice", "bob", "carol", "dave"])
+        )
+        for i in ids
+    ]
+
+
+def test_diff_columns():
+    old = TicketColumns.from_tickets([make_ticket(1), make_ticket(2), make_ticket(3)])
+    new = TicketColumns.from_tickets([make_ticket(1), make_ticket(2, status=TicketStatus.CLOSED), make_ticket(4)])
+
+    changes = diff_columns(old, new)
+
+    assert [t.id for t in changes.added_tickets()] == [4]
+    assert [(a.id, b.status) for a, b in changes.updated_tickets()] == [(2, TicketStatus.CLOSED)]
+    assert [t.id for t in changes.removed_tickets()] == [3]
+    assert sorted(changes.changed_ids()) == [2, 3, 4]
+    assert not diff_columns(new, new)
+
+
+def test_apply_counts_added_updated_and_removed_rows():
+    aggregator = StatsAggregator()
+    first = make_ticket(1, priority=TicketPriority.HIGH, assignee="bob")
+    old = TicketColumns.from_tickets([first, make_ticket(2)])
+    aggregator.apply(diff_columns(TicketColumns.from_tickets([]), old))
+
+    new = TicketColumns.from_tickets([make_ticket(2, status=TicketStatus.CLOSED)])
+    aggregator.apply(diff_columns(old, new))
+
+    stats = aggregator.stats
+    assert stats.total_tickets == 1
+    assert stats.open_tickets == 0
+    assert stats.closed_tickets == 1
+    assert stats.priority_counts == {"low": 1, "medium": 0, "high": 0}
+    assert stats.assignee_counts == {"alice": 1}
+
+
+def test_stats_model_is_reused_until_counters_change():
+    aggregator = StatsAggregator()
+    old = TicketColumns.from_tickets([make_ticket(1)])
+    aggregator.reset(old)
+
+    first = aggregator.stats
+    assert aggregator.stats is first
+
+    aggregator.apply(diff_columns(old, TicketColumns.from_tickets([make_ticket(1), make_ticket(2)])))
+    assert aggregator.stats is not first
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_applied_deltas_match_full_recount(seed):
+    rng = random.Random(seed)
+    tickets = random_tickets(rng, range(1, 201))
+    aggregator = StatsAggregator()
+    aggregator.reset(TicketColumns.from_tickets(tickets))
+
+    for _ in range(10):
+        kept = [t for t in tickets if rng.random() > 0.1]
+        changed = random_tickets(rng, [t.id for t in kept if rng.random() < 0.2])
+        by_id = {t.id: t for t in kept}
+        by_id.update({t.id: t for t in changed})
+        next_id = max(by_id) + 1
+        by_id.update({t.id: t for t in random_tickets(rng, range(next_id, next_id + rng.randint(0, 20)))})
+        new_tickets = sorted(by_id.values(), key=lambda t: t.id)
+
+        columns = TicketColumns.from_tickets(new_tickets)
+        aggregator.apply(diff_columns(TicketColumns.from_tickets(tickets), columns))
+        tickets = new_tickets
+
+        assert aggregator.stats == build_stats(columns)
+        assert aggregator.verify(columns)
+
+
+def test_verify_detects_drift():
+    aggregator = StatsAggregator()
+    aggregator.reset(TicketColumns.from_tickets([make_ticket(1)]))
+
+    assert not aggregator.verify(TicketColumns.from_tickets([make_ticket(1), make_ticket(2)]))
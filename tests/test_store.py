@@ -0,0 +1,176 @@
+import asyncio
+import pytest
+
+from src.tickethub.columnar import TicketColumns
+from src.tickethub.models import Ticket, TicketStatus, TicketPriority
+from src.tickethub.store import TicketStore
+
+
+class CountingLoader:
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+        self.fail = False
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        ticket = Ticket(
+            id=self.calls,
+            title=f"Load {self.calls}",
+            status=TicketStatus.OPEN,
+            priority=TicketPriority.LOW,
+            assignee="user1"
+        )
+        return TicketColumns.from_tickets([ticket]), {1: "user1"}
+
+
+@pytest.mark.asyncio
+async def test_get_loads_on_first_read():
+    loader = CountingLoader()
+    store = TicketStore(loader, refresh_interval=60, max_staleness=300)
+
+    snapshot = await store.get()
+
+    assert loader.calls == 1
+    assert snapshot.version == -1
+    assert snapshot.columns.title(0) == "Load 1"
+
+
+@pytest.mark.asyncio
+async def test_fresh_snapshot_is_served_from_memory():
+    loader = CountingLoader()
+    store = TicketStore(loader, refresh_interval=60, max_staleness=300)
+
+    await store.get()
+    await store.get()
+
+    assert loader.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_served_while_refreshing():
+    loader = CountingLoader(delay=0.05)
+    store = TicketStore(loader, refresh_interval=60, max_staleness=300)
+    await store.get()
+    store.snapshot.fetched_at -= 120  # older than refresh_interval, within max_staleness
+
+    snapshot = await store.get()
+    assert snapshot.version == -1  # stale data returned immediately
+
+    await asyncio.sleep(0.1)
+    assert loader.calls == 2
+    assert store.snapshot.version == -2
+
+
+@pytest.mark.asyncio
+async def test_read_blocks_past_max_staleness():
+    loader = CountingLoader()
+    store = TicketStore(loader, refresh_interval=60, max_staleness=300)
+    await store.get()
+    store.snapshot.fetched_at -= 600
+
+    snapshot = await store.get()
+
+    assert snapshot.version == -2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_share_one_refresh():
+    loader = CountingLoader(delay=0.05)
+    store = TicketStore(loader, refresh_interval=60, max_staleness=300)
+
+    snapshots = await asyncio.gather(*(store.get() for _ in range(10)))
+
+    assert loader.calls == 1
+    assert all(s is snapshots[0] for s in snapshots)
+
+
+@pytest.mark.asyncio
+async def test_failed_background_refresh_keeps_old_snapshot():
+    loader = CountingLoader()
+    store = TicketStore(loader, refresh_interval=60, max_staleness=300)
+    await store.get()
+    store.snapshot.fetched_at -= 120
+    loader.fail = True
+
+    snapshot = await store.get()
+    await asyncio.sleep(0.01)
+
+    assert snapshot.version == -1
+    assert store.snapshot.version == -1
+
+
+@pytest.mark.asyncio
+async def test_start_tolerates_initial_failure_and_stop_cancels_loop():
+    loader = CountingLoader()
+    loader.fail = True
+    store = TicketStore(loader, refresh_interval=0.01, max_staleness=1)
+
+    await store.start()
+    assert store.snapshot is None
+
+    loader.fail = False
+    await asyncio.sleep(0.05)
+    assert store.snapshot is not None
+
+    await store.stop()
+    calls = loader.calls
+    await asyncio.sleep(0.05)
+    assert loader.calls == calls
+
+
+@pytest.mark.asyncio
+async def test_refresh_applies_stats_deltas():
+    loader = CountingLoader()
+    store = TicketStore(loader, refresh_interval=60, max_staleness=300)
+
+    first = await store.get()
+    second = await store.refresh()
+
+    # Each load replaces ticket N-1 with ticket N.
+    assert first.stats.total_tickets == 1
+    assert second.stats.total_tickets == 1
+    assert second.stats.assignee_counts == {"user1": 1}
+    assert store.search_index.search("load 2") == [2]
+    assert store.search_index.search("load 1") == []
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_only_changes_with_content():
+    tickets = [
+        Ticket(id=1, title="A", status=TicketStatus.OPEN, priority=TicketPriority.LOW, assignee="user1"),
+        Ticket(id=2, title="B", status=TicketStatus.OPEN, priority=TicketPriority.LOW, assignee="user1"),
+    ]
+
+    async def loader():
+        return TicketColumns.from_tickets(tickets), {1: "user1"}
+
+    store = TicketStore(loader, refresh_interval=60, max_staleness=300)
+    first = await store.refresh()
+    second = await store.refresh()
+    assert second.fingerprint == first.fingerprint
+    assert second.modified_at == first.modified_at
+
+    tickets[1] = tickets[1].model_copy(update={"status": TicketStatus.CLOSED})
+    third = await store.refresh()
+    assert third.fingerprint != first.fingerprint
+
+    # Same content loaded by a fresh process yields the same fingerprint.
+    other = TicketStore(loader, refresh_interval=60, max_staleness=300)
+    assert (await other.refresh()).fingerprint == third.fingerprint
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_past_max_staleness_serves_old_snapshot():
+    loader = CountingLoader()
+    store = TicketStore(loader, refresh_interval=60, max_staleness=300)
+    await store.get()
+    store.snapshot.fetched_at -= 600
+    loader.fail = True
+
+    snapshot = await store.get()
+
+    assert snapshot.version == -1
@@ -0,0 +1,146 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.tickethub.deadline import Deadline, within
+from src.tickethub.metrics import upstream_errors
+from src.tickethub.upstream import CircuitBreaker, CircuitOpenError, Hedger, UpstreamClient
+
+
+def make_client(responses, **kwargs):
+    """Client whose transport replays ``responses`` (status codes or exceptions)."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        outcome = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, json={})
+
+    kwargs.setdefault("backoff", 0)
+    return UpstreamClient(transport=httpx.MockTransport(handler), **kwargs), calls
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_statuses():
+    client, calls = make_client([503, 502, 200], retries=2)
+    errors = upstream_errors.labels("/todos", "http_503").value
+
+    response = await client.get("http://upstream/todos")
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert client.retried == 2
+    assert client.breaker.failures == 0
+    assert upstream_errors.labels("/todos", "http_503").value == errors + 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_client_errors():
+    client, calls = make_client([404], retries=2)
+
+    response = await client.get("http://upstream/todos/999")
+
+    assert response.status_code == 404
+    assert len(calls) == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_retries_on_transport_errors():
+    client, calls = make_client([httpx.ConnectError("refused")], retries=1)
+
+    with pytest.raises(httpx.ConnectError):
+        await client.get("http://upstream/todos")
+
+    assert len(calls) == 2
+    assert client.breaker.failures == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_then_probes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    client, calls = make_client([500, 500, 200], retries=0, breaker=breaker)
+
+    for _ in range(2):
+        assert (await client.get("http://upstream/todos")).status_code == 500
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        await client.get("http://upstream/todos")
+    assert excinfo.value.retry_after > 0
+    assert len(calls) == 2
+    assert client.rejected == 1
+
+    breaker.reset_timeout = 0
+    assert (await client.get("http://upstream/todos")).status_code == 200
+    assert breaker.state == "closed"
+    await client.aclose()
+
+
+def test_failed_probe_reopens_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert breaker.opened == 1
+
+
+@pytest.mark.asyncio
+async def test_skips_retries_that_would_outlive_the_deadline():
+    client, calls = make_client([503, 200], retries=2, backoff=1.0)
+
+    async with within(Deadline.after(0.5)):
+        response = await client.get("http://upstream/todos")
+
+    assert response.status_code == 503
+    assert len(calls) == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_hedger_races_a_backup_against_a_slow_call():
+    hedger = Hedger(quantile=0.5, min_delay=0.01, min_samples=3)
+    delays = [0.001, 0.001, 0.001, 1.0, 0.001]
+    started = []
+
+    async def call():
+        delay = delays[len(started)]
+        started.append(delay)
+        await asyncio.sleep(delay)
+        return delay
+
+    # No backups until enough latencies are known.
+    for _ in range(3):
+        assert await hedger.run(call) == 0.001
+    assert hedger.sent == 0
+
+    assert await hedger.run(call) == 0.001
+    assert started == delays
+    assert hedger.stats["sent"] == 1 and hedger.stats["won"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedger_waits_for_the_backup_when_the_first_call_fails():
+    hedger = Hedger(min_delay=0.01, min_samples=1)
+    # The first call primes the latency window; then the primary fails after the backup went out.
+    outcomes = [(0.005, "first"), (0.03, httpx.ConnectError("refused")), (0.05, "ok")]
+
+    async def call():
+        delay, outcome = outcomes.pop(0)
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert await hedger.run(call) == "first"
+    assert await hedger.run(call) == "ok"
+    assert hedger.sent == 1 and hedger.won == 1
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from src.tickethub.deadline import Deadline, remaining, within
+from src.tickethub.users import UserDirectory
+
+
+class FakeUsers:
+    def __init__(self, names):
+        self.names = dict(names)
+        self.loads = 0
+        self.lookups = []
+        self.fail = False
+
+    async def load(self):
+        self.loads += 1
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return dict(self.names)
+
+    async def lookup(self, user_ids):
+        self.lookups.append(sorted(user_ids))
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return [{"id": user_id, "username": self.names[user_id]} for user_id in user_ids if user_id in self.names]
+
+
+@pytest.mark.asyncio
+async def test_misses_from_one_tick_share_one_lookup():
+    upstream = FakeUsers({i: f"user{i}" for i in range(1, 11)})
+    directory = UserDirectory(upstream.load, upstream.lookup)
+
+    names = await asyncio.gather(*(directory.resolve(i) for i in (1, 2, 3, 2, 42)))
+
+    assert names == ["user1", "user2", "user3", "user2", None]
+    assert upstream.lookups == [[1, 2, 3, 42]]
+    assert upstream.loads == 0
+
+    # Known and known-unknown ids are answered without another lookup.
+    assert await directory.resolve_many([1, 3, 42]) == {1: "user1", 3: "user3"}
+    assert len(upstream.lookups) == 1
+    stats = directory.stats
+    assert (stats["hits"], stats["misses"]) == (3, 5)
+    assert (stats["batches"], stats["avg_batch_size"], stats["max_batch_size"]) == (1, 4.0, 4)
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped():
+    upstream = FakeUsers({i: f"user{i}" for i in range(1, 11)})
+    directory = UserDirectory(upstream.load, upstream.lookup, max_batch=4)
+
+    found = await directory.resolve_many(range(1, 11))
+
+    assert len(found) == 10
+    assert upstream.lookups == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+
+
+@pytest.mark.asyncio
+async def test_reload_after_ttl_picks_up_renames():
+    upstream = FakeUsers({1: "alice", 2: "bob"})
+    directory = UserDirectory(upstream.load, upstream.lookup, ttl=0.05)
+
+    assert await directory.load() == {1: "alice", 2: "bob"}
+    await asyncio.gather(directory.load(), directory.load())
+    assert upstream.loads == 1
+
+    upstream.names = {1: "alicia"}
+    await asyncio.sleep(0.06)
+    assert await directory.load() == {1: "alicia"}
+    assert directory.stats["reloads"] == 2
+
+    # A failed reload keeps serving what was loaded before.
+    upstream.fail = True
+    await asyncio.sleep(0.06)
+    assert await directory.load() == {1: "alicia"}
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_looked_up_again():
+    upstream = FakeUsers({1: "alice"})
+    directory = UserDirectory(upstream.load, upstream.lookup, ttl=0.05, negative_ttl=0.05)
+    directory.seed({1: "alice", 2: "bob"})
+
+    assert await directory.resolve(2) == "bob"
+    await asyncio.sleep(0.06)
+    upstream.names = {1: "alicia"}
+
+    assert await directory.resolve_many([1, 2]) == {1: "alicia"}
+    assert upstream.lookups == [[1, 2]]
+
+    # A failed lookup falls back to the expired name and is not remembered as unknown.
+    await asyncio.sleep(0.06)
+    upstream.fail = True
+    assert await directory.resolve(1) == "alicia"
+    upstream.fail = False
+    assert await directory.resolve(1) == "alicia"
+    assert len(upstream.lookups) == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_lookup():
+    upstream = FakeUsers({1: "alice"})
+    directory = UserDirectory(upstream.load, upstream.lookup)
+
+    impatient = asyncio.create_task(directory.resolve(1))
+    patient = asyncio.create_task(directory.resolve(1))
+    await asyncio.sleep(0)
+    impatient.cancel()
+
+    assert await patient == "alice"
+    assert upstream.lookups == [[1]]
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_under_the_latest_waiters_deadline():
+    upstream = FakeUsers({1: "alice", 2: "bob"})
+    budgets = []
+
+    async def lookup(user_ids):
+        budgets.append(remaining())
+        return await upstream.lookup(user_ids)
+
+    directory = UserDirectory(upstream.load, lookup)
+
+    async def resolve(user_id, seconds):
+        async with within(Deadline.after(seconds)):
+            return await directory.resolve(user_id)
+
+    assert await asyncio.gather(resolve(1, 0.5), resolve(2, 5.0)) == ["alice", "bob"]
+    assert upstream.lookups == [[1, 2]]
+    assert 4.0 < budgets[0] <= 5.0